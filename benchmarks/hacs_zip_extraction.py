@@ -0,0 +1,199 @@
+"""Benchmark of the extraction of a large synthetic zipball by HACS.
+
+Compares the previous extraction (archive written to a temporary directory,
+ZipFile.extractall on the event loop, temporary directory removed) with
+extract_zip in the executor, reading the archive from memory (or a spooled
+file), with one and with ZIP_WORKERS workers. Reported per method:
+
+- the time to extract the subtree of the integration,
+- the longest time the event loop was blocked,
+- the peak number of bytes allocated (traced by tracemalloc), including the
+  download buffer.
+
+Run it from the root of the repository, with the config folder on the path:
+`PYTHONPATH=config python benchmarks/hacs_zip_extraction.py`.
+"""
+import argparse
+import asyncio
+import io
+import json
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from custom_components.hacs.utils.installer import (
+    CHUNK_SIZE,
+    ZIP_SPOOL_SIZE,
+    ZIP_WORKERS,
+    SpooledDownload,
+    extract_zip,
+)
+
+ROOT = "hacs-integration-0123456"
+REMOTE_PATH = "custom_components/integration"
+# Interval of the timer that measures how long the event loop is blocked
+TICK = 0.005
+
+
+def synthetic_zipball(files, file_size, other_files):
+    """Return a zipball with files in the integration, and other_files outside of it."""
+    randomizer = random.Random(files)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr(f"{ROOT}/", b"")
+        for index in range(other_files):
+            zip_file.writestr(f"{ROOT}/docs/page_{index}.md", b"# Documentation\n" * 64)
+        for index in range(files):
+            # half text (compresses well) and half random data (does not)
+            size = randomizer.randint(file_size // 2, file_size * 3 // 2)
+            if index % 2:
+                content = randomizer.randbytes(size)
+            else:
+                content = (b"def function():\n    return None\n" * (size // 32 + 1))[:size]
+            zip_file.writestr(f"{ROOT}/{REMOTE_PATH}/module_{index // 50}/file_{index}.py", content)
+    return buffer.getvalue()
+
+
+def chunks(content):
+    """Return the content in chunks, like they are received."""
+    return [content[start : start + CHUNK_SIZE] for start in range(0, len(content), CHUNK_SIZE)]
+
+
+def extract_legacy(content, local_path):
+    """Extract the zipball like before: via a temporary file, with extractall."""
+    content = b"".join(chunks(content))
+    temp_dir = tempfile.mkdtemp()
+    temp_file = f"{temp_dir}/zipball.zip"
+    with open(temp_file, "wb") as file_handler:
+        file_handler.write(content)
+    with zipfile.ZipFile(temp_file, "r") as zip_file:
+        extractable = []
+        for path in zip_file.filelist:
+            filename = "/".join(path.filename.split("/")[1:])
+            if filename.startswith(REMOTE_PATH) and filename != REMOTE_PATH:
+                path.filename = filename.replace(REMOTE_PATH, "")
+                extractable.append(path)
+        zip_file.extractall(local_path, extractable)
+    shutil.rmtree(temp_dir)
+
+
+def extract_spooled(content, local_path, workers):
+    """Extract the zipball with extract_zip, from a spooled download."""
+    download = SpooledDownload()
+    download.open()
+    try:
+        for chunk in chunks(content):
+            download.write(chunk)
+        extract_zip(download.file, local_path, REMOTE_PATH, True, workers)
+    finally:
+        download.abort()
+
+
+async def run(method, executor):
+    """Run a method, return its duration and the longest blocking of the event loop."""
+    blocked = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal blocked
+        while not done:
+            tick = time.perf_counter()
+            await asyncio.sleep(TICK)
+            blocked = max(blocked, time.perf_counter() - tick - TICK)
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if executor:
+        await asyncio.get_running_loop().run_in_executor(None, method)
+    else:
+        method()
+    duration = time.perf_counter() - start
+    done = True
+    await ticker_task
+    return duration, blocked
+
+
+def measure(method, executor, repeat):
+    """Measure the best duration, longest loop blocking and allocated bytes of a method."""
+    best = blocked = None
+    for _ in range(repeat):
+        target = tempfile.mkdtemp()
+        try:
+            duration, loop_blocked = asyncio.run(run(lambda: method(target), executor))
+        finally:
+            shutil.rmtree(target)
+        best = duration if best is None else min(best, duration)
+        blocked = loop_blocked if blocked is None else min(blocked, loop_blocked)
+
+    target = tempfile.mkdtemp()
+    tracemalloc.start()
+    try:
+        method(target)
+        allocated = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        shutil.rmtree(target)
+    return {
+        "seconds": round(best, 4),
+        "loop_blocked_seconds": round(blocked, 4),
+        "allocated_bytes": allocated,
+    }
+
+
+def main():
+    """Run the zip extraction benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--files", type=int, default=2000, help="files in the integration")
+    arg_parser.add_argument("--file-size", type=int, default=16 * 1024, help="mean file size")
+    arg_parser.add_argument("--other-files", type=int, default=500, help="files outside of it")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="best of this number of runs")
+    arg_parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = arg_parser.parse_args()
+
+    content = synthetic_zipball(args.files, args.file_size, args.other_files)
+    methods = {
+        "legacy (temp file, extractall on the loop)": (
+            lambda target: extract_legacy(content, target),
+            False,
+        ),
+        "extract_zip (1 worker)": (lambda target: extract_spooled(content, target, 1), True),
+        f"extract_zip ({ZIP_WORKERS} workers)": (
+            lambda target: extract_spooled(content, target, ZIP_WORKERS),
+            True,
+        ),
+    }
+
+    results = {
+        "zipball_bytes": len(content),
+        "spooled_to_disk": len(content) > ZIP_SPOOL_SIZE,
+        "methods": {
+            name: measure(method, executor, args.repeat)
+            for name, (method, executor) in methods.items()
+        },
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        "zipball: %.1f MiB, %i files in %s%s"
+        % (
+            len(content) / 1024 / 1024,
+            args.files,
+            REMOTE_PATH,
+            " (spooled to disk)" if results["spooled_to_disk"] else "",
+        )
+    )
+    print("%-45s %10s %15s %15s" % ("method", "seconds", "loop blocked", "allocated"))
+    for name, result in results["methods"].items():
+        print(
+            "%-45s %10.3f %15.3f %15i"
+            % (name, result["seconds"], result["loop_blocked_seconds"], result["allocated_bytes"])
+        )
+
+
+if __name__ == "__main__":
+    main()
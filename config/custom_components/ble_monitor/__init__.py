@@ -3,7 +3,8 @@ import asyncio
 import copy
 import json
 import logging
-from threading import Thread
+from threading import Lock, Thread
+from time import monotonic, time
 import voluptuous as vol
 
 import aioblescan as aiobs
@@ -34,6 +35,7 @@ from .const import (
     AES128KEY24_REGEX,
     AES128KEY32_REGEX,
     CONF_ACTIVE_SCAN,
+    CONF_ACTIVE_SCAN_INTERFACES,
     CONF_BATT_ENTITIES,
     CONF_BT_AUTO_RESTART,
     CONF_BT_INTERFACE,
@@ -48,10 +50,15 @@ from .const import (
     CONF_DEVICE_TRACKER_SCAN_INTERVAL,
     CONF_DEVICE_TRACKER_CONSIDER_HOME,
     CONF_HCI_INTERFACE,
+    CONF_CAPTURE_FILE,
     CONF_PACKET,
+    CONF_PARSE_BATCH_SIZE,
+    CONF_PARSE_WORKERS,
     CONF_GATEWAY_ID,
     CONF_PERIOD,
+    CONF_STATE_WRITE_WINDOW,
     CONF_LOG_SPIKES,
+    CONF_REALTIME,
     CONF_REPORT_UNKNOWN,
     CONF_RESTORE_STATE,
     CONF_USE_MEDIAN,
@@ -71,7 +78,10 @@ from .const import (
     DEFAULT_DEVICE_USE_MEDIAN,
     DEFAULT_DISCOVERY,
     DEFAULT_LOG_SPIKES,
+    DEFAULT_PARSE_BATCH_SIZE,
+    DEFAULT_PARSE_WORKERS,
     DEFAULT_PERIOD,
+    DEFAULT_STATE_WRITE_WINDOW,
     DEFAULT_REPORT_UNKNOWN,
     DEFAULT_RESTORE_STATE,
     DEFAULT_USE_MEDIAN,
@@ -83,6 +93,9 @@ from .const import (
     REPORT_UNKNOWN_LIST,
     SERVICE_CLEANUP_ENTRIES,
     SERVICE_PARSE_DATA,
+    SERVICE_REPLAY_CAPTURE,
+    SERVICE_START_CAPTURE,
+    SERVICE_STOP_CAPTURE,
 )
 
 from .bt_helpers import (
@@ -98,6 +111,11 @@ from .helper import (
     dict_get_or,
     dict_get_or_clean,
 )
+from .batch import QUEUE_FLUSH_INTERVAL, BatchedQueue
+from .capture import CaptureReader, CaptureWriter, async_replay_capture
+from .parse_pool import PARSE_BATCH_TIMEOUT, ParsePool
+from .presence import PresenceTable
+from .scan_scheduler import ScanAdapter
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -166,6 +184,9 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_ACTIVE_SCAN, default=DEFAULT_ACTIVE_SCAN
                     ): cv.boolean,
+                    vol.Optional(CONF_ACTIVE_SCAN_INTERFACES, default=[]): vol.All(
+                        cv.ensure_list, [cv.positive_int]
+                    ),
                     vol.Optional(
                         CONF_BATT_ENTITIES, default=DEFAULT_BATT_ENTITIES
                     ): cv.boolean,
@@ -179,6 +200,15 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_REPORT_UNKNOWN, default=DEFAULT_REPORT_UNKNOWN
                     ): vol.In(REPORT_UNKNOWN_LIST),
+                    vol.Optional(
+                        CONF_PARSE_WORKERS, default=DEFAULT_PARSE_WORKERS
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_PARSE_BATCH_SIZE, default=DEFAULT_PARSE_BATCH_SIZE
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_STATE_WRITE_WINDOW, default=DEFAULT_STATE_WRITE_WINDOW
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
                 }
             ),
         )
@@ -193,6 +223,18 @@ SERVICE_PARSE_DATA_SCHEMA = vol.Schema(
         vol.Optional(CONF_GATEWAY_ID): cv.string
     }
 )
+SERVICE_START_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_CAPTURE_FILE): cv.string,
+    }
+)
+SERVICE_STOP_CAPTURE_SCHEMA = vol.Schema({})
+SERVICE_REPLAY_CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_CAPTURE_FILE): cv.string,
+        vol.Optional(CONF_REALTIME, default=False): cv.boolean,
+    }
+)
 
 
 async def async_setup(hass: HomeAssistant, config):
@@ -208,6 +250,21 @@ async def async_setup(hass: HomeAssistant, config):
 
         await async_parse_data_service(hass, service_data)
 
+    async def service_start_capture(service_call):
+        service_data = service_call.data
+
+        await async_start_capture_service(hass, service_data)
+
+    async def service_stop_capture(service_call):
+        service_data = service_call.data
+
+        await async_stop_capture_service(hass, service_data)
+
+    async def service_replay_capture(service_call):
+        service_data = service_call.data
+
+        await async_replay_capture_service(hass, service_data)
+
     hass.services.async_register(
         DOMAIN,
         SERVICE_CLEANUP_ENTRIES,
@@ -220,6 +277,24 @@ async def async_setup(hass: HomeAssistant, config):
         service_parse_data,
         schema=SERVICE_PARSE_DATA_SCHEMA,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        service_start_capture,
+        schema=SERVICE_START_CAPTURE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_CAPTURE,
+        service_stop_capture,
+        schema=SERVICE_STOP_CAPTURE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REPLAY_CAPTURE,
+        service_replay_capture,
+        schema=SERVICE_REPLAY_CAPTURE_SCHEMA,
+    )
 
     if DOMAIN not in config:
         return True
@@ -504,6 +579,67 @@ async def async_parse_data_service(hass: HomeAssistant, service_data):
         )
 
 
+def capture_path(hass: HomeAssistant, service_data):
+    """Return the path of the capture file, relative to the config directory."""
+    path = hass.config.path(service_data[CONF_CAPTURE_FILE])
+    if not hass.config.is_allowed_path(path):
+        _LOGGER.error("Capture file %s is not in an allowed directory", path)
+        return None
+    return path
+
+
+async def async_start_capture_service(hass: HomeAssistant, service_data):
+    """Start writing the received HCI events to a capture file."""
+    _LOGGER.debug("async_start_capture_service")
+    blemonitor: BLEmonitor = hass.data[DOMAIN]["blemonitor"]
+    path = capture_path(hass, service_data)
+    if blemonitor and path:
+        capture = await hass.async_add_executor_job(CaptureWriter, path)
+        blemonitor.dumpthread.start_capture(capture)
+
+
+async def async_stop_capture_service(hass: HomeAssistant, service_data):
+    """Stop writing the received HCI events to a capture file."""
+    _LOGGER.debug("async_stop_capture_service")
+    blemonitor: BLEmonitor = hass.data[DOMAIN]["blemonitor"]
+    if blemonitor:
+        await hass.async_add_executor_job(blemonitor.dumpthread.stop_capture)
+
+
+async def async_replay_capture_service(hass: HomeAssistant, service_data):
+    """Replay the HCI events of a capture file."""
+    _LOGGER.debug("async_replay_capture_service")
+    blemonitor: BLEmonitor = hass.data[DOMAIN]["blemonitor"]
+    path = capture_path(hass, service_data)
+    if blemonitor and path:
+        reader = CaptureReader(path)
+        await hass.async_add_executor_job(reader.open)
+        try:
+            count = await async_replay_capture(
+                reader, blemonitor.dumpthread.replay_hci_event, service_data[CONF_REALTIME]
+            )
+        finally:
+            reader.close()
+        _LOGGER.info("%i HCI events replayed from %s", count, path)
+
+
+def build_routing_table():
+    """Build a table with the measuring and binary measurement keys per device type."""
+    routing_table = {}
+    for device_type in MANUFACTURER_DICT:
+        routing_table[device_type] = (
+            frozenset(MEASUREMENT_DICT[device_type][0] + MEASUREMENT_DICT[device_type][1]),
+            frozenset(MEASUREMENT_DICT[device_type][2] + ["battery"]),
+        )
+    auto_routing = (
+        frozenset(AUTO_SENSOR_LIST),
+        frozenset(AUTO_BINARY_SENSOR_LIST + ["battery"]),
+    )
+    for device_type in AUTO_MANUFACTURER_DICT:
+        routing_table[device_type] = auto_routing
+    return routing_table
+
+
 class BLEmonitor:
     """BLE scanner."""
 
@@ -516,6 +652,8 @@ class BLEmonitor:
         }
         self.config = config
         self.dumpthread = None
+        # last seen time, RSSI history and presence of the devices with a device tracker
+        self.presence = PresenceTable()
 
     def shutdown_handler(self, event):
         """Run homeassistant_stop event handler."""
@@ -533,6 +671,8 @@ class BLEmonitor:
 
     def stop(self):
         """Stop HCIdump thread(s)."""
+        if self.dumpthread is not None:
+            self.dumpthread.flush_queues()
         self.dataqueue["binary"].sync_q.put_nowait(None)
         self.dataqueue["measuring"].sync_q.put_nowait(None)
         self.dataqueue["tracker"].sync_q.put_nowait(None)
@@ -557,6 +697,18 @@ class BLEmonitor:
         else:
             self.start()
 
+    def ensure_running(self):
+        """Start the HCIdump thread again, if it has stopped."""
+        if not self.dumpthread.is_alive():
+            _LOGGER.error("HCIdump thread has stopped, restarting it")
+            self.start()
+
+    def diagnostics(self):
+        """Return the scan state of the adapters and the last seen time and RSSI of the tracked devices."""
+        diagnostics = {} if self.dumpthread is None else self.dumpthread.diagnostics()
+        diagnostics["devices"] = self.presence.diagnostics(time())
+        return diagnostics
+
 
 class HCIdump(Thread):
     """Mimic deprecated hcidump tool."""
@@ -565,15 +717,23 @@ class HCIdump(Thread):
         """Initiate HCIdump thread."""
         Thread.__init__(self)
         _LOGGER.debug("HCIdump thread: Init")
-        self.dataqueue_bin = dataqueue["binary"]
-        self.dataqueue_meas = dataqueue["measuring"]
-        self.dataqueue_tracker = dataqueue["tracker"]
+        self.dataqueue_bin = BatchedQueue(dataqueue["binary"])
+        self.dataqueue_meas = BatchedQueue(dataqueue["measuring"])
+        self.dataqueue_tracker = BatchedQueue(dataqueue["tracker"])
+        self.routing_table = build_routing_table()
+        # queues to put a sensor message on, indexed by [binary][measuring]
+        self.routing_targets = (
+            ((self.dataqueue_bin, self.dataqueue_meas), (self.dataqueue_meas,)),
+            ((self.dataqueue_bin,), (self.dataqueue_bin, self.dataqueue_meas)),
+        )
         self._event_loop = None
-        self._joining = False
+        self._restart_task = None
         self.evt_cnt = 0
         self.config = config
         self._interfaces = list(set(config[CONF_HCI_INTERFACE]))
         self._active = int(config[CONF_ACTIVE_SCAN] is True)
+        self.period = config.get(CONF_PERIOD, DEFAULT_PERIOD)
+        self.adapters = []
         self.discovery = True
         self.filter_duplicates = True
         self.aeskeys = {}
@@ -644,180 +804,301 @@ class HCIdump(Thread):
         )
 
         # prepare the ble_parser
-        self.ble_parser = BleParser(
-            report_unknown=self.report_unknown,
-            discovery=self.discovery,
-            filter_duplicates=self.filter_duplicates,
-            sensor_whitelist=self.sensor_whitelist,
-            tracker_whitelist=self.tracker_whitelist,
-            report_unknown_whitelist=self.report_unknown_whitelist,
-            aeskeys=self.aeskeys,
-        )
+        self.parser_kwargs = {
+            "report_unknown": self.report_unknown,
+            "discovery": self.discovery,
+            "filter_duplicates": self.filter_duplicates,
+            "sensor_whitelist": self.sensor_whitelist,
+            "tracker_whitelist": self.tracker_whitelist,
+            "report_unknown_whitelist": self.report_unknown_whitelist,
+            "aeskeys": self.aeskeys,
+        }
+        self.ble_parser = BleParser(**self.parser_kwargs)
+
+        # prepare the parse pool, frames are parsed in worker processes if enabled
+        self.parse_pool = None
+        self.parse_workers = self.config.get(CONF_PARSE_WORKERS, DEFAULT_PARSE_WORKERS)
+        self.parse_batch_size = self.config.get(CONF_PARSE_BATCH_SIZE, DEFAULT_PARSE_BATCH_SIZE)
+        self._parse_batch = []
+        self._parse_batch_lock = Lock()
+        self.capture = None
+
+    def start_capture(self, capture):
+        """Start writing the HCI events to a CaptureWriter."""
+        self.stop_capture()
+        self.capture = capture
+        _LOGGER.info("Capturing HCI events to %s", capture.path)
+
+    def stop_capture(self):
+        """Stop writing the HCI events to the capture file."""
+        capture = self.capture
+        if capture is not None:
+            self.capture = None
+            capture.close()
+            _LOGGER.info("%i HCI events captured to %s", capture.frames, capture.path)
+
+    def call_later(self, delay, callback):
+        """Call a callback after a delay in the HCIdump event loop (thread safe)."""
+        if self._event_loop is None or self._event_loop.is_closed():
+            callback()
+            return
+        self._event_loop.call_soon_threadsafe(self._event_loop.call_later, delay, callback)
+
+    def replay_hci_event(self, data, gateway_id=DOMAIN):
+        """Process a replayed HCI event in the HCIdump event loop (thread safe)."""
+        if self._event_loop is None or self._event_loop.is_closed():
+            self.process_hci_events(data, gateway_id, True)
+            return
+        self._event_loop.call_soon_threadsafe(self.process_hci_events, data, gateway_id, True)
 
-    def process_hci_events(self, data, gateway_id=DOMAIN):
+    def process_hci_events(self, data, gateway_id=DOMAIN, replay=False):
         """Parse HCI events."""
+        received = monotonic()
         self.evt_cnt += 1
+        capture = self.capture
+        if capture is not None:
+            capture.write(data, gateway_id, replay=replay)
         if len(data) < 12:
             return
+        if self.parse_pool is not None:
+            self.queue_hci_event(data, gateway_id, received)
+            return
         sensor_msg, tracker_msg = self.ble_parser.parse_raw_data(data)
+        self.process_parsed_data(sensor_msg, tracker_msg, gateway_id, received)
+
+    def queue_hci_event(self, data, gateway_id, received):
+        """Add a HCI event to the batch for the parse pool."""
+        with self._parse_batch_lock:
+            self._parse_batch.append((data, gateway_id, received))
+            batch_len = len(self._parse_batch)
+        if batch_len >= self.parse_batch_size:
+            self.flush_parse_batch()
+        elif batch_len == 1:
+            # hand over incomplete batches after a short timeout
+            self.call_later(PARSE_BATCH_TIMEOUT, self.flush_parse_batch)
+
+    def flush_parse_batch(self):
+        """Hand the collected HCI events to the parse pool."""
+        with self._parse_batch_lock:
+            batch = self._parse_batch
+            self._parse_batch = []
+        if batch and self.parse_pool is not None:
+            self.parse_pool.submit(batch)
+
+    def put_message(self, dataqueue, message, received):
+        """Add a message to the next batch for an entity updater."""
+        if dataqueue.put(message, received):
+            self.call_later(QUEUE_FLUSH_INTERVAL, dataqueue.flush)
+
+    def flush_queues(self):
+        """Put the collected messages on the queues of the entity updaters."""
+        self.dataqueue_bin.flush()
+        self.dataqueue_meas.flush()
+        self.dataqueue_tracker.flush()
+
+    def process_parsed_data(self, sensor_msg, tracker_msg, gateway_id=DOMAIN, received=None):
+        """Put parsed data on the queues of the sensor and tracker platforms."""
+        if received is None:
+            received = monotonic()
         if sensor_msg:
-            measurements = list(sensor_msg.keys())
-            device_type = sensor_msg["type"]
-            if device_type in MANUFACTURER_DICT:
-                sensor_list = (
-                    MEASUREMENT_DICT[device_type][0] + MEASUREMENT_DICT[device_type][1]
-                )
-                binary_list = MEASUREMENT_DICT[device_type][2] + ["battery"]
-            elif device_type in AUTO_MANUFACTURER_DICT:
-                sensor_list = AUTO_SENSOR_LIST
-                binary_list = AUTO_BINARY_SENSOR_LIST + ["battery"]
-            else:
+            try:
+                sensor_keys, binary_keys = self.routing_table[sensor_msg["type"]]
+            except KeyError:
                 return
-
-            measuring = any(x in measurements for x in sensor_list)
-            binary = any(x in measurements for x in binary_list)
-            if binary == measuring:
-                self.dataqueue_bin.sync_q.put_nowait(sensor_msg)
-                self.dataqueue_meas.sync_q.put_nowait(sensor_msg)
-            else:
-                if binary is True:
-                    self.dataqueue_bin.sync_q.put_nowait(sensor_msg)
-                if measuring is True:
-                    self.dataqueue_meas.sync_q.put_nowait(sensor_msg)
+            measurements = sensor_msg.keys()
+            binary = not binary_keys.isdisjoint(measurements)
+            measuring = not sensor_keys.isdisjoint(measurements)
+            for dataqueue in self.routing_targets[binary][measuring]:
+                self.put_message(dataqueue, sensor_msg, received)
         if tracker_msg:
             tracker_msg[CONF_GATEWAY_ID] = gateway_id
-            self.dataqueue_tracker.sync_q.put_nowait(tracker_msg)
+            self.put_message(self.dataqueue_tracker, tracker_msg, received)
+
+    def check_adapters(self):
+        """Check the event rate of the adapters, restart the adapters that stopped receiving."""
+        self._event_loop.call_later(self.period, self.check_adapters)
+        _LOGGER.debug("%i HCI events processed for previous period", self.evt_cnt)
+        if self.ble_parser.prefilter_macs is not None:
+            _LOGGER.debug(
+                "%i HCI events rejected by the whitelist prefilter, %i parsed",
+                self.ble_parser.frames_rejected,
+                self.ble_parser.frames_parsed,
+            )
+        if self.parse_pool is not None:
+            _LOGGER.debug(
+                "Parse pool: %i HCI events waiting, %i dropped, %i rejected by the "
+                "whitelist prefilter, %i parsed",
+                self.parse_pool.pending_frames,
+                self.parse_pool.dropped_frames,
+                self.parse_pool.frames_rejected,
+                self.parse_pool.frames_parsed,
+            )
+            self.parse_pool.dropped_frames = 0
+            self.parse_pool.frames_rejected = 0
+            self.parse_pool.frames_parsed = 0
+        self.evt_cnt = 0
+        self.ble_parser.frames_rejected = 0
+        self.ble_parser.frames_parsed = 0
+
+        adapters = [adapter for adapter in self.adapters if not adapter.check_health()]
+        for adapter in self.adapters:
+            _LOGGER.debug(
+                "HCIdump thread: hci%i received %.2f events/s (average %s events/s)",
+                adapter.hci,
+                adapter.event_rate,
+                adapter.diagnostics()["average_event_rate"],
+            )
+        if adapters and (self._restart_task is None or self._restart_task.done()):
+            self._restart_task = self._event_loop.create_task(self.async_restart_adapters(adapters))
+
+    async def async_restart_adapters(self, adapters):
+        """Stop and start scanning on the adapters."""
+        for adapter in adapters:
+            if adapter.scanning:
+                _LOGGER.warning(
+                    "HCIdump thread: event rate of hci%i dropped to %.2f events/s, restarting scanning",
+                    adapter.hci,
+                    adapter.event_rate,
+                )
+            await self.async_stop_scanning(adapter)
+            adapter.restarts += 1
+        await self.async_start_adapters(adapters)
+
+    async def async_start_adapters(self, adapters):
+        """Start scanning on the adapters, power cycle the adapters that failed (if enabled)."""
+        interfaces_to_reset = []
+        for adapter in adapters:
+            if not await self.async_start_scanning(adapter):
+                adapter.failures += 1
+                if self.config[CONF_BT_AUTO_RESTART] is True:
+                    interfaces_to_reset.append(adapter.hci)
+        if interfaces_to_reset:
+            ts_now = dt.now()
+            if (ts_now - self.last_bt_reset).seconds > 60:
+                for iface in interfaces_to_reset:
+                    _LOGGER.error(
+                        "HCIdump thread: Trying to power cycle Bluetooth adapter hci%i %s,"
+                        " will try to use it next scan period.",
+                        iface,
+                        BT_INTERFACES[iface],
+                    )
+                    await self._event_loop.run_in_executor(None, reset_bluetooth, iface)
+                self.last_bt_reset = ts_now
+
+    async def async_start_scanning(self, adapter):
+        """Connect to an adapter and send the scan request, return True on success."""
+        hci = adapter.hci
+        try:
+            adapter.socket = aiobs.create_bt_socket(hci)
+        except OSError as error:
+            _LOGGER.error("HCIdump thread: OS error (hci%i): %s", hci, error)
+            return False
+        adapter.factory = getattr(
+            self._event_loop, "_create_connection_transport"
+        )(adapter.socket, aiobs.BLEScanRequester, None, None)
+        adapter.conn, adapter.btctrl = await adapter.factory
+        # Wait up to five seconds for aioblescan BLEScanRequester to initialize
+        initialized_evt = getattr(adapter.btctrl, "_initialized")
+        _LOGGER.debug(
+            "HCIdump thread: BLEScanRequester._initialized is %s for hci%i, "
+            " waiting for connection...",
+            initialized_evt.is_set(),
+            hci,
+        )
+        try:
+            await asyncio.wait_for(initialized_evt.wait(), 5)
+        except asyncio.TimeoutError:
+            _LOGGER.error(
+                "HCIdump thread: Something wrong - interface hci%i not ready,"
+                " and will be skipped for current scan period.",
+                hci,
+            )
+            adapter.close()
+            return False
+        adapter.btctrl.process = adapter.process
+        _LOGGER.debug("HCIdump thread: connected to hci%i", hci)
+        try:
+            await adapter.btctrl.send_scan_request(int(adapter.active))
+        except RuntimeError as error:
+            _LOGGER.error(
+                "HCIdump thread: Runtime error while sending scan request on hci%i: %s.",
+                hci,
+                error,
+            )
+            adapter.close()
+            return False
+        adapter.scanning = True
+        _LOGGER.debug(
+            "HCIdump thread: BLEScanRequester._initialized is %s for hci%i, "
+            " connection established, send_scan_request succeeded (%s scan).",
+            initialized_evt.is_set(),
+            hci,
+            "active" if adapter.active else "passive",
+        )
+        return True
+
+    async def async_stop_scanning(self, adapter):
+        """Stop scanning and close the connection with an adapter."""
+        if adapter.scanning:
+            try:
+                await adapter.btctrl.stop_scan_request()
+            except RuntimeError as error:
+                _LOGGER.error(
+                    "HCIdump thread: Runtime error while stop scan request on hci%i: %s.",
+                    adapter.hci,
+                    error,
+                )
+        adapter.close()
+
+    def diagnostics(self):
+        """Return the scan state and event rates of the adapters."""
+        return {
+            "hci_events": self.evt_cnt,
+            "adapters": [adapter.diagnostics() for adapter in self.adapters],
+        }
 
     def run(self):
         """Run HCIdump thread."""
-        while True:
-            _LOGGER.debug("HCIdump thread: Run")
-            mysocket = {}
-            fac = {}
-            conn = {}
-            btctrl = {}
-            interface_is_ok = {}
-            interfaces_to_reset = []
-            initialized_evt = {}
-            if self._event_loop is None:
-                self._event_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._event_loop)
-            if "disable" not in self.config[CONF_BT_INTERFACE]:
-                for hci in self._interfaces:
-                    interface_is_ok[hci] = False
-                    try:
-                        mysocket[hci] = aiobs.create_bt_socket(hci)
-                    except OSError as error:
-                        _LOGGER.error("HCIdump thread: OS error (hci%i): %s", hci, error)
-                    else:
-                        fac[hci] = getattr(
-                            self._event_loop, "_create_connection_transport"
-                        )(mysocket[hci], aiobs.BLEScanRequester, None, None)
-                        conn[hci], btctrl[hci] = self._event_loop.run_until_complete(
-                            fac[hci]
-                        )
-                        # Wait up to five seconds for aioblescan BLEScanRequester to initialize
-                        initialized_evt[hci] = getattr(btctrl[hci], "_initialized")
-                        _LOGGER.debug(
-                            "HCIdump thread: BLEScanRequester._initialized is %s for hci%i, "
-                            " waiting for connection...",
-                            initialized_evt[hci].is_set(),
-                            hci,
-                        )
-                        try:
-                            self._event_loop.run_until_complete(asyncio.wait_for(initialized_evt[hci].wait(), 5))
-                        except asyncio.TimeoutError:
-                            _LOGGER.error(
-                                "HCIdump thread: Something wrong - interface hci%i not ready,"
-                                " and will be skipped for current scan period.",
-                                hci,
-                            )
-                            conn[hci].close()
-                            fac[hci].close()
-                            mysocket[hci].close()
-                        else:
-                            btctrl[hci].process = self.process_hci_events
-                            _LOGGER.debug("HCIdump thread: connected to hci%i", hci)
-                            try:
-                                self._event_loop.run_until_complete(
-                                    btctrl[hci].send_scan_request(self._active)
-                                )
-                            except RuntimeError as error:
-                                _LOGGER.error(
-                                    "HCIdump thread: Runtime error while sending scan request on hci%i: %s.",
-                                    hci,
-                                    error,
-                                )
-                                conn[hci].close()
-                                fac[hci].close()
-                                mysocket[hci].close()
-                            else:
-                                interface_is_ok[hci] = True
-                                _LOGGER.debug(
-                                    "HCIdump thread: BLEScanRequester._initialized is %s for hci%i, "
-                                    " connection established, send_scan_request succeeded.",
-                                    initialized_evt[hci].is_set(),
-                                    hci,
-                                )
-                    if (interface_is_ok[hci] is False) and (self.config[CONF_BT_AUTO_RESTART] is True):
-                        interfaces_to_reset.append(hci)
-                if interfaces_to_reset:
-                    ts_now = dt.now()
-                    if (ts_now - self.last_bt_reset).seconds > 60:
-                        for iface in interfaces_to_reset:
-                            _LOGGER.error(
-                                "HCIdump thread: Trying to power cycle Bluetooth adapter hci%i %s,"
-                                " will try to use it next scan period.",
-                                iface,
-                                BT_INTERFACES[iface],
-                            )
-                            reset_bluetooth(iface)
-                        self.last_bt_reset = ts_now
-            _LOGGER.debug("HCIdump thread: start main event_loop")
-            try:
-                self._event_loop.run_forever()
-            finally:
-                _LOGGER.debug("HCIdump thread: main event_loop stopped, finishing.")
-                if "disable" not in self.config[CONF_BT_INTERFACE]:
-                    for hci in self._interfaces:
-                        if interface_is_ok[hci] is True:
-                            try:
-                                self._event_loop.run_until_complete(
-                                    btctrl[hci].stop_scan_request()
-                                )
-                            except RuntimeError as error:
-                                _LOGGER.error(
-                                    "HCIdump thread: Runtime error while stop scan request on hci%i: %s.",
-                                    hci,
-                                    error,
-                                )
-                            except KeyError:
-                                _LOGGER.debug(
-                                    "HCIdump thread: Key error while stop scan request on hci%i",
-                                    hci,
-                                )
-                        try:
-                            conn[hci].close()
-                            fac[hci].close()
-                            mysocket[hci].close()
-                        except KeyError:
-                            _LOGGER.debug(
-                                "HCIdump thread: Key error while closing connection on hci%i",
-                                hci,
-                            )
-                self._event_loop.run_until_complete(asyncio.sleep(0))
-            if self._joining is True:
-                break
-            _LOGGER.debug("HCIdump thread: Scanning will be restarted")
-            _LOGGER.debug("%i HCI events processed for previous period", self.evt_cnt)
-            self.evt_cnt = 0
+        if self.parse_workers > 0:
+            self.parse_pool = ParsePool(
+                self.parser_kwargs, self.parse_workers, self.process_parsed_data
+            )
+            self.parse_pool.start()
+        _LOGGER.debug("HCIdump thread: Run")
+        if self._event_loop is None:
+            self._event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._event_loop)
+        if "disable" not in self.config[CONF_BT_INTERFACE]:
+            active_interfaces = self.config.get(CONF_ACTIVE_SCAN_INTERFACES) or []
+            self.adapters = [
+                ScanAdapter(
+                    hci,
+                    hci in active_interfaces if active_interfaces else self._active == 1,
+                    self.process_hci_events,
+                )
+                for hci in self._interfaces
+            ]
+            self._event_loop.run_until_complete(self.async_start_adapters(self.adapters))
+        self._event_loop.call_later(self.period, self.check_adapters)
+        _LOGGER.debug("HCIdump thread: start main event_loop")
+        try:
+            self._event_loop.run_forever()
+        finally:
+            _LOGGER.debug("HCIdump thread: main event_loop stopped, finishing.")
+            for adapter in self.adapters:
+                self._event_loop.run_until_complete(self.async_stop_scanning(adapter))
+            self._event_loop.run_until_complete(asyncio.sleep(0))
+        if self.parse_pool is not None:
+            self.flush_parse_batch()
+            self.parse_pool.stop()
+            self.parse_pool = None
+        self.stop_capture()
         self._event_loop.close()
         _LOGGER.debug("HCIdump thread: Run finished")
 
     def join(self, timeout=10):
         """Join HCIdump thread."""
         _LOGGER.debug("HCIdump thread: joining")
-        self._joining = True
         try:
             self._event_loop.call_soon_threadsafe(self._event_loop.stop)
         except AttributeError as error:
@@ -827,8 +1108,15 @@ class HCIdump(Thread):
             _LOGGER.debug("HCIdump thread: joined")
 
     def restart(self):
-        """Restarting scanner."""
+        """Restart scanning on all adapters."""
         try:
-            self._event_loop.call_soon_threadsafe(self._event_loop.stop)
+            self._event_loop.call_soon_threadsafe(self.restart_adapters)
         except AttributeError as error:
             _LOGGER.debug("%s", error)
+
+    def restart_adapters(self):
+        """Restart scanning on all adapters (in the HCIdump event loop)."""
+        if self._restart_task is None or self._restart_task.done():
+            self._restart_task = self._event_loop.create_task(
+                self.async_restart_adapters(self.adapters)
+            )
@@ -0,0 +1,82 @@
+"""Streaming aggregation of the readings of a sensor within an update period."""
+from fractions import Fraction
+from statistics import StatisticsError
+
+
+class Aggregator:
+    """Count, mean, median, minimum and maximum of the readings within a period.
+
+    The readings are kept as a histogram (value: count) instead of a list with every
+    reading. BLE sensors report quantized values, so the number of distinct values in a
+    period stays small, while the median is still exact.
+    """
+
+    __slots__ = ("count", "total", "_histogram")
+
+    def __init__(self):
+        """Initialize an empty aggregator."""
+        self.count = 0
+        self.total = 0
+        self._histogram = {}
+
+    def __len__(self):
+        """Return the number of readings."""
+        return self.count
+
+    def add(self, value):
+        """Add a reading."""
+        self.count += 1
+        self.total += value
+        histogram = self._histogram
+        histogram[value] = histogram.get(value, 0) + 1
+
+    @property
+    def minimum(self):
+        """Return the lowest reading, or None without readings."""
+        return min(self._histogram, default=None)
+
+    @property
+    def maximum(self):
+        """Return the highest reading, or None without readings."""
+        return max(self._histogram, default=None)
+
+    def clear(self):
+        """Remove all readings."""
+        self.__init__()
+
+    def copy(self):
+        """Return a copy of the aggregator."""
+        aggregator = Aggregator()
+        aggregator.count = self.count
+        aggregator.total = self.total
+        aggregator._histogram = self._histogram.copy()
+        return aggregator
+
+    def mean(self):
+        """Return the mean of the readings (like statistics.mean)."""
+        if not self.count:
+            raise StatisticsError("mean requires at least one data point")
+        if isinstance(self.total, int):
+            if self.total % self.count == 0:
+                return self.total // self.count
+            return self.total / self.count
+        # exact sum over the distinct values, to round the same way as statistics.mean
+        total = sum(Fraction(value) * count for value, count in self._histogram.items())
+        return float(total / self.count)
+
+    def median(self):
+        """Return the median of the readings (like statistics.median)."""
+        if not self.count:
+            raise StatisticsError("no median for empty data")
+        half = self.count // 2
+        lower = None
+        seen = 0
+        for value in sorted(self._histogram):
+            seen += self._histogram[value]
+            if lower is None and seen >= half:
+                lower = value
+            if seen > half:
+                if self.count % 2:
+                    return value
+                return (lower + value) / 2
+        raise StatisticsError("inconsistent histogram")
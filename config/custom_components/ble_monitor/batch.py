@@ -0,0 +1,141 @@
+"""Batched hand-off of parsed BLE advertisements to the entity updaters, and of their state writes."""
+from threading import Lock
+from time import monotonic
+
+# Maximum number of messages in one batch
+QUEUE_BATCH_SIZE = 64
+# Time after which an incomplete batch is put on the queue anyway
+QUEUE_FLUSH_INTERVAL = 0.02
+
+
+class BatchedQueue:
+    """Collect messages for a janus queue and put them on the queue as one batch.
+
+    The entity updaters get (received, messages) tuples from the queue, received is the
+    monotonic time at which the HCI event of the oldest message in the batch was received.
+    """
+
+    def __init__(self, queue, max_size=QUEUE_BATCH_SIZE):
+        """Initiate the batched queue."""
+        self.queue = queue
+        self.max_size = max_size
+        self._lock = Lock()
+        self._messages = []
+        self._received = None
+
+    def put(self, message, received):
+        """Add a message to the batch, returns True if the message started a new batch."""
+        with self._lock:
+            new_batch = not self._messages
+            if new_batch:
+                self._received = received
+            self._messages.append(message)
+            full = len(self._messages) >= self.max_size
+        if full:
+            self.flush()
+            return False
+        return new_batch
+
+    def flush(self):
+        """Put the collected messages on the queue."""
+        with self._lock:
+            messages = self._messages
+            received = self._received
+            self._messages = []
+        if messages:
+            self.queue.sync_q.put_nowait((received, messages))
+
+
+class BatchStats:
+    """Batch size and latency statistics of an entity updater."""
+
+    def __init__(self):
+        """Initiate the statistics."""
+        self.batches = 0
+        self.messages = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+
+    def record(self, size, received):
+        """Record a processed batch, received is the time the oldest message was received."""
+        latency = monotonic() - received
+        self.batches += 1
+        self.messages += size
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def log(self, logger, updater):
+        """Log the statistics of the previous period and reset them."""
+        if self.batches:
+            logger.debug(
+                "%i batches with on average %.1f messages received by the %s updater, "
+                "latency from HCI event to state update %.1f ms on average, %.1f ms max",
+                self.batches,
+                self.messages / self.batches,
+                updater,
+                1000 * self.latency_sum / self.batches,
+                1000 * self.latency_max,
+            )
+        self.__init__()
+
+
+class StateWrites:
+    """Coalesce the state writes of the entities of an entity updater.
+
+    Entities are collected while a batch of messages is processed, and the state of
+    every entity is written once when the batch is done, or, with a window, once per
+    window. Multiple updates of the same entity are merged into one (with a refresh,
+    if any of the updates asked for a refresh).
+    """
+
+    def __init__(self, window=0.0):
+        """Initiate the state writes, window is in seconds."""
+        self.window = window
+        self._pending = {}
+        self._first = None
+        self.requested = 0
+        self.written = 0
+
+    def schedule(self, entity, force_refresh=True):
+        """Add an entity of which the state has to be written."""
+        self.requested += 1
+        if entity in self._pending:
+            self._pending[entity] = self._pending[entity] or force_refresh
+            return
+        if not self._pending:
+            self._first = monotonic()
+        self._pending[entity] = force_refresh
+
+    def timeout(self, default):
+        """Return how long to wait for new messages, before pending state writes are due."""
+        if not self._pending or self.window <= 0:
+            return default
+        return max(0.0, min(default, self._first + self.window - monotonic()))
+
+    def flush(self):
+        """Write the state of the pending entities, if the window has passed."""
+        if not self._pending:
+            return
+        if self.window > 0 and monotonic() - self._first < self.window:
+            return
+        pending = self._pending
+        self._pending = {}
+        for entity, force_refresh in pending.items():
+            try:
+                entity.async_schedule_update_ha_state(force_refresh)
+            except AttributeError:
+                # entity is not added to Home Assistant (yet)
+                continue
+            self.written += 1
+
+    def log(self, logger, updater):
+        """Log the state writes of the previous period and reset the counters."""
+        if self.requested:
+            logger.debug(
+                "%i state updates requested by the %s updater, %i state writes scheduled",
+                self.requested,
+                updater,
+                self.written,
+            )
+        self.requested = 0
+        self.written = 0
@@ -20,18 +20,23 @@ from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import dt
 
+from .batch import BatchStats, StateWrites
 from .helper import (
     identifier_normalize,
     identifier_clean,
     detect_conf_type,
     dict_get_or,
     dict_get_or_normalize,
+    devices_by_id,
+    index_entity_types,
 )
 
 from .const import (
     AUTO_MANUFACTURER_DICT,
     AUTO_BINARY_SENSOR_LIST,
     CONF_PERIOD,
+    CONF_STATE_WRITE_WINDOW,
+    DEFAULT_STATE_WRITE_WINDOW,
     CONF_RESTORE_STATE,
     CONF_DEVICE_RESTORE_STATE,
     CONF_DEVICE_RESET_TIMER,
@@ -103,6 +108,12 @@ class BLEupdaterBinary:
         self.config = blemonitor.config
         self.period = self.config[CONF_PERIOD]
         self.add_entities = add_entities
+        # index of the configured devices by mac or uuid, passed to the entities
+        self.devices = devices_by_id(self.config[CONF_DEVICES] or [])
+        # index of the entity description and class per measurement key
+        self.sensor_types, self.sensor_keys_by_unique_id = index_entity_types(
+            BINARY_SENSOR_TYPES, globals()
+        )
         _LOGGER.debug("BLE binary sensors updater initialized")
 
     async def async_run(self, hass):
@@ -115,9 +126,10 @@ class BLEupdaterBinary:
                     if key not in sensors_by_key:
                         sensors_by_key[key] = {}
                     if measurement not in sensors_by_key[key]:
-                        description = [item for item in BINARY_SENSOR_TYPES if item.key is measurement][0]
-                        sensors[measurement] = globals()[description.sensor_class](
-                            self.config, key, device_model, firmware, description, manufacturer
+                        description, sensor_class = self.sensor_types[measurement]
+                        sensors[measurement] = sensor_class(
+                            self.config, key, device_model, firmware, description, manufacturer,
+                            self.devices,
                         )
                         self.add_entities([sensors[measurement]])
                         sensors_by_key[key].update(sensors)
@@ -129,9 +141,10 @@ class BLEupdaterBinary:
                     sensors = {}
                     sensors_by_key[key] = {}
                     for measurement in device_sensors:
-                        description = [item for item in BINARY_SENSOR_TYPES if item.key is measurement][0]
-                        sensors[measurement] = globals()[description.sensor_class](
-                            self.config, key, device_model, firmware, description, manufacturer
+                        description, sensor_class = self.sensor_types[measurement]
+                        sensors[measurement] = sensor_class(
+                            self.config, key, device_model, firmware, description, manufacturer,
+                            self.devices,
                         )
                         self.add_entities([sensors[measurement]])
                     sensors_by_key[key] = sensors
@@ -147,7 +160,10 @@ class BLEupdaterBinary:
         hpriority = []
         ts_last = dt.now()
         ts_now = ts_last
-        data = {}
+        batch_stats = BatchStats()
+        state_writes = StateWrites(
+            self.config.get(CONF_STATE_WRITE_WINDOW, DEFAULT_STATE_WRITE_WINDOW)
+        )
         await asyncio.sleep(0)
 
         # Set up binary sensors of configured devices on startup when device model is available in device registry
@@ -176,10 +192,9 @@ class BLEupdaterBinary:
                     # find the measurement key for each entity
                     for entity in entity_list:
                         unique_id_prefix = (entity.unique_id).removesuffix(key).removesuffix(dev.name)
-                        for binary_sensor_type in BINARY_SENSOR_TYPES:
-                            if binary_sensor_type.unique_id == unique_id_prefix:
-                                binary_sensor_key = binary_sensor_type.key
-                                auto_sensors.add(binary_sensor_key)
+                        auto_sensors.update(
+                            self.sensor_keys_by_unique_id.get(unique_id_prefix, ())
+                        )
                     if device_model and firmware and auto_sensors:
                         sensors = await async_add_binary_sensor(
                             key, device_model, firmware, auto_sensors, manufacturer
@@ -195,20 +210,22 @@ class BLEupdaterBinary:
         sensors = {}
         while True:
             try:
-                advevent = await asyncio.wait_for(self.dataqueue.get(), 1)
+                advevent = await asyncio.wait_for(
+                    self.dataqueue.get(), state_writes.timeout(1)
+                )
                 if advevent is None:
                     _LOGGER.debug("Entities updater loop stopped")
                     return True
-                data = advevent
+                received, messages = advevent
                 self.dataqueue.task_done()
             except asyncio.TimeoutError:
-                pass
+                received, messages = None, []
             if len(hpriority) > 0:
                 for entity in hpriority:
                     if entity.pending_update is True:
                         hpriority.remove(entity)
-                        entity.async_schedule_update_ha_state(True)
-            if data:
+                        state_writes.schedule(entity, True)
+            for data in messages:
                 _LOGGER.debug("Data binary sensor received: %s", data)
                 ble_adv_cnt += 1
                 key = identifier_clean(dict_get_or(data))
@@ -225,13 +242,17 @@ class BLEupdaterBinary:
                     for measurement in AUTO_BINARY_SENSOR_LIST:
                         if measurement in data:
                             auto_sensors.add(measurement)
-                sensors = await async_add_binary_sensor(
-                    key, device_model, firmware, auto_sensors, manufacturer
-                )
+                known_sensors = sensors_by_key.get(key)
+                if known_sensors is not None and auto_sensors.issubset(known_sensors):
+                    # known device without new measurements
+                    sensors = known_sensors
+                else:
+                    sensors = await async_add_binary_sensor(
+                        key, device_model, firmware, auto_sensors, manufacturer
+                    )
                 device_sensors = sensors.keys()
 
                 if data["data"] is False:
-                    data = None
                     continue
 
                 # battery attribute
@@ -248,7 +269,7 @@ class BLEupdaterBinary:
                                 ATTR_BATTERY_LEVEL
                             ] = batt_attr
                             if entity.pending_update is True:
-                                entity.async_schedule_update_ha_state(False)
+                                state_writes.schedule(entity, False)
                     else:
                         try:
                             batt_attr = batt[key]
@@ -261,12 +282,14 @@ class BLEupdaterBinary:
                         entity = sensors[measurement]
                         entity.collect(data, batt_attr)
                         if entity.pending_update is True:
-                            entity.async_schedule_update_ha_state(True)
+                            state_writes.schedule(entity, True)
                         elif (
                             entity.ready_for_update is False and entity.enabled is True
                         ):
                             hpriority.append(entity)
-                data = None
+            state_writes.flush()
+            if received is not None:
+                batch_stats.record(len(messages), received)
             ts_now = dt.now()
             if ts_now - ts_last < timedelta(seconds=self.period):
                 continue
@@ -276,6 +299,8 @@ class BLEupdaterBinary:
                 ble_adv_cnt,
                 len(sensors_by_key),
             )
+            batch_stats.log(_LOGGER, "binary sensor")
+            state_writes.log(_LOGGER, "binary sensor")
             ble_adv_cnt = 0
 
 
@@ -289,11 +314,14 @@ class BaseBinarySensor(RestoreEntity, BinarySensorEntity):
         devtype: str,
         firmware: str,
         description: BLEMonitorBinarySensorEntityDescription,
-        manufacturer=None
+        manufacturer=None,
+        devices=None,
     ) -> None:
         """Initialize the binary sensor."""
         self.entity_description = description
         self._config = config
+        # configured devices by mac or uuid, see devices_by_id
+        self._devices = devices
         self._type = detect_conf_type(key)
 
         self._key = key
@@ -407,18 +435,20 @@ class BaseBinarySensor(RestoreEntity, BinarySensorEntity):
 
         # overrule settings with device setting if available
         if self._config[CONF_DEVICES]:
-            for device in self._config[CONF_DEVICES]:
-                if self._fkey.upper() == dict_get_or(device).upper():
-                    if id_selector in device:
-                        # get device name (from YAML config)
-                        dev_name = device[id_selector]
-                    if CONF_DEVICE_RESTORE_STATE in device:
-                        if isinstance(device[CONF_DEVICE_RESTORE_STATE], bool):
-                            dev_restore_state = device[CONF_DEVICE_RESTORE_STATE]
-                        else:
-                            dev_restore_state = self._config[CONF_RESTORE_STATE]
-                    if CONF_DEVICE_RESET_TIMER in device:
-                        dev_reset_timer = device[CONF_DEVICE_RESET_TIMER]
+            devices = self._devices
+            if devices is None:
+                devices = devices_by_id(self._config[CONF_DEVICES])
+            for device in devices.get(self._fkey.upper(), []):
+                if id_selector in device:
+                    # get device name (from YAML config)
+                    dev_name = device[id_selector]
+                if CONF_DEVICE_RESTORE_STATE in device:
+                    if isinstance(device[CONF_DEVICE_RESTORE_STATE], bool):
+                        dev_restore_state = device[CONF_DEVICE_RESTORE_STATE]
+                    else:
+                        dev_restore_state = self._config[CONF_RESTORE_STATE]
+                if CONF_DEVICE_RESET_TIMER in device:
+                    dev_reset_timer = device[CONF_DEVICE_RESET_TIMER]
         device_settings = {
             "name": dev_name,
             "restore_state": dev_restore_state,
@@ -512,9 +542,9 @@ class BaseBinarySensor(RestoreEntity, BinarySensorEntity):
 class MotionBinarySensor(BaseBinarySensor):
     """Representation of a Motion Binary Sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._start_timer = None
 
     def reset_state(self, event=None):
@@ -1,44 +1,14 @@
 """Parser for passive BLE advertisements."""
 from typing import Optional
 import logging
+import re
+from time import monotonic
 
-from .acconeer import parse_acconeer
-from .airmentor import parse_airmentor
-from .almendo import parse_almendo
-from .altbeacon import parse_altbeacon
-from .atc import parse_atc
-from .bluemaestro import parse_bluemaestro
-from .bparasite import parse_bparasite
-from .brifit import parse_brifit
-from .const import TILT_TYPES
-from .govee import parse_govee
+from .cache import DeviceCache
+from .ccm import AesCcm
+from .const import MISSING_KEY_REPORT_INTERVAL
+from .dispatch import match_man_spec_data, match_service_data
 from .helpers import to_mac, to_unformatted_mac
-from .bthome import parse_bthome
-from .hhcc import parse_hhcc
-from .ibeacon import parse_ibeacon
-from .inkbird import parse_inkbird
-from .inode import parse_inode
-from .jinou import parse_jinou
-from .kegtron import parse_kegtron
-from .kkm import parse_kkm
-from .laica import parse_laica
-from .miscale import parse_miscale
-from .mikrotik import parse_mikrotik
-from .moat import parse_moat
-from .oral_b import parse_oral_b
-from .qingping import parse_qingping
-from .relsib import parse_relsib
-from .ruuvitag import parse_ruuvitag
-from .sensorpush import parse_sensorpush
-from .sensirion import parse_sensirion
-from .switchbot import parse_switchbot
-from .smartdry import parse_smartdry
-from .teltonika import parse_teltonika
-from .thermoplus import parse_thermoplus
-from .thermopro import parse_thermopro
-from .tilt import parse_tilt
-from .xiaomi import parse_xiaomi
-from .xiaogui import parse_xiaogui
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -75,9 +45,64 @@ class BleParser:
         else:
             self.aeskeys = aeskeys
 
-        self.lpacket_ids = {}
-        self.movements_list = {}
-        self.adv_priority = {}
+        self.lpacket_ids = DeviceCache()
+        self.movements_list = DeviceCache()
+        self.adv_priority = DeviceCache()
+        # last accepted advertisement payload per MAC, to drop repeated frames before decoding
+        self.adv_payloads = DeviceCache()
+        # prepared AES-CCM ciphers per encryption key and last report of a missing key per device
+        self.ciphers = {}
+        self.missing_keys = DeviceCache()
+
+        # counters of the frames that are rejected by the whitelist prefilter and fully parsed
+        self.frames_rejected = 0
+        self.frames_parsed = 0
+        self.prefilter_macs = None
+        self.prefilter_ids = None
+        if self.discovery is False and not self.report_unknown:
+            self.compile_prefilter()
+
+    def compile_prefilter(self):
+        """Compile the whitelists for rejecting frames before they are parsed.
+
+        Frames are accepted when the advertiser MAC is whitelisted, or when a whitelisted
+        MAC/UUID is found in the frame (payload MACs, iBeacon/AltBeacon UUIDs, relayed data).
+        """
+        identifiers = set()
+        for key in [*self.sensor_whitelist, *self.tracker_whitelist, *self.report_unknown_whitelist]:
+            identifiers.add(bytes(key))
+        self.prefilter_macs = set()
+        for key in identifiers:
+            if len(key) == 6:
+                self.prefilter_macs.add(key)
+                # Govee H5178 reports the outdoor sensor with the advertiser MAC + 1
+                outdoor_mac = (int.from_bytes(key, "big") - 1) % (1 << 48)
+                self.prefilter_macs.add(outdoor_mac.to_bytes(6, "big"))
+        patterns = set()
+        for key in identifiers:
+            patterns.add(re.escape(key))
+            patterns.add(re.escape(key[::-1]))
+        self.prefilter_ids = re.compile(b"|".join(sorted(patterns))) if patterns else None
+
+    def get_cipher(self, key):
+        """Return the prepared AES-CCM cipher for an encryption key."""
+        try:
+            return self.ciphers[key]
+        except KeyError:
+            cipher = self.ciphers[key] = AesCcm(key)
+            return cipher
+
+    def should_report_missing_key(self, mac):
+        """Return True if the missing encryption key of a device should be logged.
+
+        The missing key is reported at most once per MISSING_KEY_REPORT_INTERVAL seconds.
+        """
+        now = monotonic()
+        last_report = self.missing_keys.get(mac)
+        if last_report is not None and now - last_report < MISSING_KEY_REPORT_INTERVAL:
+            return False
+        self.missing_keys[mac] = now
+        return True
 
     def parse_raw_data(self, data):
         """Parse the raw data."""
@@ -106,6 +131,20 @@ class BleParser:
             rssi = rssi - 256
         # MAC address
         mac = (data[8 if is_ext_packet else 7:14 if is_ext_packet else 13])[::-1]
+        # reject frames of devices that are not whitelisted, if discovery is disabled
+        if self.prefilter_macs is not None and mac not in self.prefilter_macs:
+            if self.prefilter_ids is None or self.prefilter_ids.search(data) is None:
+                self.frames_rejected += 1
+                return None, None
+        # drop byte-identical repeats of the last accepted advertisement with a packet id,
+        # only the tracker data of the accepted advertisement is returned (with the new RSSI)
+        if self.filter_duplicates is True:
+            adpayload = data[adpayload_start:adpayload_start + adpayload_size]
+            accepted = self.adv_payloads.get(mac)
+            if accepted is not None and accepted[0] == adpayload:
+                tracker_data = accepted[1]
+                return None, None if tracker_data is None else {**tracker_data, "rssi": rssi}
+        self.frames_parsed += 1
         complete_local_name = ""
         shortened_local_name = ""
         service_class_uuid16 = None
@@ -158,6 +197,17 @@ class BleParser:
             service_data_list,
             man_spec_data_list
         )
+        if self.filter_duplicates is True:
+            if (
+                sensor_data
+                and sensor_data.get("packet", "no packet id") != "no packet id"
+                and not self.report_unknown
+                and sensor_data.get("tracker_id", mac) not in self.report_unknown_whitelist
+            ):
+                # advertisements that can be logged by report_unknown are parsed every time
+                self.adv_payloads[mac] = (adpayload, None if tracker_data is None else dict(tracker_data))
+            else:
+                self.adv_payloads.pop(mac, None)
         return sensor_data, tracker_data
 
     def parse_advertisement(
@@ -179,249 +229,46 @@ class BleParser:
         if man_spec_data_list is None:
             man_spec_data_list = []
 
-        while not sensor_data:
-            if service_data_list:
-                for service_data in service_data_list:
-                    # parse data for sensors with service data
-                    uuid16 = (service_data[3] << 8) | service_data[2]
-                    if uuid16 == 0x181A:
-                        # UUID16 = Environmental Sensing (used by ATC or b-parasite)
-                        if len(service_data) == 22 or len(service_data) == 20:
-                            sensor_data = parse_bparasite(self, service_data, mac, rssi)
-                        else:
-                            sensor_data = parse_atc(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 in [0x181B, 0x181D]:
-                        # UUID16 = Body Composition and Weight Scale (used by Mi Scale)
-                        sensor_data = parse_miscale(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 in [0x181C, 0x181E]:
-                        # UUID16 = User Data and Bond Management (used by BTHome)
-                        sensor_data = parse_bthome(self, service_data, uuid16, mac, rssi)
-                        break
-                    elif uuid16 in [0xAA20, 0xAA21, 0xAA22] and local_name == "ECo":
-                        # UUID16 = Relsib
-                        sensor_data = parse_relsib(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 in [0xFD3D, 0x0D00]:
-                        # UUID16 = unknown (used by Switchbot)
-                        sensor_data = parse_switchbot(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 == 0xFD50:
-                        # UUID16 = Hangzhou Tuya Information Technology Co., Ltd (HHCC)
-                        sensor_data = parse_hhcc(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 == 0xFDCD:
-                        # UUID16 = Qingping
-                        sensor_data = parse_qingping(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 == 0xFE95:
-                        # UUID16 = Xiaomi
-                        sensor_data = parse_xiaomi(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 == 0xFEAA:
-                        if len(service_data) == 19:
-                            # UUID16 = Google (used by KKM)
-                            sensor_data = parse_kkm(self, service_data, mac, rssi)
-                            break
-                        elif len(service_data) >= 23:
-                            # UUID16 = Google (used by Ruuvitag V2/V4)
-                            sensor_data = parse_ruuvitag(self, service_data, mac, rssi)
-                            break
-                    elif uuid16 == 0xFFF9:
-                        # UUID16 = FIDO (used by Cleargrass)
-                        sensor_data = parse_qingping(self, service_data, mac, rssi)
-                        break
-                    elif uuid16 == 0x2A6E or uuid16 == 0x2A6F:
-                        # UUID16 = Temperature and Humidity (used by Teltonika)
-                        if len(service_data_list) == 2:
-                            service_data = b"".join(service_data_list)
-                        sensor_data = parse_teltonika(self, service_data, local_name, mac, rssi)
-                        break
-                    else:
-                        unknown_sensor = True
-            elif man_spec_data_list:
-                for man_spec_data in man_spec_data_list:
-                    # parse data for sensors with manufacturer specific data
-                    comp_id = (man_spec_data[3] << 8) | man_spec_data[2]
-                    data_len = man_spec_data[0]
-                    # Filter on Company Identifier
-                    if comp_id == 0x0001 and data_len in [0x09, 0x0C, 0x22, 0x25]:
-                        # Govee H5101/H5102/H5177
-                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x004C and man_spec_data[4] == 0x02:
-                        # iBeacon
-                        if int.from_bytes(man_spec_data[6:22], byteorder='big') in TILT_TYPES:
-                            sensor_data, tracker_data = parse_tilt(self, man_spec_data, mac, rssi)
-                        else:
-                            sensor_data, tracker_data = parse_ibeacon(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x00DC and data_len == 0x0E:
-                        # Oral-b
-                        sensor_data = parse_oral_b(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x0499:
-                        # Ruuvitag V3/V5
-                        sensor_data = parse_ruuvitag(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x094F and data_len == 0x15:
-                        # Mikrotik
-                        sensor_data = parse_mikrotik(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x06E8:
-                        # Almendo (Blusensor)
-                        sensor_data = parse_almendo(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x1000 and data_len == 0x15:
-                        # Moat S2
-                        sensor_data = parse_moat(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x0133 and data_len == 0x11:
-                        # BlueMaestro
-                        sensor_data = parse_bluemaestro(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x01AE and data_len == 0x0F:
-                        # SmartDry
-                        sensor_data = parse_smartdry(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x06D5:
-                        # Sensirion
-                        sensor_data = parse_sensirion(self, man_spec_data, local_name, mac, rssi)
-                        break
-                    elif comp_id in [0x2121, 0x2122] and data_len == 0x0B:
-                        # Air Mentor
-                        sensor_data = parse_airmentor(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0x8801 and data_len in [0x0C, 0x25]:
-                        # Govee H5179
-                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0xAA55 and data_len == 0x14:
-                        # Brifit
-                        sensor_data = parse_brifit(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0xEC88 and data_len in [0x09, 0x0A, 0x0C, 0x22, 0x24, 0x25]:
-                        # Govee H5051/H5071/H5072/H5075/H5074
-                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0xFFFF and data_len == 0x1E:
-                        # Kegtron
-                        sensor_data = parse_kegtron(self, man_spec_data, mac, rssi)
-                        break
-                    elif comp_id == 0xA0AC and data_len == 0x0F and man_spec_data[14] in [0x06, 0x0D]:
-                        # Laica
-                        sensor_data = parse_laica(self, man_spec_data, mac, rssi)
-                        break
-
-                    # Filter on part of the UUID16
-                    elif man_spec_data[2] == 0xC0 and data_len == 0x10:
-                        # Xiaogui Scale
-                        sensor_data = parse_xiaogui(self, man_spec_data, mac, rssi)
-                        break
-                    elif man_spec_data[3] == 0x82 and data_len == 0x0E:
-                        # iNode
-                        sensor_data = parse_inode(self, man_spec_data, mac, rssi)
-                        break
-                    elif man_spec_data[3] in [
-                        0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x9A, 0x9B, 0x9C, 0x9D
-                    ] and data_len == 0x19:
-                        # iNode Care Sensors
-                        sensor_data = parse_inode(self, man_spec_data, mac, rssi)
-                        break
-
-                    # Filter on service class uuid16
-                    elif service_class_uuid16 == 0x20AA and data_len == 0x0E:
-                        # Jinou BEC07-5
-                        sensor_data = parse_jinou(self, man_spec_data, mac, rssi)
-                        break
-                    elif service_class_uuid16 == 0x5182 and data_len in [0x14, 0x2D]:
-                        # Govee H5182
-                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
-                        break
-                    elif service_class_uuid16 == 0x5183 and data_len in [0x11, 0x2A]:
-                        # Govee H5183
-                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
-                        break
-                    elif service_class_uuid16 == 0x5185 and data_len in [0x17, 0x30]:
-                        # Govee H5185
-                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
-                        break
-                    elif service_class_uuid16 == 0xF0FF:
-                        if comp_id in [0x0010, 0x0011, 0x0015] and data_len in [0x15, 0x17]:
-                            # Thermoplus
-                            sensor_data = parse_thermoplus(self, man_spec_data, mac, rssi)
-                            break
-                        elif (comp_id in [0x0000, 0x0001] or local_name in ["iBBQ", "xBBQ", "sps", "tps"]) and (
-                            data_len in [0x0A, 0x0D, 0x0F, 0x13, 0x17]
-                        ):
-                            # Inkbird
-                            sensor_data = parse_inkbird(self, man_spec_data, local_name, mac, rssi)
-                            break
-                        else:
-                            unknown_sensor = True
-
-                    # Filter on service class uuid128
-                    elif service_class_uuid128 == (
-                        b'\xb0\x0a\x09\xec\xd7\x9d\xb8\x93\xba\x42\xd6\x11\x00\x00\x09\xef'
-                    ) and data_len in [0x06, 0x08]:
-                        # Sensorpush
-                        sensor_data = parse_sensorpush(self, man_spec_data, mac, rssi)
-                        break
-
-                    # Filter on complete local name
-                    elif local_name in ["sps", "tps"] and data_len == 0x0A:
-                        # Inkbird IBS-TH
-                        sensor_data = parse_inkbird(self, man_spec_data, local_name, mac, rssi)
-                        break
-                    elif local_name[0:5] in ["TP357", "TP359"] and data_len == 0x07:
-                        # Thermopro
-                        sensor_data = parse_thermopro(self, man_spec_data, local_name[0:5], mac, rssi)
-                        break
-
-                    # Filter on other parts of the manufacturer specific data
-                    elif data_len == 0x1B and ((man_spec_data[4] << 8) | man_spec_data[5]) == 0xBEAC:
-                        # AltBeacon
-                        sensor_data, tracker_data = parse_altbeacon(self, man_spec_data, comp_id, mac, rssi)
-                        break
-
-                    elif man_spec_data[0] == 0x12 and comp_id == 0xACC0:  # Acconeer
-                        sensor_data = parse_acconeer(self, man_spec_data, mac, rssi)
-                        break
-                    else:
-                        unknown_sensor = True
+        adv = (local_name, service_class_uuid16, service_class_uuid128, service_data_list)
+        if service_data_list:
+            # parse data for sensors with service data
+            for service_data in service_data_list:
+                handler = match_service_data(service_data, adv)
+                if handler is not None:
+                    sensor_data, tracker_data = handler(self, service_data, mac, rssi, adv)
+                    break
             else:
                 unknown_sensor = True
-            if unknown_sensor and self.report_unknown == "Other":
-                _LOGGER.info(
-                    "Unknown advertisement received for mac: %s"
-                    "service data: %s"
-                    "manufacturer specific data: %s"
-                    "local name: %s"
-                    "UUID16: %s,"
-                    "UUID128: %s",
-                    to_mac(mac),
-                    service_data_list,
-                    man_spec_data_list,
-                    local_name,
-                    service_class_uuid16,
-                    service_class_uuid128,
-                )
-            break
+        elif man_spec_data_list:
+            # parse data for sensors with manufacturer specific data
+            for man_spec_data in man_spec_data_list:
+                handler = match_man_spec_data(man_spec_data, adv)
+                if handler is not None:
+                    sensor_data, tracker_data = handler(self, man_spec_data, mac, rssi, adv)
+                    break
+            else:
+                unknown_sensor = True
+        else:
+            unknown_sensor = True
+        if unknown_sensor and self.report_unknown == "Other":
+            _LOGGER.info(
+                "Unknown advertisement received for mac: %s"
+                "service data: %s"
+                "manufacturer specific data: %s"
+                "local name: %s"
+                "UUID16: %s,"
+                "UUID128: %s",
+                to_mac(mac),
+                service_data_list,
+                man_spec_data_list,
+                local_name,
+                service_class_uuid16,
+                service_class_uuid128,
+            )
 
         # check for monitored device trackers
         tracker_id = tracker_data['tracker_id'] if tracker_data and 'tracker_id' in tracker_data else mac
-        if tracker_id in self.tracker_whitelist:
-            if tracker_data is not None:
-                tracker_data.update({"is connected": True})
-            else:
-                tracker_data = {
-                    "is connected": True,
-                    "mac": to_unformatted_mac(mac),
-                    "rssi": rssi,
-                }
-        else:
-            tracker_data = None
+        tracker_data = self.parse_tracker(mac, rssi, tracker_id, tracker_data)
 
         if self.report_unknown_whitelist:
             if tracker_id in self.report_unknown_whitelist:
@@ -441,3 +288,18 @@ class BleParser:
                 )
 
         return sensor_data, tracker_data
+
+    def parse_tracker(self, mac: bytes, rssi: int, tracker_id: Optional[bytes] = None, tracker_data=None):
+        """Return tracker data if the device is a monitored device tracker."""
+        if tracker_id is None:
+            tracker_id = mac
+        if tracker_id not in self.tracker_whitelist:
+            return None
+        if tracker_data is not None:
+            tracker_data.update({"is connected": True})
+            return tracker_data
+        return {
+            "is connected": True,
+            "mac": to_unformatted_mac(mac),
+            "rssi": rssi,
+        }
@@ -1,7 +1,6 @@
 """Parser for ATC BLE advertisements"""
 import logging
 from struct import unpack
-from Cryptodome.Cipher import AES
 
 from .helpers import (
     to_mac,
@@ -153,19 +152,19 @@ def decrypt_atc(self, data, atc_mac):
         if len(key) != 16:
             _LOGGER.error("Encryption key should be 16 bytes (32 characters) long")
     except KeyError:
-        # no encryption key found
-        _LOGGER.error("No encryption key found for ATC device with MAC: %s", to_mac(atc_mac))
+        # no encryption key found, reported at most once per MISSING_KEY_REPORT_INTERVAL
+        if self.should_report_missing_key(atc_mac):
+            _LOGGER.error("No encryption key found for ATC device with MAC: %s", to_mac(atc_mac))
         return None
     # prepare the data for decryption
     nonce = b"".join([atc_mac[::-1], data[:5]])
     cipherpayload = data[5:-4]
     aad = b"\x11"
     token = data[-4:]
-    cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
-    cipher.update(aad)
+    cipher = self.get_cipher(key)
     # decrypt the data
     try:
-        decrypted_payload = cipher.decrypt_and_verify(cipherpayload, token)
+        decrypted_payload = cipher.decrypt_and_verify(nonce, cipherpayload, aad, token)
     except ValueError as error:
         _LOGGER.warning("Decryption failed: %s", error)
         _LOGGER.debug("token: %s", token.hex())
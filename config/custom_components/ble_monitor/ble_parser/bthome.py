@@ -1,7 +1,6 @@
 """Parser for BTHome (DIY sensors) advertisements"""
 import logging
 import struct
-from Cryptodome.Cipher import AES
 
 from .helpers import (
     to_mac,
@@ -85,6 +84,48 @@ DATA_MEAS_DICT = {
 }
 
 
+# struct format characters of the data formats (uint, int, float) per data length
+STRUCT_FORMATS = {
+    0x00: {1: "B", 2: "H", 4: "I", 8: "Q"},
+    0x01: {1: "b", 2: "h", 4: "i", 8: "q"},
+    0x02: {2: "e", 4: "f", 8: "d"},
+}
+
+
+def compile_decoders():
+    """Build the decoder table of all measurement objects.
+
+    The table is keyed on (control byte, object id) and holds the measurement type,
+    the unpack_from of a precompiled struct (None for data lengths without a struct
+    format, these fall back to the dispatch function), factor, rounding digits and
+    the dispatch function.
+    """
+    structs = {}
+    decoders = {}
+    for obj_meas_type, (meas_type, meas_factor, _) in DATA_MEAS_DICT.items():
+        decimal_places = -int(f'{meas_factor:e}'.split('e')[-1])
+        for obj_data_format in (0x00, 0x01, 0x02, 0x03):
+            for obj_data_length in range(1, 32):
+                struct_format = STRUCT_FORMATS.get(obj_data_format, {}).get(obj_data_length - 1)
+                unpack_from = None
+                if struct_format is not None:
+                    if struct_format not in structs:
+                        structs[struct_format] = struct.Struct("<" + struct_format)
+                    unpack_from = structs[struct_format].unpack_from
+                obj_control_byte = obj_data_format << 5 | obj_data_length
+                decoders[(obj_control_byte, obj_meas_type)] = (
+                    meas_type,
+                    unpack_from,
+                    meas_factor,
+                    decimal_places,
+                    dispatch[obj_data_format],
+                )
+    return decoders
+
+
+BTHOME_DECODERS = compile_decoders()
+
+
 def parse_bthome(self, data, uuid16, source_mac, rssi):
     """BTHome BLE parser"""
     device_type = "BTHome"
@@ -117,8 +158,7 @@ def parse_bthome(self, data, uuid16, source_mac, rssi):
 
     while payload_length >= payload_start + 1:
         obj_control_byte = payload[payload_start]
-        obj_data_length = (obj_control_byte >> 0) & 31  # 5 bits (0-4)
-        obj_data_format = (obj_control_byte >> 5) & 7  # 3 bits (5-7)
+        obj_data_length = obj_control_byte & 31  # 5 bits (0-4)
         obj_meas_type = payload[payload_start + 1]
         next_start = payload_start + 1 + obj_data_length
         if payload_length < next_start:
@@ -126,23 +166,17 @@ def parse_bthome(self, data, uuid16, source_mac, rssi):
             break
 
         if obj_data_length != 0:
-            if obj_data_format <= 3:
-                if obj_meas_type in DATA_MEAS_DICT:
-                    meas_data = payload[payload_start + 2:next_start]
-                    meas_type = DATA_MEAS_DICT[obj_meas_type][0]
-                    meas_factor = DATA_MEAS_DICT[obj_meas_type][1]
-                    meas_unit = DATA_MEAS_DICT[obj_meas_type][2]
-                    meas = dispatch[obj_data_format](meas_data, meas_factor)
-                    result.update({meas_type: meas})
-                    if obj_data_format == 0x07:
-                        # Weight measurement with non-standard unit of measurement (lb)
-                        result.update({"weight unit": meas_unit})
-
+            decoder = BTHOME_DECODERS.get((obj_control_byte, obj_meas_type))
+            if decoder is not None:
+                meas_type, unpack_from, meas_factor, decimal_places, parse = decoder
+                if unpack_from is not None:
+                    result[meas_type] = round(
+                        unpack_from(payload, payload_start + 2)[0] * meas_factor, decimal_places
+                    )
                 else:
-                    if self.report_unknown == "BTHome":
-                        _LOGGER.error("UNKNOWN dataobject in BTHome payload! Adv: %s", data.hex())
-            elif obj_data_format == 4:
-                data_mac = dispatch[obj_data_format](payload[payload_start + 1:next_start])
+                    result[meas_type] = parse(payload[payload_start + 2:next_start], meas_factor)
+            elif obj_control_byte >> 5 == 4:
+                data_mac = parse_mac(payload[payload_start + 1:next_start])
                 if data_mac:
                     ha_ble_mac = data_mac
             else:
@@ -197,9 +231,6 @@ def parse_bthome(self, data, uuid16, source_mac, rssi):
 
 def decrypt_data(self, data, ha_ble_mac):
     """Decrypt encrypted BTHome advertisements"""
-    # check for minimum length of encrypted advertisement
-    if len(data) < 15:
-        _LOGGER.debug("Invalid data length (for decryption), adv: %s", data.hex())
     # try to find encryption key for current device
     try:
         key = self.aeskeys[ha_ble_mac]
@@ -207,9 +238,13 @@ def decrypt_data(self, data, ha_ble_mac):
             _LOGGER.error("Encryption key should be 16 bytes (32 characters) long")
             return None, None
     except KeyError:
-        # no encryption key found
-        _LOGGER.error("No encryption key found for device with MAC %s", to_mac(ha_ble_mac))
+        # no encryption key found, reported at most once per MISSING_KEY_REPORT_INTERVAL
+        if self.should_report_missing_key(ha_ble_mac):
+            _LOGGER.error("No encryption key found for device with MAC %s", to_mac(ha_ble_mac))
         return None, None
+    # check for minimum length of encrypted advertisement
+    if len(data) < 15:
+        _LOGGER.debug("Invalid data length (for decryption), adv: %s", data.hex())
     uuid = data[2:4]
     encrypted_payload = data[4:-8]
     count_id = data[-8:-4]
@@ -217,10 +252,9 @@ def decrypt_data(self, data, ha_ble_mac):
 
     # nonce: mac [6], uuid16 [2], count_id [4] (6+2+4 = 12 bytes)
     nonce = b"".join([ha_ble_mac, uuid, count_id])
-    cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
-    cipher.update(b"\x11")
+    cipher = self.get_cipher(key)
     try:
-        decrypted_payload = cipher.decrypt_and_verify(encrypted_payload, mic)
+        decrypted_payload = cipher.decrypt_and_verify(nonce, encrypted_payload, b"\x11", mic)
     except ValueError as error:
         _LOGGER.warning("Decryption failed: %s", error)
         _LOGGER.debug("mic: %s", mic.hex())
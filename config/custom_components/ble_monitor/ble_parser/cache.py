@@ -0,0 +1,66 @@
+"""Bounded per device cache for the ble_parser"""
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from time import monotonic
+
+from .const import DEVICE_CACHE_SIZE, DEVICE_CACHE_TTL
+
+
+class DeviceCache(MutableMapping):
+    """Dict with per device state, bounded in size.
+
+    Devices that haven't been seen (read or written) for ttl seconds expire, and the
+    least recently seen device is dropped when more than maxsize devices are stored.
+    """
+
+    def __init__(self, maxsize=DEVICE_CACHE_SIZE, ttl=DEVICE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def __getitem__(self, key):
+        value, last_seen = self._data[key]
+        now = monotonic()
+        if now - last_seen > self.ttl:
+            del self._data[key]
+            raise KeyError(key)
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key not in self._data:
+            return default
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        if key in self._data:
+            value, last_seen = self._data.pop(key)
+            if monotonic() - last_seen <= self.ttl:
+                return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        now = monotonic()
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        # drop the least recently seen devices, if expired or above the maximum size
+        while self._data:
+            oldest_key, (_, last_seen) = next(iter(self._data.items()))
+            if len(self._data) <= self.maxsize and now - last_seen <= self.ttl:
+                break
+            del self._data[oldest_key]
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,36 @@
+"""AES-CCM decryption with a prepared AES key, for encrypted BLE advertisements"""
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESCCM
+
+
+class AesCcm:
+    """AES-CCM cipher (RFC 3610) that can be reused for many nonces.
+
+    The AESCCM cipher of the cryptography package is prepared once per encryption key,
+    instead of setting up a new cipher for every single message.
+    """
+
+    def __init__(self, key, mac_len=4):
+        self._aead = AESCCM(key, tag_length=mac_len)
+        self._aes = algorithms.AES(key)
+        self.mac_len = mac_len
+
+    def decrypt(self, nonce, cipherpayload):
+        """Decrypt without verifying the MIC (the CTR part of CCM, from counter 1)"""
+        size_len = 15 - len(nonce)
+        counter = bytes([size_len - 1]) + nonce + (1).to_bytes(size_len, "big")
+        decryptor = Cipher(self._aes, modes.CTR(counter)).decryptor()
+        return decryptor.update(cipherpayload) + decryptor.finalize()
+
+    def decrypt_and_verify(self, nonce, cipherpayload, aad, token):
+        """Decrypt and verify the MIC, raises ValueError if the MIC doesn't match"""
+        try:
+            return self._aead.decrypt(nonce, cipherpayload + token, aad)
+        except InvalidTag as error:
+            raise ValueError("MAC check failed") from error
+
+    def encrypt_and_digest(self, nonce, payload, aad):
+        """Encrypt and return the cipherpayload and MIC"""
+        data = self._aead.encrypt(nonce, payload, aad)
+        return data[:-self.mac_len], data[-self.mac_len:]
@@ -26,6 +26,13 @@ CONF_UUID: Final = "uuid"
 
 DEFAULT_MANUFACTURER: Final = "Other"
 
+# Per device state of the parser (packet ids, adv priority, ...) is kept for at most
+# DEVICE_CACHE_SIZE devices and dropped when a device hasn't been seen for DEVICE_CACHE_TTL seconds
+DEVICE_CACHE_SIZE: Final = 2048
+DEVICE_CACHE_TTL: Final = 3600
+# A missing encryption key is reported at most once per MISSING_KEY_REPORT_INTERVAL seconds per device
+MISSING_KEY_REPORT_INTERVAL: Final = 600
+
 MANUFACTURER_DICT: Final = {
     0x0000: "Ericsson Technology Licensing",
     0x0001: "Nokia Mobile Phones",
@@ -0,0 +1,300 @@
+"""Dispatch tables for passive BLE advertisements.
+
+Each supported sensor is described by a rule, consisting of the data lengths it
+accepts, an optional extra condition and the handler that parses it. The rules
+are indexed per AD type (service data or manufacturer specific data) on the
+UUID16 / Company Identifier, so the right parser is found with a single dict
+lookup and unknown advertisements are rejected without walking all sensors.
+
+Handlers are called as handler(self, data, mac, rssi, adv) with adv a tuple of
+(local_name, service_class_uuid16, service_class_uuid128, service_data_list) and
+return a tuple (sensor_data, tracker_data). The name of the parser is set on the
+handler as parser_name, e.g. to group the advertisements per parser in benchmarks.
+"""
+from .acconeer import parse_acconeer
+from .airmentor import parse_airmentor
+from .almendo import parse_almendo
+from .altbeacon import parse_altbeacon
+from .atc import parse_atc
+from .bluemaestro import parse_bluemaestro
+from .bparasite import parse_bparasite
+from .brifit import parse_brifit
+from .const import TILT_TYPES
+from .govee import parse_govee
+from .bthome import parse_bthome
+from .hhcc import parse_hhcc
+from .ibeacon import parse_ibeacon
+from .inkbird import parse_inkbird
+from .inode import parse_inode
+from .jinou import parse_jinou
+from .kegtron import parse_kegtron
+from .kkm import parse_kkm
+from .laica import parse_laica
+from .miscale import parse_miscale
+from .mikrotik import parse_mikrotik
+from .moat import parse_moat
+from .oral_b import parse_oral_b
+from .qingping import parse_qingping
+from .relsib import parse_relsib
+from .ruuvitag import parse_ruuvitag
+from .sensorpush import parse_sensorpush
+from .sensirion import parse_sensirion
+from .switchbot import parse_switchbot
+from .smartdry import parse_smartdry
+from .teltonika import parse_teltonika
+from .thermoplus import parse_thermoplus
+from .thermopro import parse_thermopro
+from .tilt import parse_tilt
+from .xiaomi import parse_xiaomi
+from .xiaogui import parse_xiaogui
+
+# Index in the adv tuple that is passed to the handlers and conditions
+LOCAL_NAME = 0
+SERVICE_CLASS_UUID16 = 1
+SERVICE_CLASS_UUID128 = 2
+SERVICE_DATA_LIST = 3
+
+# Handler of rules that match, but are not supported (reported as unknown)
+UNKNOWN = None
+
+SENSORPUSH_UUID128 = b'\xb0\x0a\x09\xec\xd7\x9d\xb8\x93\xba\x42\xd6\x11\x00\x00\x09\xef'
+
+
+def _parser(name):
+    """Set the name of the parser on a handler."""
+    def decorator(handler):
+        handler.parser_name = name
+        return handler
+    return decorator
+
+
+def _sensor(parse_func):
+    """Handler for parsers with signature parse_func(self, data, mac, rssi)."""
+    @_parser(parse_func.__name__.replace("parse_", ""))
+    def handler(self, data, mac, rssi, adv):
+        return parse_func(self, data, mac, rssi), None
+    return handler
+
+
+def _sensor_with_name(parse_func):
+    """Handler for parsers that also need the local name."""
+    @_parser(parse_func.__name__.replace("parse_", ""))
+    def handler(self, data, mac, rssi, adv):
+        return parse_func(self, data, adv[LOCAL_NAME], mac, rssi), None
+    return handler
+
+
+@_parser("bthome")
+def _bthome(self, data, mac, rssi, adv):
+    uuid16 = (data[3] << 8) | data[2]
+    return parse_bthome(self, data, uuid16, mac, rssi), None
+
+
+@_parser("teltonika")
+def _teltonika(self, data, mac, rssi, adv):
+    service_data_list = adv[SERVICE_DATA_LIST]
+    if len(service_data_list) == 2:
+        data = b"".join(service_data_list)
+    return parse_teltonika(self, data, adv[LOCAL_NAME], mac, rssi), None
+
+
+@_parser("ibeacon")
+def _ibeacon(self, data, mac, rssi, adv):
+    if int.from_bytes(data[6:22], byteorder='big') in TILT_TYPES:
+        return parse_tilt(self, data, mac, rssi)
+    return parse_ibeacon(self, data, mac, rssi)
+
+
+@_parser("altbeacon")
+def _altbeacon(self, data, mac, rssi, adv):
+    comp_id = (data[3] << 8) | data[2]
+    return parse_altbeacon(self, data, comp_id, mac, rssi)
+
+
+@_parser("thermopro")
+def _thermopro(self, data, mac, rssi, adv):
+    return parse_thermopro(self, data, adv[LOCAL_NAME][0:5], mac, rssi), None
+
+
+# Service data (AD type 0x16), indexed on UUID16.
+# Rules: (lengths of the AD structure or None for any length, condition or None, handler)
+SERVICE_DATA_RULES = {
+    # Environmental Sensing (used by ATC or b-parasite)
+    0x181A: (
+        (frozenset([20, 22]), None, _sensor(parse_bparasite)),
+        (None, None, _sensor(parse_atc)),
+    ),
+    # Body Composition and Weight Scale (used by Mi Scale)
+    0x181B: ((None, None, _sensor(parse_miscale)),),
+    0x181D: ((None, None, _sensor(parse_miscale)),),
+    # User Data and Bond Management (used by BTHome)
+    0x181C: ((None, None, _bthome),),
+    0x181E: ((None, None, _bthome),),
+    # Relsib
+    0xAA20: ((None, lambda data, adv: adv[LOCAL_NAME] == "ECo", _sensor(parse_relsib)),),
+    0xAA21: ((None, lambda data, adv: adv[LOCAL_NAME] == "ECo", _sensor(parse_relsib)),),
+    0xAA22: ((None, lambda data, adv: adv[LOCAL_NAME] == "ECo", _sensor(parse_relsib)),),
+    # unknown (used by Switchbot)
+    0xFD3D: ((None, None, _sensor(parse_switchbot)),),
+    0x0D00: ((None, None, _sensor(parse_switchbot)),),
+    # Hangzhou Tuya Information Technology Co., Ltd (HHCC)
+    0xFD50: ((None, None, _sensor(parse_hhcc)),),
+    # Qingping
+    0xFDCD: ((None, None, _sensor(parse_qingping)),),
+    # Xiaomi
+    0xFE95: ((None, None, _sensor(parse_xiaomi)),),
+    # Google (used by KKM and Ruuvitag V2/V4)
+    0xFEAA: (
+        (frozenset([19]), None, _sensor(parse_kkm)),
+        (frozenset(range(23, 256)), None, _sensor(parse_ruuvitag)),
+    ),
+    # FIDO (used by Cleargrass)
+    0xFFF9: ((None, None, _sensor(parse_qingping)),),
+    # Temperature and Humidity (used by Teltonika)
+    0x2A6E: ((None, None, _teltonika),),
+    0x2A6F: ((None, None, _teltonika),),
+}
+
+# Manufacturer specific data (AD type 0xFF), indexed on Company Identifier.
+# Rules: (data lengths or None for any length, condition or None, handler)
+MAN_SPEC_DATA_RULES = {
+    # Govee H5101/H5102/H5177
+    0x0001: ((frozenset([0x09, 0x0C, 0x22, 0x25]), None, _sensor(parse_govee)),),
+    # iBeacon (and Tilt)
+    0x004C: ((None, lambda data, adv: data[4] == 0x02, _ibeacon),),
+    # Oral-b
+    0x00DC: ((frozenset([0x0E]), None, _sensor(parse_oral_b)),),
+    # Ruuvitag V3/V5
+    0x0499: ((None, None, _sensor(parse_ruuvitag)),),
+    # Mikrotik
+    0x094F: ((frozenset([0x15]), None, _sensor(parse_mikrotik)),),
+    # Almendo (Blusensor)
+    0x06E8: ((None, None, _sensor(parse_almendo)),),
+    # Moat S2
+    0x1000: ((frozenset([0x15]), None, _sensor(parse_moat)),),
+    # BlueMaestro
+    0x0133: ((frozenset([0x11]), None, _sensor(parse_bluemaestro)),),
+    # SmartDry
+    0x01AE: ((frozenset([0x0F]), None, _sensor(parse_smartdry)),),
+    # Sensirion
+    0x06D5: ((None, None, _sensor_with_name(parse_sensirion)),),
+    # Air Mentor
+    0x2121: ((frozenset([0x0B]), None, _sensor(parse_airmentor)),),
+    0x2122: ((frozenset([0x0B]), None, _sensor(parse_airmentor)),),
+    # Govee H5179
+    0x8801: ((frozenset([0x0C, 0x25]), None, _sensor(parse_govee)),),
+    # Brifit
+    0xAA55: ((frozenset([0x14]), None, _sensor(parse_brifit)),),
+    # Govee H5051/H5071/H5072/H5075/H5074
+    0xEC88: ((frozenset([0x09, 0x0A, 0x0C, 0x22, 0x24, 0x25]), None, _sensor(parse_govee)),),
+    # Kegtron
+    0xFFFF: ((frozenset([0x1E]), None, _sensor(parse_kegtron)),),
+    # Laica
+    0xA0AC: ((frozenset([0x0F]), lambda data, adv: data[14] in [0x06, 0x0D], _sensor(parse_laica)),),
+}
+
+# Manufacturer specific data of sensors that don't use a fixed Company Identifier,
+# checked in this order when none of the rules above matched.
+# Rules: (data lengths or None for any length, condition, handler)
+MAN_SPEC_DATA_FALLBACK_RULES = (
+    # Filter on part of the UUID16
+    # Xiaogui Scale
+    (frozenset([0x10]), lambda data, adv: data[2] == 0xC0, _sensor(parse_xiaogui)),
+    # iNode
+    (frozenset([0x0E]), lambda data, adv: data[3] == 0x82, _sensor(parse_inode)),
+    # iNode Care Sensors
+    (
+        frozenset([0x19]),
+        lambda data, adv: data[3] in [0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x9A, 0x9B, 0x9C, 0x9D],
+        _sensor(parse_inode),
+    ),
+
+    # Filter on service class uuid16
+    # Jinou BEC07-5
+    (frozenset([0x0E]), lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0x20AA, _sensor(parse_jinou)),
+    # Govee H5182
+    (frozenset([0x14, 0x2D]), lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0x5182, _sensor(parse_govee)),
+    # Govee H5183
+    (frozenset([0x11, 0x2A]), lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0x5183, _sensor(parse_govee)),
+    # Govee H5185
+    (frozenset([0x17, 0x30]), lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0x5185, _sensor(parse_govee)),
+    # Thermoplus
+    (
+        frozenset([0x15, 0x17]),
+        lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0xF0FF and ((data[3] << 8) | data[2]) in [
+            0x0010, 0x0011, 0x0015
+        ],
+        _sensor(parse_thermoplus),
+    ),
+    # Inkbird
+    (
+        frozenset([0x0A, 0x0D, 0x0F, 0x13, 0x17]),
+        lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0xF0FF and (
+            ((data[3] << 8) | data[2]) in [0x0000, 0x0001] or adv[LOCAL_NAME] in ["iBBQ", "xBBQ", "sps", "tps"]
+        ),
+        _sensor_with_name(parse_inkbird),
+    ),
+    # Other sensors with service class uuid16 0xF0FF are not supported
+    (None, lambda data, adv: adv[SERVICE_CLASS_UUID16] == 0xF0FF, UNKNOWN),
+
+    # Filter on service class uuid128
+    # Sensorpush
+    (frozenset([0x06, 0x08]), lambda data, adv: adv[SERVICE_CLASS_UUID128] == SENSORPUSH_UUID128, _sensor(parse_sensorpush)),
+
+    # Filter on complete local name
+    # Inkbird IBS-TH
+    (frozenset([0x0A]), lambda data, adv: adv[LOCAL_NAME] in ["sps", "tps"], _sensor_with_name(parse_inkbird)),
+    # Thermopro
+    (frozenset([0x07]), lambda data, adv: adv[LOCAL_NAME][0:5] in ["TP357", "TP359"], _thermopro),
+
+    # Filter on other parts of the manufacturer specific data
+    # AltBeacon
+    (frozenset([0x1B]), lambda data, adv: ((data[4] << 8) | data[5]) == 0xBEAC, _altbeacon),
+    # Acconeer
+    (frozenset([0x12]), lambda data, adv: data[2] == 0xC0 and data[3] == 0xAC, _sensor(parse_acconeer)),
+)
+
+
+def _index_on_length(rules):
+    """Compile the fallback rules into a dict of data length -> rules, in their original order."""
+    lengths = set()
+    for rule_lengths, _, _ in rules:
+        if rule_lengths is not None:
+            lengths.update(rule_lengths)
+    index = {}
+    for rule_lengths, condition, handler in rules:
+        for length in lengths if rule_lengths is None else rule_lengths:
+            index.setdefault(length, []).append((condition, handler))
+    return {length: tuple(length_rules) for length, length_rules in index.items()}
+
+
+MAN_SPEC_DATA_FALLBACK_INDEX = _index_on_length(MAN_SPEC_DATA_FALLBACK_RULES)
+
+
+def match_service_data(service_data, adv):
+    """Return the handler for service data, None if no sensor matches."""
+    rules = SERVICE_DATA_RULES.get((service_data[3] << 8) | service_data[2])
+    if rules is None:
+        return None
+    for lengths, condition, handler in rules:
+        if lengths is not None and len(service_data) not in lengths:
+            continue
+        if condition is None or condition(service_data, adv):
+            return handler
+    return None
+
+
+def match_man_spec_data(man_spec_data, adv):
+    """Return the handler for manufacturer specific data, None if no sensor matches."""
+    data_len = man_spec_data[0]
+    rules = MAN_SPEC_DATA_RULES.get((man_spec_data[3] << 8) | man_spec_data[2])
+    if rules is not None:
+        for lengths, condition, handler in rules:
+            if lengths is not None and data_len not in lengths:
+                continue
+            if condition is None or condition(man_spec_data, adv):
+                return handler
+    for condition, handler in MAN_SPEC_DATA_FALLBACK_INDEX.get(data_len, ()):
+        if condition(man_spec_data, adv):
+            return handler
+    return None
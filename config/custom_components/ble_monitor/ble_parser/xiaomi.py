@@ -2,7 +2,6 @@
 import logging
 import math
 import struct
-from Cryptodome.Cipher import AES
 
 from homeassistant.util import datetime
 
@@ -819,52 +818,90 @@ def obj4e0e(xobj):
 
 
 # Dataobject dictionary
-# {dataObject_id: (converter}
+# {dataObject_id: (converter, converter needs the device type)}
 xiaomi_dataobject_dict = {
-    0x0003: obj0003,
-    0x0006: obj0006,
-    0x0007: obj0007,
-    0x0008: obj0008,
-    0x0010: obj0010,
-    0x000B: obj000b,
-    0x000F: obj000f,
-    0x1001: obj1001,
-    0x1004: obj1004,
-    0x1005: obj1005,
-    0x1006: obj1006,
-    0x1007: obj1007,
-    0x1008: obj1008,
-    0x1009: obj1009,
-    0x1010: obj1010,
-    0x1012: obj1012,
-    0x1013: obj1013,
-    0x1014: obj1014,
-    0x1015: obj1015,
-    0x1017: obj1017,
-    0x1018: obj1018,
-    0x1019: obj1019,
-    0x100A: obj100a,
-    0x100D: obj100d,
-    0x100E: obj100e,
-    0x2000: obj2000,
-    0x4803: obj4803,
-    0x4804: obj4804,
-    0x4a01: obj4a01,
-    0x4a0f: obj4a0f,
-    0x4a12: obj4a12,
-    0x4a13: obj4a13,
-    0x4a1a: obj4a1a,
-    0x4c01: obj4c01,
-    0x4c02: obj4c02,
-    0x4c03: obj4c03,
-    0x4c08: obj4c08,
-    0x4c14: obj4c14,
-    0x4e0c: obj4e0c,
-    0x4e0d: obj4e0d,
-    0x4e0e: obj4e0e,
+    0x0003: (obj0003, False),
+    0x0006: (obj0006, False),
+    0x0007: (obj0007, False),
+    0x0008: (obj0008, True),
+    0x0010: (obj0010, False),
+    0x000B: (obj000b, True),
+    0x000F: (obj000f, True),
+    0x1001: (obj1001, True),
+    0x1004: (obj1004, False),
+    0x1005: (obj1005, False),
+    0x1006: (obj1006, False),
+    0x1007: (obj1007, False),
+    0x1008: (obj1008, False),
+    0x1009: (obj1009, False),
+    0x1010: (obj1010, False),
+    0x1012: (obj1012, False),
+    0x1013: (obj1013, False),
+    0x1014: (obj1014, False),
+    0x1015: (obj1015, False),
+    0x1017: (obj1017, False),
+    0x1018: (obj1018, False),
+    0x1019: (obj1019, False),
+    0x100A: (obj100a, False),
+    0x100D: (obj100d, False),
+    0x100E: (obj100e, True),
+    0x2000: (obj2000, False),
+    0x4803: (obj4803, False),
+    0x4804: (obj4804, False),
+    0x4a01: (obj4a01, False),
+    0x4a0f: (obj4a0f, False),
+    0x4a12: (obj4a12, False),
+    0x4a13: (obj4a13, False),
+    0x4a1a: (obj4a1a, False),
+    0x4c01: (obj4c01, False),
+    0x4c02: (obj4c02, False),
+    0x4c03: (obj4c03, False),
+    0x4c08: (obj4c08, False),
+    0x4c14: (obj4c14, False),
+    0x4e0c: (obj4e0c, False),
+    0x4e0d: (obj4e0d, False),
+    0x4e0e: (obj4e0e, False),
 }
 
 
+def mibeacon_info(data, device_type, payload):
+    """Describe the MiBeacon frame (only used in log messages)"""
+    frctrl = data[4] + (data[5] << 8)
+    frctrl_version = frctrl >> 12
+    frctrl_auth_mode = (frctrl >> 10) & 3
+
+    sinfo = 'MiVer: ' + str(frctrl_version)
+    sinfo += ', DevID: ' + hex(data[6] + (data[7] << 8)) + ' : ' + device_type
+    sinfo += ', FnCnt: ' + str(data[8])
+    if frctrl & 1 != 0:
+        sinfo += ', Request timing'
+    if (frctrl >> 8) & 1 != 0:
+        sinfo += ', Registered and bound'
+    else:
+        sinfo += ', Not bound'
+    if (frctrl >> 9) & 1 != 0:
+        sinfo += ', Request APP to register and bind'
+    if frctrl_auth_mode == 0:
+        sinfo += ', Old version certification'
+    elif frctrl_auth_mode == 1:
+        sinfo += ', Safety certification'
+    elif frctrl_auth_mode == 2:
+        sinfo += ', Standard certification'
+    if (frctrl >> 5) & 1 != 0:
+        # the capability byte follows the frame counter (and the MAC address, if included)
+        i = 15 if (frctrl >> 4) & 1 != 0 else 9
+        capability_types = data[i]
+        sinfo += ', Capability: ' + hex(capability_types)
+        if (capability_types & 0x20) != 0:
+            sinfo += ', IO: ' + hex(data[i + 1])
+    if (frctrl >> 3) & 1 != 0:
+        sinfo += ', Encryption'
+    else:
+        sinfo += ', No encryption'
+    sinfo += ', Object data: ' + payload.hex()
+    return sinfo
+
+
 def parse_xiaomi(self, data, source_mac, rssi):
     """Parser for Xiaomi sensors"""
     # check for adstruc length
@@ -878,14 +915,10 @@ def parse_xiaomi(self, data, source_mac, rssi):
     frctrl = data[4] + (data[5] << 8)
     frctrl_mesh = (frctrl >> 7) & 1  # mesh device
     frctrl_version = frctrl >> 12  # version
-    frctrl_auth_mode = (frctrl >> 10) & 3
-    frctrl_solicited = (frctrl >> 9) & 1
-    frctrl_registered = (frctrl >> 8) & 1
     frctrl_object_include = (frctrl >> 6) & 1
     frctrl_capability_include = (frctrl >> 5) & 1
     frctrl_mac_include = (frctrl >> 4) & 1  # check for MAC address in data
     frctrl_is_encrypted = (frctrl >> 3) & 1  # check for encryption being used
-    frctrl_request_timing = frctrl & 1  # old version
 
     # Check that device is not of mesh type
     if frctrl_mesh != 0:
@@ -928,24 +961,6 @@ def parse_xiaomi(self, data, source_mac, rssi):
 
     packet_id = data[8]
 
-    sinfo = 'MiVer: ' + str(frctrl_version)
-    sinfo += ', DevID: ' + hex(device_id) + ' : ' + device_type
-    sinfo += ', FnCnt: ' + str(packet_id)
-    if frctrl_request_timing != 0:
-        sinfo += ', Request timing'
-    if frctrl_registered != 0:
-        sinfo += ', Registered and bound'
-    else:
-        sinfo += ', Not bound'
-    if frctrl_solicited != 0:
-        sinfo += ', Request APP to register and bind'
-    if frctrl_auth_mode == 0:
-        sinfo += ', Old version certification'
-    elif frctrl_auth_mode == 1:
-        sinfo += ', Safety certification'
-    elif frctrl_auth_mode == 2:
-        sinfo += ', Standard certification'
-
     # check for MAC presence in sensor whitelist, if needed
     if self.discovery is False and xiaomi_mac not in self.sensor_whitelist:
         _LOGGER.debug("Discovery is disabled. MAC: %s is not whitelisted!", to_mac(xiaomi_mac))
@@ -997,20 +1012,16 @@ def parse_xiaomi(self, data, source_mac, rssi):
             _LOGGER.debug("Invalid data length (in capability check), adv: %s", data.hex())
             return None
         capability_types = data[i - 1]
-        sinfo += ', Capability: ' + hex(capability_types)
         if (capability_types & 0x20) != 0:
             i += 1
             if msg_length < i:
                 _LOGGER.debug("Invalid data length (in capability type check), adv: %s", data.hex())
                 return None
-            capability_io = data[i - 1]
-            sinfo += ', IO: ' + hex(capability_io)
 
     # check that data contains object
     if frctrl_object_include != 0:
         # check for encryption
         if frctrl_is_encrypted != 0:
-            sinfo += ', Encryption'
             firmware = "Xiaomi (MiBeacon V" + str(frctrl_version) + " encrypted)"
             if frctrl_version <= 3:
                 payload = decrypt_mibeacon_legacy(self, data, i, xiaomi_mac)
@@ -1019,7 +1030,6 @@ def parse_xiaomi(self, data, source_mac, rssi):
         else:   # No encryption
             # check minimum advertisement length with data
             firmware = "Xiaomi (MiBeacon V" + str(frctrl_version) + ")"
-            sinfo += ', No encryption'
             if msg_length < i + 3:
                 _LOGGER.debug("Invalid data length (in non-encrypted data), adv: %s", data.hex())
                 return None
@@ -1040,7 +1050,6 @@ def parse_xiaomi(self, data, source_mac, rssi):
 
     if payload is not None:
         result.update({"data": True})
-        sinfo += ', Object data: ' + payload.hex()
         # loop through parse_xiaomi payload
         payload_start = 0
         payload_length = len(payload)
@@ -1054,15 +1063,19 @@ def parse_xiaomi(self, data, source_mac, rssi):
                 break
             dobject = payload[payload_start + 3:next_start]
             if obj_length != 0:
-                resfunc = xiaomi_dataobject_dict.get(obj_typecode, None)
-                if resfunc:
-                    if hex(obj_typecode) in ["0x8", "0x100e", "0x1001", "0xf", "0xb"]:
-                        result.update(resfunc(dobject, device_type))
+                dataobject = xiaomi_dataobject_dict.get(obj_typecode)
+                if dataobject is not None:
+                    converter, needs_device_type = dataobject
+                    if needs_device_type:
+                        result.update(converter(dobject, device_type))
                     else:
-                        result.update(resfunc(dobject))
-                else:
-                    if self.report_unknown == "Xiaomi":
-                        _LOGGER.info("%s, UNKNOWN dataobject in payload! Adv: %s", sinfo, data.hex())
+                        result.update(converter(dobject))
+                elif self.report_unknown == "Xiaomi":
+                    _LOGGER.info(
+                        "%s, UNKNOWN dataobject in payload! Adv: %s",
+                        mibeacon_info(data, device_type, payload),
+                        data.hex()
+                    )
             payload_start = next_start
 
     return result
@@ -1070,9 +1083,6 @@ def parse_xiaomi(self, data, source_mac, rssi):
 
 def decrypt_mibeacon_v4_v5(self, data, i, xiaomi_mac):
     """decrypt MiBeacon v4/v5 encrypted advertisements"""
-    # check for minimum length of encrypted advertisement
-    if len(data) < i + 9:
-        _LOGGER.debug("Invalid data length (for decryption), adv: %s", data.hex())
     # try to find encryption key for current device
     try:
         key = self.aeskeys[xiaomi_mac]
@@ -1080,19 +1090,22 @@ def decrypt_mibeacon_v4_v5(self, data, i, xiaomi_mac):
             _LOGGER.error("Encryption key should be 16 bytes (32 characters) long")
             return None
     except KeyError:
-        # no encryption key found
-        _LOGGER.error("No encryption key found for device with MAC %s", to_mac(xiaomi_mac))
+        # no encryption key found, reported at most once per MISSING_KEY_REPORT_INTERVAL
+        if self.should_report_missing_key(xiaomi_mac):
+            _LOGGER.error("No encryption key found for device with MAC %s", to_mac(xiaomi_mac))
         return None
+    # check for minimum length of encrypted advertisement
+    if len(data) < i + 9:
+        _LOGGER.debug("Invalid data length (for decryption), adv: %s", data.hex())
 
     nonce = b"".join([xiaomi_mac[::-1], data[6:9], data[-7:-4]])
     aad = b"\x11"
     token = data[-4:]
     cipherpayload = data[i:-7]
-    cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
-    cipher.update(aad)
+    cipher = self.get_cipher(key)
 
     try:
-        decrypted_payload = cipher.decrypt_and_verify(cipherpayload, token)
+        decrypted_payload = cipher.decrypt_and_verify(nonce, cipherpayload, aad, token)
     except ValueError as error:
         _LOGGER.warning("Decryption failed: %s", error)
         _LOGGER.debug("token: %s", token.hex())
@@ -1110,9 +1123,6 @@ def decrypt_mibeacon_v4_v5(self, data, i, xiaomi_mac):
 
 def decrypt_mibeacon_legacy(self, data, i, xiaomi_mac):
     """decrypt MiBeacon v2/v3 encrypted advertisements"""
-    # check for minimum length of encrypted advertisement
-    if len(data) < i + 7:
-        _LOGGER.debug("Invalid data length (for decryption), adv: %s", data.hex())
     # try to find encryption key for current device
     try:
         aeskey = self.aeskeys[xiaomi_mac]
@@ -1121,18 +1131,20 @@ def decrypt_mibeacon_legacy(self, data, i, xiaomi_mac):
             return None
         key = b"".join([aeskey[0:6], bytes.fromhex("8d3d3c97"), aeskey[6:]])
     except KeyError:
-        # no encryption key found
-        _LOGGER.error("No encryption key found for device with MAC %s", to_mac(xiaomi_mac))
+        # no encryption key found, reported at most once per MISSING_KEY_REPORT_INTERVAL
+        if self.should_report_missing_key(xiaomi_mac):
+            _LOGGER.error("No encryption key found for device with MAC %s", to_mac(xiaomi_mac))
         return None
+    # check for minimum length of encrypted advertisement
+    if len(data) < i + 7:
+        _LOGGER.debug("Invalid data length (for decryption), adv: %s", data.hex())
 
     nonce = b"".join([data[4:9], data[-4:-1], xiaomi_mac[::-1][:-1]])
-    aad = b"\x11"
     cipherpayload = data[i:-4]
-    cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
-    cipher.update(aad)
+    cipher = self.get_cipher(key)
 
     try:
-        decrypted_payload = cipher.decrypt(cipherpayload)
+        decrypted_payload = cipher.decrypt(nonce, cipherpayload)
     except ValueError as error:
         _LOGGER.warning("Decryption failed: %s", error)
         _LOGGER.debug("nonce: %s", nonce.hex())
@@ -0,0 +1,161 @@
+"""Capture and replay of raw HCI events.
+
+A capture file starts with a header, followed by records of a fixed size part
+(timestamp, gateway index, length) and the raw HCI event. Gateway ids are stored
+once, in a gateway record, and referred to by their index in the frame records.
+The file is append-only and can be read with mmap, without parsing it up front.
+"""
+import asyncio
+import logging
+import mmap
+import os
+import struct
+from threading import Lock
+from time import monotonic, time
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_HEADER = b"BLECAP\x01\x00"
+# timestamp, gateway index, length of the HCI event or gateway id
+CAPTURE_RECORD = struct.Struct("<dBH")
+# gateway index of a record that defines the next gateway id
+GATEWAY_RECORD = 0xFF
+# number of HCI events after which a replay (as fast as possible) yields to the event loop
+REPLAY_BATCH = 100
+
+
+class CaptureReader:
+    """Read the (timestamp, gateway_id, data) records of a capture file.
+
+    The records are read from a memory map of the file. The file is opened by
+    open(), or for the duration of the iteration when the reader is not open.
+    """
+
+    def __init__(self, path):
+        """Initiate the capture reader."""
+        self.path = path
+        self._file = None
+        self._buffer = None
+
+    def open(self):
+        """Open and map the capture file."""
+        self._file = open(self.path, "rb")  # pylint: disable=consider-using-with
+        if os.fstat(self._file.fileno()).st_size > len(CAPTURE_HEADER):
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._buffer[:len(CAPTURE_HEADER)] != CAPTURE_HEADER:
+                self.close()
+                raise ValueError("%s is not a BLE monitor capture file" % self.path)
+
+    def close(self):
+        """Close the capture file."""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        """Open the capture file."""
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the capture file."""
+        self.close()
+
+    def __iter__(self):
+        """Iterate over the HCI events in the capture file."""
+        if self._file is not None:
+            yield from self._records()
+        else:
+            with self:
+                yield from self._records()
+
+    def _records(self):
+        """Iterate over the HCI events in the mapped capture file."""
+        buffer = self._buffer
+        if buffer is None:
+            return
+        gateways = []
+        offset = len(CAPTURE_HEADER)
+        end = len(buffer) - CAPTURE_RECORD.size
+        while offset <= end:
+            timestamp, gateway, length = CAPTURE_RECORD.unpack_from(buffer, offset)
+            offset += CAPTURE_RECORD.size
+            data = buffer[offset:offset + length]
+            if len(data) < length:
+                # incomplete last record, e.g. when the capture was interrupted
+                break
+            offset += length
+            if gateway == GATEWAY_RECORD:
+                gateways.append(data.decode())
+            else:
+                yield timestamp, gateways[gateway], data
+
+
+class CaptureWriter:
+    """Append raw HCI events to a capture file."""
+
+    def __init__(self, path):
+        """Open the capture file, existing captures are appended to."""
+        self.path = path
+        self.frames = 0
+        self._lock = Lock()
+        self._gateways = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            for _, gateway_id, _ in CaptureReader(path):
+                self._gateways.setdefault(gateway_id, len(self._gateways))
+        self._file = open(path, "ab")  # pylint: disable=consider-using-with
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_HEADER)
+
+    def write(self, data, gateway_id, timestamp=None, replay=False):
+        """Append a HCI event to the capture file, replayed HCI events are skipped."""
+        if replay:
+            return
+        if timestamp is None:
+            timestamp = time()
+        with self._lock:
+            if self._file.closed:
+                return
+            gateway = self._gateways.get(gateway_id)
+            if gateway is None:
+                if len(self._gateways) >= GATEWAY_RECORD:
+                    _LOGGER.error("Too many gateways for HCI capture, %s is not captured", gateway_id)
+                    return
+                gateway = self._gateways[gateway_id] = len(self._gateways)
+                name = gateway_id.encode()
+                self._file.write(CAPTURE_RECORD.pack(timestamp, GATEWAY_RECORD, len(name)) + name)
+            self._file.write(CAPTURE_RECORD.pack(timestamp, gateway, len(data)) + data)
+            self.frames += 1
+
+    def close(self):
+        """Close the capture file."""
+        with self._lock:
+            self._file.close()
+
+
+async def async_replay_capture(frames, process, realtime=False, speed=1.0):
+    """Stream the records of a capture through process(data, gateway_id).
+
+    frames is any iterable of (timestamp, gateway_id, data), e.g. an open CaptureReader.
+
+    With realtime, the time between the HCI events in the capture (divided by speed)
+    is kept by sleeping in the event loop, otherwise the events are replayed as fast
+    as possible. Returns the number of replayed HCI events.
+    """
+    count = 0
+    start = None
+    for timestamp, gateway_id, data in frames:
+        if realtime:
+            if start is None:
+                start = (timestamp, monotonic())
+            delay = (timestamp - start[0]) / speed - (monotonic() - start[1])
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif count % REPLAY_BATCH == REPLAY_BATCH - 1:
+            await asyncio.sleep(0)
+        process(data, gateway_id)
+        count += 1
+    return count
@@ -45,6 +45,7 @@ CONF_PERIOD = "period"
 CONF_LOG_SPIKES = "log_spikes"
 CONF_USE_MEDIAN = "use_median"
 CONF_ACTIVE_SCAN = "active_scan"
+CONF_ACTIVE_SCAN_INTERFACES = "active_scan_interfaces"
 CONF_HCI_INTERFACE = "hci_interface"
 CONF_BT_INTERFACE = "bt_interface"
 CONF_BATT_ENTITIES = "batt_entities"
@@ -63,10 +64,18 @@ CONF_DEVICE_DELETE_DEVICE = "delete device"
 CONF_PACKET = "packet"
 CONF_GATEWAY_ID = "gateway_id"
 CONF_UUID = "uuid"
+CONF_PARSE_WORKERS = "parse_workers"
+CONF_PARSE_BATCH_SIZE = "parse_batch_size"
+CONF_STATE_WRITE_WINDOW = "state_write_window"
+CONF_CAPTURE_FILE = "capture_file"
+CONF_REALTIME = "realtime"
 CONFIG_IS_FLOW = "is_flow"
 
 SERVICE_CLEANUP_ENTRIES = "cleanup_entries"
 SERVICE_PARSE_DATA = "parse_data"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_REPLAY_CAPTURE = "replay_capture"
 
 # Default values for configuration options
 DEFAULT_BT_AUTO_RESTART = False
@@ -79,6 +88,9 @@ DEFAULT_BATT_ENTITIES = True
 DEFAULT_REPORT_UNKNOWN = "Off"
 DEFAULT_DISCOVERY = True
 DEFAULT_RESTORE_STATE = False
+DEFAULT_PARSE_WORKERS = 0
+DEFAULT_PARSE_BATCH_SIZE = 32
+DEFAULT_STATE_WRITE_WINDOW = 0
 DEFAULT_DEVICE_MAC = ""
 DEFAULT_DEVICE_UUID = ""
 DEFAULT_DEVICE_ENCRYPTION_KEY = ""
@@ -2,6 +2,7 @@
 from datetime import timedelta
 import asyncio
 import logging
+from time import time
 
 from homeassistant.components.device_tracker.const import (
     SOURCE_TYPE_BLUETOOTH_LE,
@@ -18,11 +19,11 @@ from homeassistant.const import (
     STATE_NOT_HOME,
 )
 
-from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers import device_registry
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import dt
 
+from .batch import BatchStats, StateWrites
 from .helper import (
     identifier_normalize,
     identifier_clean,
@@ -37,6 +38,8 @@ from .const import (
     CONF_DEVICE_TRACKER_SCAN_INTERVAL,
     CONF_DEVICE_TRACKER_CONSIDER_HOME,
     CONF_PERIOD,
+    CONF_STATE_WRITE_WINDOW,
+    DEFAULT_STATE_WRITE_WINDOW,
     CONF_GATEWAY_ID,
     CONF_UUID,
     DEFAULT_DEVICE_TRACK,
@@ -44,6 +47,7 @@ from .const import (
     DEFAULT_DEVICE_TRACKER_CONSIDER_HOME,
     DOMAIN,
 )
+from .presence import PRESENCE_SWEEP_INTERVAL
 
 RESTORE_ATTRIBUTES = [
     'rssi',
@@ -85,6 +89,7 @@ class BLEupdaterTracker:
         self.monitor = blemonitor
         self.dataqueue = blemonitor.dataqueue["tracker"].async_q
         self.config = blemonitor.config
+        self.presence = blemonitor.presence
         self.period = self.config[CONF_PERIOD]
         self.add_entities = add_entities
         _LOGGER.debug("BLE device tracker updater initialized")
@@ -95,7 +100,7 @@ class BLEupdaterTracker:
         async def async_add_device_tracker(key):
             if key not in trackers_by_key:
                 tracker_entities = []
-                tracker = BleScannerEntity(self.config, key)
+                tracker = BleScannerEntity(self.config, key, self.presence)
                 tracker_entities.insert(0, tracker)
                 trackers_by_key[key] = tracker_entities
                 self.add_entities(tracker_entities)
@@ -109,7 +114,11 @@ class BLEupdaterTracker:
         ble_adv_cnt = 0
         ts_last = dt.now()
         ts_now = ts_last
-        data = None
+        ts_sweep = time()
+        batch_stats = BatchStats()
+        state_writes = StateWrites(
+            self.config.get(CONF_STATE_WRITE_WINDOW, DEFAULT_STATE_WRITE_WINDOW)
+        )
         await asyncio.sleep(0)
 
         # Set up device trackers of configured devices on startup when device tracker is available in device registry
@@ -134,15 +143,18 @@ class BLEupdaterTracker:
         trackers = []
         while True:
             try:
-                advevent = await asyncio.wait_for(self.dataqueue.get(), 1)
+                advevent = await asyncio.wait_for(
+                    self.dataqueue.get(), state_writes.timeout(1)
+                )
                 if advevent is None:
                     _LOGGER.debug("Entities updater loop stopped")
                     return True
-                data = advevent
+                received, messages = advevent
                 self.dataqueue.task_done()
             except asyncio.TimeoutError:
-                pass
-            if data:
+                received, messages = None, []
+            now = time()
+            for data in messages:
                 _LOGGER.debug("Data device tracker received: %s", data)
                 ble_adv_cnt += 1
                 key = identifier_clean(dict_get_or(data))
@@ -150,19 +162,29 @@ class BLEupdaterTracker:
                 trackers = await async_add_device_tracker(key)
 
                 if data["is connected"] is False:
-                    data = None
                     continue
+                came_home = self.presence.seen(key, now, data.get("rssi"))
 
                 # schedule an immediate update of device tracker
                 if "is connected" in data:
                     entity = trackers[0]
                     entity.data_update(data)
                     if entity.pending_update is True:
-                        try:
-                            entity.async_schedule_update_ha_state(True)
-                        except AttributeError:
-                            continue
-                data = None
+                        state_writes.schedule(entity, True)
+                    elif came_home and entity.pending_presence_update is True:
+                        # write home, also within the scan interval
+                        state_writes.schedule(entity, False)
+            # update the state of the device trackers that went away
+            if now - ts_sweep >= PRESENCE_SWEEP_INTERVAL:
+                ts_sweep = now
+                for key in self.presence.sweep(now):
+                    for entity in trackers_by_key.get(key, []):
+                        # write away, also within the scan interval of the last update
+                        if entity.pending_presence_update is True:
+                            state_writes.schedule(entity, False)
+            state_writes.flush()
+            if received is not None:
+                batch_stats.record(len(messages), received)
             ts_now = dt.now()
             if ts_now - ts_last < timedelta(seconds=self.period):
                 continue
@@ -173,6 +195,8 @@ class BLEupdaterTracker:
                 self.period,
                 len(trackers),
             )
+            batch_stats.log(_LOGGER, "device tracker")
+            state_writes.log(_LOGGER, "device tracker")
             ble_adv_cnt = 0
         return True
 
@@ -180,10 +204,11 @@ class BLEupdaterTracker:
 class BleScannerEntity(ScannerEntity, RestoreEntity):
     """Represent a tracked device."""
 
-    def __init__(self, config, key):
+    def __init__(self, config, key, presence):
         """Set up BLE Tracker entity."""
         self.ready_for_update = False
         self._config = config
+        self._presence = presence
         self._type = detect_conf_type(key)
         self._key = key
         self._fkey = identifier_normalize(key)
@@ -198,6 +223,7 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
         self._consider_home = self._device_settings["consider home"]
         self._newstate = None
         self._last_seen = None
+        presence.track(key, self._consider_home)
 
     async def async_added_to_hass(self):
         """Handle entity which will be added."""
@@ -216,9 +242,10 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
             self._extra_state_attributes["last_seen"] = dt.parse_datetime(
                 old_state.attributes["last_seen"]
             )
+            if self._last_seen:
+                self._presence.seen(self._key, self._last_seen.timestamp(), now=time())
 
-        restore_attr = RESTORE_ATTRIBUTES
-        restore_attr.append('mac_address' if self.is_beacon else 'uuid')
+        restore_attr = RESTORE_ATTRIBUTES + ['mac_address' if self.is_beacon else 'uuid']
 
         for attr in restore_attr:
             if attr in old_state.attributes:
@@ -230,6 +257,11 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
 
         self.ready_for_update = True
 
+    async def async_will_remove_from_hass(self):
+        """Release the presence slot of the device when the entity is removed."""
+        await super().async_will_remove_from_hass()
+        self._presence.release(self._key)
+
     @property
     def is_beacon(self):
         """Check if entity is beacon."""
@@ -238,9 +270,7 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
     @property
     def is_connected(self):
         """Return the connection state of the device."""
-        return self._last_seen and (dt.now() - self._last_seen) < timedelta(
-            seconds=self._consider_home
-        )
+        return self._presence.is_home(self._key)
 
     @property
     def state(self):
@@ -353,6 +383,11 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
         """Check if entity is enabled."""
         return self.enabled and self.ready_for_update
 
+    @property
+    def pending_presence_update(self):
+        """Check if entity is enabled and added, to write a change of its presence."""
+        return self.enabled and self.hass is not None
+
     def data_update(self, data):
         """Prepare data for update."""
         if self.enabled is False:
@@ -366,8 +401,7 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
                 return
         self._last_seen = now
         self._extra_state_attributes["last_seen"] = self._last_seen
-        restore_attr = RESTORE_ATTRIBUTES
-        restore_attr.append('mac_address' if self.is_beacon else 'uuid')
+        restore_attr = RESTORE_ATTRIBUTES + ['mac_address' if self.is_beacon else 'uuid']
 
         for attr in restore_attr:
             key = CONF_MAC if attr == 'mac_address' else attr
@@ -380,11 +414,6 @@ class BleScannerEntity(ScannerEntity, RestoreEntity):
 
         self.ready_for_update = True
 
-    def recheck_state(self, event=None):
-        """Recheck state of the tracker after the consider home interval."""
-        self.schedule_update_ha_state(False)
-
     async def async_update(self):
         """Update tracker state and attribute."""
         self._state = self.state
-        async_call_later(self.hass, self._consider_home, self.recheck_state)
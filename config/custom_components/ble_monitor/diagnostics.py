@@ -0,0 +1,11 @@
+"""Diagnostics support for BLE monitor."""
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry: ConfigEntry):
+    """Return the scan state and event rates of the Bluetooth adapters."""
+    blemonitor = hass.data[DOMAIN]["blemonitor"]
+    return blemonitor.diagnostics()
@@ -103,3 +103,33 @@ def config_validation_uuid(value: Any) -> str:
         raise vol.Invalid("Invalid UUID")
 
     return result
+
+
+def devices_by_id(devices: list) -> dict:
+    """Return the configured devices indexed on their (upper case) mac or uuid.
+
+    The entity updaters build the index once when they are set up, and pass it to the
+    entities, instead of scanning the list for every entity that looks up its device
+    settings.
+    """
+    index = {}
+    for device in devices:
+        index.setdefault(dict_get_or(device).upper(), []).append(device)
+    return index
+
+
+def index_entity_types(entity_types: tuple, namespace: dict) -> tuple[dict, dict]:
+    """Index entity descriptions on measurement key and unique id prefix.
+
+    Returns a dict with the (description, entity class) per measurement key and a dict
+    with the measurement keys per unique id prefix. The entity classes are looked up in
+    namespace, the globals() of the platform.
+    """
+    entity_type_by_key = {}
+    keys_by_unique_id = {}
+    for description in entity_types:
+        entity_type_by_key.setdefault(
+            description.key, (description, namespace[description.sensor_class])
+        )
+        keys_by_unique_id.setdefault(description.unique_id, []).append(description.key)
+    return entity_type_by_key, keys_by_unique_id
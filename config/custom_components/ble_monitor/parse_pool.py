@@ -0,0 +1,207 @@
+"""Process pool for parsing HCI events outside of the HCIdump thread."""
+import logging
+import multiprocessing
+import queue
+from threading import Lock, Thread
+from time import monotonic
+
+from .ble_parser import BleParser
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of frames waiting to be parsed, new batches are dropped above this
+MAX_PENDING_FRAMES = 10000
+# Time to wait for a batch to fill up, before it is handed to the workers anyway
+PARSE_BATCH_TIMEOUT = 0.05
+# Interval of the check for worker processes that stopped
+WORKER_CHECK_INTERVAL = 1.0
+
+
+def frame_mac(data):
+    """Return the (reversed) advertiser MAC of a raw HCI frame."""
+    if data[3] == 0x0D:
+        return data[8:14]
+    return data[7:13]
+
+
+def parse_worker(parser_kwargs, in_queue, out_queue, worker_id):
+    """Parse batches of raw HCI frames in a worker process."""
+    ble_parser = BleParser(**parser_kwargs)
+    while True:
+        batch = in_queue.get()
+        if batch is None:
+            break
+        batch_id, frames = batch
+        results = []
+        for index, data in frames:
+            try:
+                sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+            except Exception:  # pylint: disable=broad-except
+                # a malformed frame gives an empty result, instead of stopping the worker
+                _LOGGER.exception("Parse worker %i failed to parse %s", worker_id, data.hex())
+                continue
+            if sensor_msg or tracker_msg:
+                results.append((index, sensor_msg, tracker_msg))
+        out_queue.put(
+            (batch_id, worker_id, results, ble_parser.frames_rejected, ble_parser.frames_parsed)
+        )
+        ble_parser.frames_rejected = 0
+        ble_parser.frames_parsed = 0
+
+
+class ParsePool:
+    """Pool of worker processes running BleParser.parse_raw_data.
+
+    Frames are distributed over the workers on their MAC address, so the state that the
+    parser keeps per device (packet ids, adv priority) stays in one worker. The results
+    are handed to the callback in the order the frames were received, together with the
+    context (e.g. gateway id) that was submitted with the frame. Workers that stopped are
+    restarted, the frames that were handed to them are dropped.
+    """
+
+    def __init__(self, parser_kwargs, workers, callback, max_pending=MAX_PENDING_FRAMES):
+        """Initiate the parse pool."""
+        self._parser_kwargs = parser_kwargs
+        self._context = None
+        self._workers = workers
+        self._callback = callback
+        self.max_pending = max_pending
+        self._lock = Lock()
+        self._pending = {}
+        self._next_batch_id = 0
+        self._next_result_id = 0
+        self._processes = []
+        self._in_queues = []
+        self._out_queue = None
+        self._collector = None
+        self._stopping = False
+        # metrics, reset by the owner after reporting
+        self.pending_frames = 0
+        self.dropped_frames = 0
+        self.frames_rejected = 0
+        self.frames_parsed = 0
+
+    def _start_worker(self, worker_id):
+        """Start a worker process, return its input queue and process."""
+        in_queue = self._context.Queue()
+        process = self._context.Process(
+            target=parse_worker,
+            args=(self._parser_kwargs, in_queue, self._out_queue, worker_id),
+            name="ble_monitor_parser_%i" % worker_id,
+            daemon=True,
+        )
+        process.start()
+        return in_queue, process
+
+    def start(self):
+        """Start the worker processes and the result collector thread."""
+        self._context = multiprocessing.get_context("spawn")
+        self._out_queue = self._context.Queue()
+        self._stopping = False
+        for worker_id in range(self._workers):
+            in_queue, process = self._start_worker(worker_id)
+            self._in_queues.append(in_queue)
+            self._processes.append(process)
+        self._collector = Thread(target=self._collect, name="ble_monitor_parse_collector", daemon=True)
+        self._collector.start()
+        _LOGGER.debug("Parse pool started with %i worker processes", self._workers)
+
+    def stop(self, timeout=5):
+        """Stop the worker processes and the result collector thread."""
+        self._stopping = True
+        for in_queue in self._in_queues:
+            in_queue.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self._collector is not None:
+            self._out_queue.put(None)
+            self._collector.join(timeout)
+        self._processes = []
+        self._in_queues = []
+        _LOGGER.debug("Parse pool stopped")
+
+    def submit(self, frames):
+        """Hand a batch of (data, *context) frames to the workers."""
+        if not frames:
+            return
+        with self._lock:
+            if self.pending_frames + len(frames) > self.max_pending:
+                self.dropped_frames += len(frames)
+                return
+            batch_id = self._next_batch_id
+            self._next_batch_id += 1
+            shards = {}
+            for index, frame in enumerate(frames):
+                shards.setdefault(hash(frame_mac(frame[0])) % self._workers, []).append((index, frame[0]))
+            # frames per worker that did not return its results yet, results, contexts
+            self._pending[batch_id] = [
+                {worker_id: len(shard) for worker_id, shard in shards.items()},
+                [],
+                [frame[1:] for frame in frames],
+            ]
+            self.pending_frames += len(frames)
+        for worker_id, shard in shards.items():
+            self._in_queues[worker_id].put((batch_id, shard))
+
+    def _collect(self):
+        """Collect the results of the workers and pass them on in arrival order."""
+        checked = monotonic()
+        while True:
+            try:
+                result = self._out_queue.get(timeout=WORKER_CHECK_INTERVAL)
+            except queue.Empty:
+                result = ()
+            if result is None:
+                break
+            if monotonic() - checked >= WORKER_CHECK_INTERVAL:
+                checked = monotonic()
+                self._restart_stopped_workers()
+            if not result:
+                continue
+            batch_id, worker_id, results, frames_rejected, frames_parsed = result
+            with self._lock:
+                self.frames_rejected += frames_rejected
+                self.frames_parsed += frames_parsed
+                pending = self._pending.get(batch_id)
+                # results of a worker that stopped were already dropped
+                if pending is None or pending[0].pop(worker_id, None) is None:
+                    continue
+                pending[1].extend(results)
+                completed = self._completed_batches()
+            self._pass_on(completed)
+
+    def _restart_stopped_workers(self):
+        """Restart the worker processes that stopped, and drop the frames handed to them."""
+        for worker_id, process in enumerate(self._processes):
+            if process.is_alive() or self._stopping:
+                continue
+            _LOGGER.error(
+                "Parse worker %i stopped (exit code %s), restarting it", worker_id, process.exitcode
+            )
+            in_queue, new_process = self._start_worker(worker_id)
+            with self._lock:
+                self._in_queues[worker_id] = in_queue
+                self._processes[worker_id] = new_process
+                for pending in self._pending.values():
+                    self.dropped_frames += pending[0].pop(worker_id, 0)
+                completed = self._completed_batches()
+            self._pass_on(completed)
+
+    def _completed_batches(self):
+        """Remove and return the completed batches that are next in order (with the lock)."""
+        completed = []
+        while not self._pending.get(self._next_result_id, [True])[0]:
+            completed.append(self._pending.pop(self._next_result_id))
+            self._next_result_id += 1
+        for _, _, contexts in completed:
+            self.pending_frames -= len(contexts)
+        return completed
+
+    def _pass_on(self, completed):
+        """Hand the results of completed batches to the callback."""
+        for _, results, contexts in completed:
+            results.sort(key=lambda item: item[0])
+            for index, sensor_msg, tracker_msg in results:
+                self._callback(sensor_msg, tracker_msg, *contexts[index])
@@ -0,0 +1,134 @@
+"""Bounded memory last seen times, RSSI history and presence of BLE devices."""
+from array import array
+
+# number of RSSI values that are kept per device
+RSSI_HISTORY = 16
+# time between two presence sweeps of the device trackers
+PRESENCE_SWEEP_INTERVAL = 1.0
+
+
+class PresenceTable:
+    """Last seen time, RSSI history and presence of devices, in fixed size arrays.
+
+    Every device gets a slot in the arrays, its RSSI values are kept in a ring buffer of
+    RSSI_HISTORY values. Devices with a consider home interval are tracked, the presence
+    of all tracked devices is updated at once by sweep(). The slots of released devices
+    are reused for new devices.
+    """
+
+    def __init__(self, history=RSSI_HISTORY):
+        """Initiate the presence table."""
+        self.history = history
+        self.slots = {}
+        self.keys = []
+        self.free_slots = []
+        self.last_seen = array("d")
+        self.consider_home = array("d")
+        self.home = array("b")
+        self.rssi = array("b")
+        # number of RSSI values written to the ring buffer, capped between history and 2 * history
+        self.rssi_count = array("H")
+
+    def slot(self, key):
+        """Return the slot of a device, a new slot is added for new devices."""
+        slot = self.slots.get(key)
+        if slot is None and self.free_slots:
+            slot = self.slots[key] = self.free_slots.pop()
+            self.keys[slot] = key
+        elif slot is None:
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            self.last_seen.append(0.0)
+            self.consider_home.append(0.0)
+            self.home.append(0)
+            self.rssi.extend([0] * self.history)
+            self.rssi_count.append(0)
+        return slot
+
+    def release(self, key):
+        """Remove a device from the table, its slot is cleared for reuse."""
+        slot = self.slots.pop(key, None)
+        if slot is None:
+            return
+        self.keys[slot] = None
+        self.last_seen[slot] = 0.0
+        self.consider_home[slot] = 0.0
+        self.home[slot] = 0
+        start = slot * self.history
+        self.rssi[start:start + self.history] = array("b", [0] * self.history)
+        self.rssi_count[slot] = 0
+        self.free_slots.append(slot)
+
+    def track(self, key, consider_home):
+        """Track the presence of a device, with a consider home interval in seconds."""
+        slot = self.slot(key)
+        self.consider_home[slot] = consider_home
+        return slot
+
+    def seen(self, key, timestamp, rssi=None, now=None):
+        """Record that a device was seen, return True if a tracked device came home."""
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slot(key)
+        self.last_seen[slot] = timestamp
+        if rssi is not None:
+            count = self.rssi_count[slot]
+            self.rssi[slot * self.history + count % self.history] = max(-128, min(127, int(rssi)))
+            count += 1
+            if count >= 2 * self.history:
+                count -= self.history
+            self.rssi_count[slot] = count
+        consider_home = self.consider_home[slot]
+        if consider_home and not self.home[slot]:
+            if now is None or now - timestamp < consider_home:
+                self.home[slot] = 1
+                return True
+        return False
+
+    def is_tracked(self, key):
+        """Return True if the presence of a device is tracked."""
+        slot = self.slots.get(key)
+        return slot is not None and self.consider_home[slot] > 0
+
+    def is_home(self, key):
+        """Return True if a tracked device is home."""
+        slot = self.slots.get(key)
+        return slot is not None and self.home[slot] == 1
+
+    def rssi_values(self, key):
+        """Return the RSSI history of a device, from old to new."""
+        slot = self.slots.get(key)
+        if slot is None:
+            return []
+        count = self.rssi_count[slot]
+        start = slot * self.history
+        values = self.rssi[start:start + self.history].tolist()
+        if count < self.history:
+            return values[:count]
+        position = count % self.history
+        return values[position:] + values[:position]
+
+    def sweep(self, now):
+        """Mark the tracked devices that were not seen within consider home as away.
+
+        Returns the keys of the devices that went away.
+        """
+        away = []
+        for slot, (last_seen, consider_home, home) in enumerate(
+            zip(self.last_seen, self.consider_home, self.home)
+        ):
+            if home and now - last_seen >= consider_home:
+                self.home[slot] = 0
+                away.append(self.keys[slot])
+        return away
+
+    def diagnostics(self, now):
+        """Return the last seen time (seconds ago), RSSI history and presence per device."""
+        return {
+            key: {
+                "last_seen": round(now - self.last_seen[slot], 1) if self.last_seen[slot] else None,
+                "rssi": self.rssi_values(key),
+                "home": bool(self.home[slot]) if self.consider_home[slot] else None,
+            }
+            for key, slot in self.slots.items()
+        }
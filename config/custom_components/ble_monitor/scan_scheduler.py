@@ -0,0 +1,89 @@
+"""Scan scheduling of the Bluetooth adapters used by the HCIdump thread.
+
+The adapters keep scanning continuously. Once per period, the event rate of every
+adapter is compared with its average event rate of the previous periods, and only
+adapters that stopped receiving HCI events (or of which the event rate collapsed)
+are restarted.
+"""
+from time import monotonic
+
+# an adapter is restarted when its event rate drops below this fraction of its average
+RATE_COLLAPSE_RATIO = 0.1
+# weight of the last period in the average event rate of an adapter
+RATE_AVERAGE_WEIGHT = 0.3
+
+
+class ScanAdapter:
+    """Connection, scan mode and event rate of a Bluetooth adapter (hci interface)."""
+
+    def __init__(self, hci, active, process):
+        """Initiate the adapter, process is called with the received HCI events."""
+        self.hci = hci
+        self.active = active
+        self._process = process
+        self.socket = None
+        self.factory = None
+        self.conn = None
+        self.btctrl = None
+        self.scanning = False
+        self.evt_cnt = 0
+        self.total_events = 0
+        self.event_rate = 0.0
+        self.average_rate = None
+        self.restarts = 0
+        self.failures = 0
+        self._period_start = monotonic()
+
+    def process(self, data):
+        """Count and process a HCI event received on this adapter."""
+        self.evt_cnt += 1
+        self._process(data)
+
+    def check_health(self, now=None):
+        """Close the current period, return False if the adapter has to be restarted.
+
+        An adapter is healthy when it is scanning and received HCI events, at a rate of
+        at least RATE_COLLAPSE_RATIO times its average rate. The average follows the
+        rate of every period with HCI events, so a lasting drop (e.g. when a busy
+        device is gone) becomes the new normal after a few restarts.
+        """
+        if now is None:
+            now = monotonic()
+        elapsed = now - self._period_start
+        self._period_start = now
+        events = self.evt_cnt
+        self.evt_cnt = 0
+        self.total_events += events
+        self.event_rate = events / elapsed if elapsed > 0 else 0.0
+        if not self.scanning or events == 0:
+            return False
+        healthy = self.average_rate is None or self.event_rate >= RATE_COLLAPSE_RATIO * self.average_rate
+        if self.average_rate is None:
+            self.average_rate = self.event_rate
+        else:
+            self.average_rate += RATE_AVERAGE_WEIGHT * (self.event_rate - self.average_rate)
+        return healthy
+
+    def close(self):
+        """Close the connection with the adapter."""
+        for item in (self.conn, self.factory, self.socket):
+            if item is not None:
+                item.close()
+        self.socket = None
+        self.factory = None
+        self.conn = None
+        self.btctrl = None
+        self.scanning = False
+
+    def diagnostics(self):
+        """Return the scan state and event rates of the adapter."""
+        return {
+            "hci": self.hci,
+            "active_scan": self.active,
+            "scanning": self.scanning,
+            "event_rate": round(self.event_rate, 2),
+            "average_event_rate": None if self.average_rate is None else round(self.average_rate, 2),
+            "total_events": self.total_events + self.evt_cnt,
+            "restarts": self.restarts,
+            "failures": self.failures,
+        }
@@ -2,7 +2,6 @@
 from datetime import timedelta
 import asyncio
 import logging
-import statistics as sts
 
 from homeassistant.const import (
     ATTR_BATTERY_LEVEL,
@@ -22,12 +21,16 @@ from homeassistant.components.sensor import SensorEntity
 from homeassistant.util import dt
 from homeassistant.util.temperature import convert as convert_temp
 
+from .aggregate import Aggregator
+from .batch import BatchStats, StateWrites
 from .helper import (
     identifier_normalize,
     identifier_clean,
     detect_conf_type,
     dict_get_or,
     dict_get_or_normalize,
+    devices_by_id,
+    index_entity_types,
 )
 
 from .const import (
@@ -35,6 +38,8 @@ from .const import (
     AUTO_SENSOR_LIST,
     CONF_DECIMALS,
     CONF_PERIOD,
+    CONF_STATE_WRITE_WINDOW,
+    DEFAULT_STATE_WRITE_WINDOW,
     CONF_UUID,
     CONF_LOG_SPIKES,
     CONF_USE_MEDIAN,
@@ -121,6 +126,12 @@ class BLEupdater:
         self.config = blemonitor.config
         self.period = self.config[CONF_PERIOD]
         self.add_entities = add_entities
+        # index of the configured devices by mac or uuid, passed to the entities
+        self.devices = devices_by_id(self.config[CONF_DEVICES] or [])
+        # index of the entity description and class per measurement key
+        self.sensor_types, self.sensor_keys_by_unique_id = index_entity_types(
+            SENSOR_TYPES, globals()
+        )
         _LOGGER.debug("BLE sensors updater initialized")
 
     async def async_run(self, hass):
@@ -133,9 +144,10 @@ class BLEupdater:
                     if key not in sensors_by_key:
                         sensors_by_key[key] = {}
                     if measurement not in sensors_by_key[key]:
-                        description = [item for item in SENSOR_TYPES if item.key is measurement][0]
-                        sensors[measurement] = globals()[description.sensor_class](
-                            self.config, key, device_model, firmware, description, manufacturer
+                        description, sensor_class = self.sensor_types[measurement]
+                        sensors[measurement] = sensor_class(
+                            self.config, key, device_model, firmware, description, manufacturer,
+                            self.devices,
                         )
                         self.add_entities([sensors[measurement]])
                         sensors_by_key[key].update(sensors)
@@ -149,9 +161,10 @@ class BLEupdater:
                     sensors = {}
                     sensors_by_key[key] = {}
                     for measurement in device_sensors:
-                        description = [item for item in SENSOR_TYPES if item.key is measurement][0]
-                        sensors[measurement] = globals()[description.sensor_class](
-                            self.config, key, device_model, firmware, description, manufacturer
+                        description, sensor_class = self.sensor_types[measurement]
+                        sensors[measurement] = sensor_class(
+                            self.config, key, device_model, firmware, description, manufacturer,
+                            self.devices,
                         )
                         self.add_entities([sensors[measurement]])
                     sensors_by_key[key].update(sensors)
@@ -172,7 +185,10 @@ class BLEupdater:
         ts_last_update = ts_now
         period_cnt = 0
 
-        data = {}
+        batch_stats = BatchStats()
+        state_writes = StateWrites(
+            self.config.get(CONF_STATE_WRITE_WINDOW, DEFAULT_STATE_WRITE_WINDOW)
+        )
         await asyncio.sleep(0)
 
         # setup sensors of configured devices on startup when device model is available in registry
@@ -202,10 +218,9 @@ class BLEupdater:
                     for entity in entity_list:
                         unique_id_prefix = (entity.unique_id).removesuffix(key).removesuffix(dev.name)
 
-                        for sensor_type in SENSOR_TYPES:
-                            if sensor_type.unique_id == unique_id_prefix:
-                                sensor_key = sensor_type.key
-                                auto_sensors.add(sensor_key)
+                        auto_sensors.update(
+                            self.sensor_keys_by_unique_id.get(unique_id_prefix, ())
+                        )
 
                     if device_model and firmware and auto_sensors:
                         sensors = await async_add_sensor(
@@ -222,22 +237,24 @@ class BLEupdater:
         sensors = {}
         while True:
             try:
-                advevent = await asyncio.wait_for(self.dataqueue.get(), 1)
+                advevent = await asyncio.wait_for(
+                    self.dataqueue.get(), state_writes.timeout(1)
+                )
                 if advevent is None:
                     _LOGGER.debug("Entities updater loop stopped")
                     return True
-                data = advevent
+                received, messages = advevent
                 self.dataqueue.task_done()
             except asyncio.TimeoutError:
-                pass
-            if data:
+                received, messages = None, []
+            for data in messages:
                 _LOGGER.debug("Data measuring sensor received: %s", data)
                 ble_adv_cnt += 1
                 key = identifier_clean(dict_get_or(data))
                 # the RSSI value will be averaged for all valuable packets
                 if key not in rssi:
-                    rssi[key] = []
-                rssi[key].append(int(data["rssi"]))
+                    rssi[key] = Aggregator()
+                rssi[key].add(int(data["rssi"]))
                 batt_attr = None
                 device_model = data["type"]
                 firmware = data["firmware"]
@@ -251,13 +268,17 @@ class BLEupdater:
                     for measurement in AUTO_SENSOR_LIST:
                         if measurement in data:
                             auto_sensors.add(measurement)
-                sensors = await async_add_sensor(
-                    key, device_model, firmware, auto_sensors, manufacturer
-                )
+                known_sensors = sensors_by_key.get(key)
+                if known_sensors is not None and auto_sensors.issubset(known_sensors):
+                    # known device without new measurements
+                    sensors = known_sensors
+                else:
+                    sensors = await async_add_sensor(
+                        key, device_model, firmware, auto_sensors, manufacturer
+                    )
                 device_sensors = sensors.keys()
 
                 if data["data"] is False:
-                    data = None
                     continue
 
                 # battery attribute
@@ -307,23 +328,26 @@ class BLEupdater:
                             if entity.pending_update is True:
                                 if entity.ready_for_update is True:
                                     entity.rssi_values = rssi[key].copy()
-                                    entity.async_schedule_update_ha_state(True)
+                                    state_writes.schedule(entity, True)
                                     entity.pending_update = False
-                data = None
+            state_writes.flush()
+            if received is not None:
+                batch_stats.record(len(messages), received)
             ts_now = dt.now()
             if ts_now - ts_last_update < timedelta(seconds=self.period):
                 continue
             ts_last_update = ts_now
             period_cnt += 1
-            # restarting scanner
-            self.monitor.restart()
+            # the scanner restarts adapters by itself, only check that it is still running
+            self.monitor.ensure_running()
             # updating the state for every updated measuring device
             for key, edict in sensors_by_key.items():
                 for entity in edict.values():
                     if entity.pending_update is True:
                         if entity.ready_for_update is True:
                             entity.rssi_values = rssi[key].copy()
-                            entity.async_schedule_update_ha_state(True)
+                            state_writes.schedule(entity, True)
+            state_writes.flush()
             for key in rssi:
                 rssi[key].clear()
 
@@ -332,6 +356,8 @@ class BLEupdater:
                 ble_adv_cnt,
                 len(sensors_by_key),
             )
+            batch_stats.log(_LOGGER, "measuring sensor")
+            state_writes.log(_LOGGER, "measuring sensor")
             ble_adv_cnt = 0
 
 
@@ -417,10 +443,13 @@ class BaseSensor(RestoreEntity, SensorEntity):
         firmware: str,
         description: BLEMonitorSensorEntityDescription,
         manufacturer=None,
+        devices=None,
     ) -> None:
         """Initialize the sensor."""
         self.entity_description = description
         self._config = config
+        # configured devices by mac or uuid, see devices_by_id
+        self._devices = devices
         self._type = detect_conf_type(key)
         self._key = key
         self._fkey = identifier_normalize(key)
@@ -443,8 +472,8 @@ class BaseSensor(RestoreEntity, SensorEntity):
             'uuid' if self.is_beacon else 'mac_address': self._fkey
         }
 
-        self._measurements = []
-        self.rssi_values = []
+        self._measurements = Aggregator()
+        self.rssi_values = Aggregator()
         self.update_behavior = description.update_behavior
         self.pending_update = False
         self.ready_for_update = False
@@ -564,30 +593,32 @@ class BaseSensor(RestoreEntity, SensorEntity):
 
         # overrule settings with device setting if available
         if self._config[CONF_DEVICES]:
-            for device in self._config[CONF_DEVICES]:
-                if self._fkey.upper() == dict_get_or(device).upper():
-                    if id_selector in device:
-                        # get device name (from YAML config)
-                        dev_name = device[id_selector]
-                    if CONF_TEMPERATURE_UNIT in device:
-                        dev_temperature_unit = device[CONF_TEMPERATURE_UNIT]
-                    if CONF_DEVICE_DECIMALS in device:
-                        if isinstance(device[CONF_DEVICE_DECIMALS], int):
-                            dev_decimals = device[CONF_DEVICE_DECIMALS]
-                        else:
-                            dev_decimals = self._config[CONF_DECIMALS]
-                    if CONF_DEVICE_USE_MEDIAN in device:
-                        if isinstance(device[CONF_DEVICE_USE_MEDIAN], bool):
-                            dev_use_median = device[CONF_DEVICE_USE_MEDIAN]
-                        else:
-                            dev_use_median = self._config[CONF_USE_MEDIAN]
-                    if CONF_DEVICE_RESTORE_STATE in device:
-                        if isinstance(device[CONF_DEVICE_RESTORE_STATE], bool):
-                            dev_restore_state = device[CONF_DEVICE_RESTORE_STATE]
-                        else:
-                            dev_restore_state = self._config[CONF_RESTORE_STATE]
-                    if CONF_DEVICE_RESET_TIMER in device:
-                        dev_reset_timer = device[CONF_DEVICE_RESET_TIMER]
+            devices = self._devices
+            if devices is None:
+                devices = devices_by_id(self._config[CONF_DEVICES])
+            for device in devices.get(self._fkey.upper(), []):
+                if id_selector in device:
+                    # get device name (from YAML config)
+                    dev_name = device[id_selector]
+                if CONF_TEMPERATURE_UNIT in device:
+                    dev_temperature_unit = device[CONF_TEMPERATURE_UNIT]
+                if CONF_DEVICE_DECIMALS in device:
+                    if isinstance(device[CONF_DEVICE_DECIMALS], int):
+                        dev_decimals = device[CONF_DEVICE_DECIMALS]
+                    else:
+                        dev_decimals = self._config[CONF_DECIMALS]
+                if CONF_DEVICE_USE_MEDIAN in device:
+                    if isinstance(device[CONF_DEVICE_USE_MEDIAN], bool):
+                        dev_use_median = device[CONF_DEVICE_USE_MEDIAN]
+                    else:
+                        dev_use_median = self._config[CONF_USE_MEDIAN]
+                if CONF_DEVICE_RESTORE_STATE in device:
+                    if isinstance(device[CONF_DEVICE_RESTORE_STATE], bool):
+                        dev_restore_state = device[CONF_DEVICE_RESTORE_STATE]
+                    else:
+                        dev_restore_state = self._config[CONF_RESTORE_STATE]
+                if CONF_DEVICE_RESET_TIMER in device:
+                    dev_reset_timer = device[CONF_DEVICE_RESET_TIMER]
         device_settings = {
             "name": dev_name,
             "temperature unit": dev_temperature_unit,
@@ -619,9 +650,9 @@ class BaseSensor(RestoreEntity, SensorEntity):
 class MeasuringSensor(BaseSensor):
     """Base class for measuring sensor entities."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._jagged = False
         self._use_median = self._device_settings["use median"]
         self._period_cnt = 0
@@ -632,7 +663,7 @@ class MeasuringSensor(BaseSensor):
             self.pending_update = False
             return
         self._period_cnt = period_cnt
-        self._measurements.append(data[self.entity_description.key])
+        self._measurements.add(data[self.entity_description.key])
         self._extra_state_attributes["sensor_type"] = data["type"]
         self._extra_state_attributes["last_packet_id"] = data["packet"]
         self._extra_state_attributes["firmware"] = data["firmware"]
@@ -654,8 +685,8 @@ class MeasuringSensor(BaseSensor):
             rdecimals = self._rdecimals
         try:
             measurements = self._measurements
-            state_median = round(sts.median(measurements), rdecimals)
-            state_mean = round(sts.mean(measurements), rdecimals)
+            state_median = round(measurements.median(), rdecimals)
+            state_mean = round(measurements.mean(), rdecimals)
             if self._use_median:
                 textattr = "last_median_of"
                 self._state = state_median
@@ -666,7 +697,7 @@ class MeasuringSensor(BaseSensor):
             self._extra_state_attributes["median"] = state_median
             self._extra_state_attributes["mean"] = state_mean
             if self.entity_description.key != "rssi":
-                self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+                self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
             if self._period_cnt >= 1:
                 self._measurements.clear()
                 self.rssi_values.clear()
@@ -693,9 +724,9 @@ class MeasuringSensor(BaseSensor):
 class TemperatureSensor(MeasuringSensor):
     """Representation of a Temperature sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._attr_native_unit_of_measurement = self._device_settings["temperature unit"]
 
         if devtype in KETTLES:
@@ -743,7 +774,7 @@ class TemperatureSensor(MeasuringSensor):
                 )
             self.pending_update = False
             return
-        self._measurements.append(data[self.entity_description.key])
+        self._measurements.add(data[self.entity_description.key])
         self._extra_state_attributes["sensor_type"] = data["type"]
         self._extra_state_attributes["last_packet_id"] = data["packet"]
         self._extra_state_attributes["firmware"] = data["firmware"]
@@ -758,9 +789,9 @@ class TemperatureSensor(MeasuringSensor):
 class HumiditySensor(MeasuringSensor):
     """Representation of a Humidity sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._log_spikes = config[CONF_LOG_SPIKES]
         # LYWSD03MMC / MHO-C401 "jagged" humidity workaround
         if devtype in ("LYWSD03MMC", "MHO-C401"):
@@ -789,9 +820,9 @@ class HumiditySensor(MeasuringSensor):
             self.pending_update = False
             return
         if self._jagged is True:
-            self._measurements.append(int(data[self.entity_description.key]))
+            self._measurements.add(int(data[self.entity_description.key]))
         else:
-            self._measurements.append(data[self.entity_description.key])
+            self._measurements.add(data[self.entity_description.key])
         self._extra_state_attributes["sensor_type"] = data["type"]
         self._extra_state_attributes["last_packet_id"] = data["packet"]
         self._extra_state_attributes["firmware"] = data["firmware"]
@@ -806,9 +837,9 @@ class HumiditySensor(MeasuringSensor):
 class BatterySensor(MeasuringSensor):
     """Representation of a Battery sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
 
     def collect(self, data, period_cnt, batt_attr=None):
         """Battery measurements collector."""
@@ -827,7 +858,7 @@ class BatterySensor(MeasuringSensor):
 
     async def async_update(self):
         """Update sensor state and attributes."""
-        self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+        self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
         self.rssi_values.clear()
         self.pending_update = False
 
@@ -835,9 +866,9 @@ class BatterySensor(MeasuringSensor):
 class InstantUpdateSensor(BaseSensor):
     """Base class for instant updating sensor entity."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._reset_timer = self._device_settings["reset_timer"]
 
     def collect(self, data, period_cnt, batt_attr=None):
@@ -862,7 +893,7 @@ class InstantUpdateSensor(BaseSensor):
 
     async def async_update(self):
         """Update sensor state and attributes."""
-        self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+        self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
         self.rssi_values.clear()
         self.pending_update = False
 
@@ -870,9 +901,9 @@ class InstantUpdateSensor(BaseSensor):
 class StateChangedSensor(InstantUpdateSensor):
     """Representation of a State changed sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
 
     def collect(self, data, period_cnt, batt_attr=None):
         """Measurements collector."""
@@ -890,9 +921,9 @@ class StateChangedSensor(InstantUpdateSensor):
 class AccelerationSensor(InstantUpdateSensor):
     """Representation of a Acceleration sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
 
     def collect(self, data, period_cnt, batt_attr=None):
         """Measurements collector."""
@@ -917,9 +948,9 @@ class AccelerationSensor(InstantUpdateSensor):
 class WeightSensor(InstantUpdateSensor):
     """Representation of a Weight sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
 
     def collect(self, data, period_cnt, batt_attr=None):
         """Measurements collector."""
@@ -954,9 +985,9 @@ class WeightSensor(InstantUpdateSensor):
 class EnergySensor(InstantUpdateSensor):
     """Representation of an Energy sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._rdecimals = self._device_settings["decimals"]
 
     def collect(self, data, period_cnt, batt_attr=None):
@@ -989,9 +1020,9 @@ class EnergySensor(InstantUpdateSensor):
 class PowerSensor(InstantUpdateSensor):
     """Representation of a Power sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._rdecimals = self._device_settings["decimals"]
 
     def collect(self, data, period_cnt, batt_attr=None):
@@ -1022,9 +1053,9 @@ class PowerSensor(InstantUpdateSensor):
 class ButtonSensor(InstantUpdateSensor):
     """Representation of a Button sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
 
     def collect(self, data, period_cnt, batt_attr=None):
         """Measurement collector."""
@@ -1048,7 +1079,7 @@ class ButtonSensor(InstantUpdateSensor):
 
     async def async_update(self):
         """Update."""
-        self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+        self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
         if self._reset_timer > 0:
             _LOGGER.debug("Reset timer is set to: %i seconds", self._reset_timer)
             async_call_later(self.hass, self._reset_timer, self.reset_state)
@@ -1059,9 +1090,9 @@ class ButtonSensor(InstantUpdateSensor):
 class DimmerSensor(InstantUpdateSensor):
     """Representation of a Dimmer sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._button = "button"
         self._dimmer = self.entity_description.key
 
@@ -1089,7 +1120,7 @@ class DimmerSensor(InstantUpdateSensor):
 
     async def async_update(self):
         """Update."""
-        self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+        self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
         if self._reset_timer > 0:
             _LOGGER.debug("Reset timer is set to: %i seconds", self._reset_timer)
             async_call_later(self.hass, self._reset_timer, self.reset_state)
@@ -1100,9 +1131,9 @@ class DimmerSensor(InstantUpdateSensor):
 class SwitchSensor(InstantUpdateSensor):
     """Representation of a Switch sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._button_switch = "button switch"
         self._button = self.entity_description.key
 
@@ -1133,7 +1164,7 @@ class SwitchSensor(InstantUpdateSensor):
 
     async def async_update(self):
         """Update."""
-        self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+        self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
         if self._reset_timer > 0:
             _LOGGER.debug("Reset timer is set to: %i seconds", self._reset_timer)
             async_call_later(self.hass, self._reset_timer, self.reset_state)
@@ -1144,9 +1175,9 @@ class SwitchSensor(InstantUpdateSensor):
 class BaseRemoteSensor(InstantUpdateSensor):
     """Representation of a Remote sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
         self._button = "button"
         self._remote = self.entity_description.key
 
@@ -1174,7 +1205,7 @@ class BaseRemoteSensor(InstantUpdateSensor):
 
     async def async_update(self):
         """Update."""
-        self._extra_state_attributes["rssi"] = round(sts.mean(self.rssi_values))
+        self._extra_state_attributes["rssi"] = round(self.rssi_values.mean())
         if self._reset_timer > 0:
             _LOGGER.debug("Reset timer is set to: %i seconds", self._reset_timer)
             async_call_later(self.hass, self._reset_timer, self.reset_state)
@@ -1185,9 +1216,9 @@ class BaseRemoteSensor(InstantUpdateSensor):
 class VolumeDispensedSensor(InstantUpdateSensor):
     """Representation of a Kegtron Volume dispensed sensor."""
 
-    def __init__(self, config, key, devtype, firmware, description, manufacturer=None):
+    def __init__(self, config, key, devtype, firmware, description, manufacturer=None, devices=None):
         """Initialize the sensor."""
-        super().__init__(config, key, devtype, firmware, description, manufacturer)
+        super().__init__(config, key, devtype, firmware, description, manufacturer, devices)
 
     def collect(self, data, period_cnt, batt_attr=None):
         """Measurements collector."""
@@ -0,0 +1,127 @@
+"""Benchmarks for the BLE monitor parsers.
+
+The benchmarks replay the raw HCI frames that are used in the parser tests, so
+they can be run offline, without any Bluetooth hardware. Run them from the
+custom_components folder, e.g. `python -m ble_monitor.test.benchmark.dispatch`.
+"""
+import contextlib
+import os
+import re
+import time
+
+from homeassistant.const import CONF_DEVICES, CONF_DISCOVERY
+
+from ble_monitor import HCIdump
+from ble_monitor.const import CONF_ACTIVE_SCAN, CONF_HCI_INTERFACE, CONF_REPORT_UNKNOWN
+
+TEST_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA_STRING_REGEX = re.compile(r'data_string = "([0-9A-Fa-f]+)"')
+AESKEY_REGEX = re.compile(r'aeskey = "([0-9A-Fa-f]+)"')
+
+
+class Fixture:
+    """Raw HCI frame taken from one of the parser tests."""
+
+    def __init__(self, name, data, aeskey=None):
+        self.name = name
+        self.data = data
+        self.aeskey = aeskey
+
+    @property
+    def mac(self):
+        """MAC address of the advertisement, as used in the aeskeys dict."""
+        is_ext_packet = self.data[3] == 0x0D
+        return self.data[8 if is_ext_packet else 7:14 if is_ext_packet else 13][::-1]
+
+
+def load_fixtures():
+    """Collect the HCI frames (and encryption keys) from the parser tests."""
+    fixtures = []
+    for file_name in sorted(os.listdir(TEST_DIR)):
+        if not file_name.startswith("test_") or not file_name.endswith(".py"):
+            continue
+        with open(os.path.join(TEST_DIR, file_name), encoding="utf-8") as test_file:
+            source = test_file.read()
+        for test_case in source.split("    def test_")[1:]:
+            data_string = DATA_STRING_REGEX.search(test_case)
+            if data_string is None:
+                continue
+            aeskey = AESKEY_REGEX.search(test_case)
+            fixtures.append(
+                Fixture(
+                    "%s::%s" % (file_name[5:-3], test_case.split("(", 1)[0]),
+                    bytes.fromhex(data_string.group(1)),
+                    bytes.fromhex(aeskey.group(1)) if aeskey else None,
+                )
+            )
+    return fixtures
+
+
+def build_hci_frame(mac, adstructs, rssi=-70):
+    """Build a (legacy) HCI LE advertising report from a list of AD structures."""
+    adpayload = b"".join(bytes([len(adstruct) - 1]) + adstruct[1:] for adstruct in adstructs)
+    body = b"\x02\x01\x00\x00" + mac[::-1] + bytes([len(adpayload)]) + adpayload + bytes([rssi & 0xFF])
+    return b"\x04\x3e" + bytes([len(body)]) + body
+
+
+def unknown_frames(count=64):
+    """Synthetic advertisements from devices that are not supported (phones, tags, ...)."""
+    frames = []
+    for i in range(count):
+        mac = bytes([0x40 | (i & 0x3F), 0x11, 0x22, 0x33, 0x44, i & 0xFF])
+        if i % 4 == 0:
+            # Apple 'nearby' manufacturer data
+            adstruct = b"\x00\xff\x4c\x00\x10\x05\x01\x18\x44\xa1\x2b"
+        elif i % 4 == 1:
+            # Microsoft CDP beacon
+            adstruct = b"\x00\xff\x06\x00\x01\x09\x20\x02" + bytes(range(i % 8, i % 8 + 20))
+        elif i % 4 == 2:
+            # Google Fast Pair service data
+            adstruct = b"\x00\x16\x2c\xfe\x00\x0c\x8a"
+        else:
+            # Tile tracker service data
+            adstruct = b"\x00\x16\xed\xfe\x02\x00" + bytes(range(8))
+        frames.append(build_hci_frame(mac, [b"\x00\x01\x1a", adstruct], rssi=-60 - (i % 30)))
+    return frames
+
+
+class QueueSink:
+    """Stand-in for a janus queue, that drops everything that is put on it."""
+
+    def __init__(self):
+        self.sync_q = self
+
+    def put_nowait(self, item):
+        """Drop the item."""
+
+
+def build_hcidump(**config):
+    """Return a HCIdump (not started) that puts its messages in a QueueSink."""
+    hcidump_config = {
+        CONF_HCI_INTERFACE: [0],
+        CONF_ACTIVE_SCAN: False,
+        CONF_REPORT_UNKNOWN: False,
+        CONF_DISCOVERY: True,
+        CONF_DEVICES: [],
+    }
+    hcidump_config.update(config)
+    dataqueue = {"binary": QueueSink(), "measuring": QueueSink(), "tracker": QueueSink()}
+    hcidump = HCIdump(config=hcidump_config, dataqueue=dataqueue)
+    # batches are flushed on size only, there is no running event loop
+    hcidump.call_later = lambda delay, callback: None
+    return hcidump
+
+
+def events_per_second(function, frames, duration=1.0):
+    """Call function for every frame until duration has passed, return events/s."""
+    count = 0
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < duration:
+            for frame in frames:
+                function(frame)
+            count += len(frames)
+            elapsed = time.perf_counter() - start
+    return count / elapsed
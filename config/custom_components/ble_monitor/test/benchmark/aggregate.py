@@ -0,0 +1,76 @@
+"""Benchmark of the aggregation of sensor readings within an update period.
+
+Compares the list of readings with statistics.median/mean (the old MeasuringSensor)
+with the streaming Aggregator, for a temperature sensor with 0.1 °C resolution and
+its RSSI, for several numbers of readings per period.
+"""
+import argparse
+import random
+import statistics as sts
+import time
+import tracemalloc
+
+from ble_monitor.aggregate import Aggregator
+
+
+def with_list(temperatures, rssi_values):
+    """Aggregate one period with lists and the statistics module."""
+    measurements = []
+    rssi = []
+    for temperature, rssi_value in zip(temperatures, rssi_values):
+        measurements.append(temperature)
+        rssi.append(rssi_value)
+    return (
+        round(sts.median(measurements), 1),
+        round(sts.mean(measurements), 1),
+        round(sts.mean(rssi.copy())),
+    )
+
+
+def with_aggregator(temperatures, rssi_values):
+    """Aggregate one period with the streaming aggregator."""
+    measurements = Aggregator()
+    rssi = Aggregator()
+    for temperature, rssi_value in zip(temperatures, rssi_values):
+        measurements.add(temperature)
+        rssi.add(rssi_value)
+    return (
+        round(measurements.median(), 1),
+        round(measurements.mean(), 1),
+        round(rssi.copy().mean()),
+    )
+
+
+def measure(function, temperatures, rssi_values, duration):
+    """Return the time per reading in µs and the peak memory in kB of one period."""
+    tracemalloc.start()
+    function(temperatures, rssi_values)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        function(temperatures, rssi_values)
+        count += 1
+    elapsed = time.perf_counter() - start
+    return 1e6 * elapsed / (count * len(temperatures)), peak / 1024
+
+
+def main():
+    """Run the aggregation benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=1.0, help="seconds per run")
+    args = arg_parser.parse_args()
+
+    print("%-10s %-12s %12s %12s" % ("readings", "method", "µs/reading", "peak kB"))
+    for readings in (60, 600, 6000, 60000):
+        temperatures = [round(21 + random.gauss(0, 0.3), 1) for _ in range(readings)]
+        rssi_values = [random.randint(-90, -60) for _ in range(readings)]
+        assert with_list(temperatures, rssi_values) == with_aggregator(temperatures, rssi_values)
+        for name, function in (("list", with_list), ("aggregator", with_aggregator)):
+            per_reading, peak = measure(function, temperatures, rssi_values, args.duration)
+            print("%-10i %-12s %12.2f %12.1f" % (readings, name, per_reading, peak))
+
+
+if __name__ == "__main__":
+    main()
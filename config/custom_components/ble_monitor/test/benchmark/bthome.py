@@ -0,0 +1,42 @@
+"""Benchmark of the BTHome parser.
+
+Replays the BTHome test vectors through parse_raw_data and reports the number of
+decoded measurement values per second, next to the number of HCI events per second.
+"""
+import argparse
+import contextlib
+import logging
+import os
+
+from ble_monitor.ble_parser import BleParser
+
+from . import events_per_second, load_fixtures
+
+# keys that parse_bthome adds to every result, next to the measurement values
+RESULT_KEYS = {"rssi", "mac", "packet", "type", "firmware", "data"}
+
+
+def main():
+    """Run the BTHome benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    fixtures = [fixture for fixture in load_fixtures() if fixture.name.startswith("bthome::")]
+    aeskeys = {fixture.mac: fixture.aeskey for fixture in fixtures if fixture.aeskey}
+    frames = [fixture.data for fixture in fixtures]
+    ble_parser = BleParser(aeskeys=aeskeys, filter_duplicates=False)
+
+    values = 0
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        for frame in frames:
+            sensor_msg, _ = ble_parser.parse_raw_data(frame)
+            values += len(set(sensor_msg) - RESULT_KEYS)
+    rate = events_per_second(ble_parser.parse_raw_data, frames, args.duration)
+    print("%i test vectors, %i measurement values" % (len(frames), values))
+    print("%10.0f events/s, %10.0f values/s" % (rate, rate * values / len(frames)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark of the decryption of encrypted advertisements.
+
+Replays the encrypted test vectors (with their encryption keys) through
+parse_raw_data, and compares the prepared AES-CCM cipher with AES.new.
+"""
+import argparse
+import logging
+import time
+
+from Cryptodome.Cipher import AES
+
+from ble_monitor.ble_parser import BleParser
+from ble_monitor.ble_parser.ccm import AesCcm
+
+from . import events_per_second, load_fixtures
+
+
+def decryptions_per_second(decrypt, duration):
+    """Call decrypt until duration has passed, return calls/s."""
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < duration:
+        for _ in range(1000):
+            decrypt()
+        count += 1000
+        elapsed = time.perf_counter() - start
+    return count / elapsed
+
+
+def main():
+    """Run the decryption benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    fixtures = [fixture for fixture in load_fixtures() if fixture.aeskey]
+    aeskeys = {fixture.mac: fixture.aeskey for fixture in fixtures}
+    frames = [fixture.data for fixture in fixtures]
+
+    ble_parser = BleParser(aeskeys=aeskeys)
+    rate = events_per_second(ble_parser.parse_raw_data, frames, args.duration)
+    print("%-30s %10.0f events/s (%i test vectors)" % ("encrypted devices", rate, len(frames)))
+    ble_parser = BleParser()
+    rate = events_per_second(ble_parser.parse_raw_data, frames, args.duration)
+    print("%-30s %10.0f events/s" % ("encrypted, no key", rate))
+
+    key = bytes.fromhex("231d39c1d7cc1ab1aee224cd096db932")
+    nonce = bytes(12)
+    cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
+    cipher.update(b"\x11")
+    cipherpayload, token = cipher.encrypt_and_digest(bytes(9))
+
+    def aes_new():
+        cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
+        cipher.update(b"\x11")
+        return cipher.decrypt_and_verify(cipherpayload, token)
+
+    ccm = AesCcm(key)
+
+    def aes_ccm():
+        return ccm.decrypt_and_verify(nonce, cipherpayload, b"\x11", token)
+
+    for name, decrypt in (("AES.new (MODE_CCM)", aes_new), ("prepared AesCcm", aes_ccm)):
+        rate = decryptions_per_second(decrypt, args.duration)
+        print("%-30s %10.0f decryptions/s" % (name, rate))
+
+
+if __name__ == "__main__":
+    main()
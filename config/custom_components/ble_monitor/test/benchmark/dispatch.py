@@ -0,0 +1,63 @@
+"""Benchmark of the advertisement dispatch in BleParser.
+
+Measures the number of HCI events per second that parse_raw_data can handle,
+for the supported devices in the test vectors and for unknown advertisements,
+with the dispatch tables and with the if/elif chain that was used before them
+(see dispatch_baseline.py). The runs of both alternate, the best of --repeat runs
+is reported.
+"""
+import argparse
+import logging
+
+from ble_monitor.ble_parser import BleParser
+
+from . import events_per_second, load_fixtures, unknown_frames
+from .dispatch_baseline import IfChainBleParser
+
+
+def best_rates(parsers, frames, duration, repeat):
+    """Return the best events/s of every parser, in alternating runs of duration / repeat."""
+    rates = [0.0] * len(parsers)
+    for _ in range(repeat):
+        for index, ble_parser in enumerate(parsers):
+            rate = events_per_second(ble_parser.parse_raw_data, frames, duration / repeat)
+            rates[index] = max(rates[index], rate)
+    return rates
+
+
+def main():
+    """Run the dispatch benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=2.0, help="seconds per parser")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="best of this number of runs")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    known = [fixture.data for fixture in load_fixtures()]
+    unknown = unknown_frames()
+
+    mixed = known + unknown * (9 * len(known) // len(unknown))
+    whitelist = [fixture.mac for fixture in load_fixtures()][:40]
+
+    print("%-30s %17s %17s %8s" % ("", "if/elif chain", "dispatch tables", "speedup"))
+    for name, frames, parser_args in (
+        ("known devices", known, {}),
+        ("known devices, no duplicates", known, {"filter_duplicates": True}),
+        ("unknown devices", unknown, {}),
+        ("mixed (1 known : 9 unknown)", mixed, {}),
+        ("mixed, discovery disabled", mixed, {"discovery": False, "sensor_whitelist": whitelist}),
+    ):
+        baseline, rate = best_rates(
+            (IfChainBleParser(**parser_args), BleParser(**parser_args)),
+            frames,
+            args.duration,
+            args.repeat,
+        )
+        print(
+            "%-30s %10.0f events/s %8.0f events/s %7.2fx"
+            % (name, baseline, rate, rate / baseline)
+        )
+
+
+if __name__ == "__main__":
+    main()
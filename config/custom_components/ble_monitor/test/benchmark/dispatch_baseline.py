@@ -0,0 +1,305 @@
+"""Baseline for the dispatch benchmark: the if/elif chain that BleParser used before.
+
+IfChainBleParser walks the sensors one by one for every advertisement, like
+parse_advertisement did before the dispatch tables of ble_parser/dispatch.py. The
+parsers and the tracker handling are the same as in BleParser.
+"""
+import logging
+from typing import Optional
+
+from ble_monitor.ble_parser import BleParser
+from ble_monitor.ble_parser.acconeer import parse_acconeer
+from ble_monitor.ble_parser.airmentor import parse_airmentor
+from ble_monitor.ble_parser.almendo import parse_almendo
+from ble_monitor.ble_parser.altbeacon import parse_altbeacon
+from ble_monitor.ble_parser.atc import parse_atc
+from ble_monitor.ble_parser.bluemaestro import parse_bluemaestro
+from ble_monitor.ble_parser.bparasite import parse_bparasite
+from ble_monitor.ble_parser.brifit import parse_brifit
+from ble_monitor.ble_parser.bthome import parse_bthome
+from ble_monitor.ble_parser.const import TILT_TYPES
+from ble_monitor.ble_parser.govee import parse_govee
+from ble_monitor.ble_parser.helpers import to_mac
+from ble_monitor.ble_parser.hhcc import parse_hhcc
+from ble_monitor.ble_parser.ibeacon import parse_ibeacon
+from ble_monitor.ble_parser.inkbird import parse_inkbird
+from ble_monitor.ble_parser.inode import parse_inode
+from ble_monitor.ble_parser.jinou import parse_jinou
+from ble_monitor.ble_parser.kegtron import parse_kegtron
+from ble_monitor.ble_parser.kkm import parse_kkm
+from ble_monitor.ble_parser.laica import parse_laica
+from ble_monitor.ble_parser.mikrotik import parse_mikrotik
+from ble_monitor.ble_parser.miscale import parse_miscale
+from ble_monitor.ble_parser.moat import parse_moat
+from ble_monitor.ble_parser.oral_b import parse_oral_b
+from ble_monitor.ble_parser.qingping import parse_qingping
+from ble_monitor.ble_parser.relsib import parse_relsib
+from ble_monitor.ble_parser.ruuvitag import parse_ruuvitag
+from ble_monitor.ble_parser.sensirion import parse_sensirion
+from ble_monitor.ble_parser.sensorpush import parse_sensorpush
+from ble_monitor.ble_parser.smartdry import parse_smartdry
+from ble_monitor.ble_parser.switchbot import parse_switchbot
+from ble_monitor.ble_parser.teltonika import parse_teltonika
+from ble_monitor.ble_parser.thermoplus import parse_thermoplus
+from ble_monitor.ble_parser.thermopro import parse_thermopro
+from ble_monitor.ble_parser.tilt import parse_tilt
+from ble_monitor.ble_parser.xiaogui import parse_xiaogui
+from ble_monitor.ble_parser.xiaomi import parse_xiaomi
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IfChainBleParser(BleParser):
+    """BleParser with the if/elif chain dispatch"""
+
+    def parse_advertisement(
+            self,
+            mac: bytes,
+            rssi: int,
+            service_class_uuid16: Optional[int] = None,
+            service_class_uuid128: Optional[bytes] = None,
+            local_name: Optional[str] = "",
+            service_data_list: Optional[list] = None,
+            man_spec_data_list: Optional[list] = None
+    ):
+        """parse BLE advertisement with the if/elif chain"""
+        sensor_data = None
+        tracker_data = None
+        unknown_sensor = False
+        if service_data_list is None:
+            service_data_list = []
+        if man_spec_data_list is None:
+            man_spec_data_list = []
+
+        while not sensor_data:
+            if service_data_list:
+                for service_data in service_data_list:
+                    # parse data for sensors with service data
+                    uuid16 = (service_data[3] << 8) | service_data[2]
+                    if uuid16 == 0x181A:
+                        # UUID16 = Environmental Sensing (used by ATC or b-parasite)
+                        if len(service_data) == 22 or len(service_data) == 20:
+                            sensor_data = parse_bparasite(self, service_data, mac, rssi)
+                        else:
+                            sensor_data = parse_atc(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 in [0x181B, 0x181D]:
+                        # UUID16 = Body Composition and Weight Scale (used by Mi Scale)
+                        sensor_data = parse_miscale(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 in [0x181C, 0x181E]:
+                        # UUID16 = User Data and Bond Management (used by BTHome)
+                        sensor_data = parse_bthome(self, service_data, uuid16, mac, rssi)
+                        break
+                    elif uuid16 in [0xAA20, 0xAA21, 0xAA22] and local_name == "ECo":
+                        # UUID16 = Relsib
+                        sensor_data = parse_relsib(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 in [0xFD3D, 0x0D00]:
+                        # UUID16 = unknown (used by Switchbot)
+                        sensor_data = parse_switchbot(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 == 0xFD50:
+                        # UUID16 = Hangzhou Tuya Information Technology Co., Ltd (HHCC)
+                        sensor_data = parse_hhcc(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 == 0xFDCD:
+                        # UUID16 = Qingping
+                        sensor_data = parse_qingping(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 == 0xFE95:
+                        # UUID16 = Xiaomi
+                        sensor_data = parse_xiaomi(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 == 0xFEAA:
+                        if len(service_data) == 19:
+                            # UUID16 = Google (used by KKM)
+                            sensor_data = parse_kkm(self, service_data, mac, rssi)
+                            break
+                        elif len(service_data) >= 23:
+                            # UUID16 = Google (used by Ruuvitag V2/V4)
+                            sensor_data = parse_ruuvitag(self, service_data, mac, rssi)
+                            break
+                    elif uuid16 == 0xFFF9:
+                        # UUID16 = FIDO (used by Cleargrass)
+                        sensor_data = parse_qingping(self, service_data, mac, rssi)
+                        break
+                    elif uuid16 == 0x2A6E or uuid16 == 0x2A6F:
+                        # UUID16 = Temperature and Humidity (used by Teltonika)
+                        if len(service_data_list) == 2:
+                            service_data = b"".join(service_data_list)
+                        sensor_data = parse_teltonika(self, service_data, local_name, mac, rssi)
+                        break
+                    else:
+                        unknown_sensor = True
+            elif man_spec_data_list:
+                for man_spec_data in man_spec_data_list:
+                    # parse data for sensors with manufacturer specific data
+                    comp_id = (man_spec_data[3] << 8) | man_spec_data[2]
+                    data_len = man_spec_data[0]
+                    # Filter on Company Identifier
+                    if comp_id == 0x0001 and data_len in [0x09, 0x0C, 0x22, 0x25]:
+                        # Govee H5101/H5102/H5177
+                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x004C and man_spec_data[4] == 0x02:
+                        # iBeacon
+                        if int.from_bytes(man_spec_data[6:22], byteorder='big') in TILT_TYPES:
+                            sensor_data, tracker_data = parse_tilt(self, man_spec_data, mac, rssi)
+                        else:
+                            sensor_data, tracker_data = parse_ibeacon(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x00DC and data_len == 0x0E:
+                        # Oral-b
+                        sensor_data = parse_oral_b(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x0499:
+                        # Ruuvitag V3/V5
+                        sensor_data = parse_ruuvitag(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x094F and data_len == 0x15:
+                        # Mikrotik
+                        sensor_data = parse_mikrotik(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x06E8:
+                        # Almendo (Blusensor)
+                        sensor_data = parse_almendo(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x1000 and data_len == 0x15:
+                        # Moat S2
+                        sensor_data = parse_moat(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x0133 and data_len == 0x11:
+                        # BlueMaestro
+                        sensor_data = parse_bluemaestro(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x01AE and data_len == 0x0F:
+                        # SmartDry
+                        sensor_data = parse_smartdry(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x06D5:
+                        # Sensirion
+                        sensor_data = parse_sensirion(self, man_spec_data, local_name, mac, rssi)
+                        break
+                    elif comp_id in [0x2121, 0x2122] and data_len == 0x0B:
+                        # Air Mentor
+                        sensor_data = parse_airmentor(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0x8801 and data_len in [0x0C, 0x25]:
+                        # Govee H5179
+                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0xAA55 and data_len == 0x14:
+                        # Brifit
+                        sensor_data = parse_brifit(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0xEC88 and data_len in [0x09, 0x0A, 0x0C, 0x22, 0x24, 0x25]:
+                        # Govee H5051/H5071/H5072/H5075/H5074
+                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0xFFFF and data_len == 0x1E:
+                        # Kegtron
+                        sensor_data = parse_kegtron(self, man_spec_data, mac, rssi)
+                        break
+                    elif comp_id == 0xA0AC and data_len == 0x0F and man_spec_data[14] in [0x06, 0x0D]:
+                        # Laica
+                        sensor_data = parse_laica(self, man_spec_data, mac, rssi)
+                        break
+
+                    # Filter on part of the UUID16
+                    elif man_spec_data[2] == 0xC0 and data_len == 0x10:
+                        # Xiaogui Scale
+                        sensor_data = parse_xiaogui(self, man_spec_data, mac, rssi)
+                        break
+                    elif man_spec_data[3] == 0x82 and data_len == 0x0E:
+                        # iNode
+                        sensor_data = parse_inode(self, man_spec_data, mac, rssi)
+                        break
+                    elif man_spec_data[3] in [
+                        0x91, 0x92, 0x93, 0x94, 0x95, 0x96, 0x9A, 0x9B, 0x9C, 0x9D
+                    ] and data_len == 0x19:
+                        # iNode Care Sensors
+                        sensor_data = parse_inode(self, man_spec_data, mac, rssi)
+                        break
+
+                    # Filter on service class uuid16
+                    elif service_class_uuid16 == 0x20AA and data_len == 0x0E:
+                        # Jinou BEC07-5
+                        sensor_data = parse_jinou(self, man_spec_data, mac, rssi)
+                        break
+                    elif service_class_uuid16 == 0x5182 and data_len in [0x14, 0x2D]:
+                        # Govee H5182
+                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
+                        break
+                    elif service_class_uuid16 == 0x5183 and data_len in [0x11, 0x2A]:
+                        # Govee H5183
+                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
+                        break
+                    elif service_class_uuid16 == 0x5185 and data_len in [0x17, 0x30]:
+                        # Govee H5185
+                        sensor_data = parse_govee(self, man_spec_data, mac, rssi)
+                        break
+                    elif service_class_uuid16 == 0xF0FF:
+                        if comp_id in [0x0010, 0x0011, 0x0015] and data_len in [0x15, 0x17]:
+                            # Thermoplus
+                            sensor_data = parse_thermoplus(self, man_spec_data, mac, rssi)
+                            break
+                        elif (comp_id in [0x0000, 0x0001] or local_name in ["iBBQ", "xBBQ", "sps", "tps"]) and (
+                            data_len in [0x0A, 0x0D, 0x0F, 0x13, 0x17]
+                        ):
+                            # Inkbird
+                            sensor_data = parse_inkbird(self, man_spec_data, local_name, mac, rssi)
+                            break
+                        else:
+                            unknown_sensor = True
+
+                    # Filter on service class uuid128
+                    elif service_class_uuid128 == (
+                        b'\xb0\x0a\x09\xec\xd7\x9d\xb8\x93\xba\x42\xd6\x11\x00\x00\x09\xef'
+                    ) and data_len in [0x06, 0x08]:
+                        # Sensorpush
+                        sensor_data = parse_sensorpush(self, man_spec_data, mac, rssi)
+                        break
+
+                    # Filter on complete local name
+                    elif local_name in ["sps", "tps"] and data_len == 0x0A:
+                        # Inkbird IBS-TH
+                        sensor_data = parse_inkbird(self, man_spec_data, local_name, mac, rssi)
+                        break
+                    elif local_name[0:5] in ["TP357", "TP359"] and data_len == 0x07:
+                        # Thermopro
+                        sensor_data = parse_thermopro(self, man_spec_data, local_name[0:5], mac, rssi)
+                        break
+
+                    # Filter on other parts of the manufacturer specific data
+                    elif data_len == 0x1B and ((man_spec_data[4] << 8) | man_spec_data[5]) == 0xBEAC:
+                        # AltBeacon
+                        sensor_data, tracker_data = parse_altbeacon(self, man_spec_data, comp_id, mac, rssi)
+                        break
+
+                    elif man_spec_data[0] == 0x12 and comp_id == 0xACC0:  # Acconeer
+                        sensor_data = parse_acconeer(self, man_spec_data, mac, rssi)
+                        break
+                    else:
+                        unknown_sensor = True
+            else:
+                unknown_sensor = True
+            if unknown_sensor and self.report_unknown == "Other":
+                _LOGGER.info(
+                    "Unknown advertisement received for mac: %s"
+                    "service data: %s"
+                    "manufacturer specific data: %s"
+                    "local name: %s"
+                    "UUID16: %s,"
+                    "UUID128: %s",
+                    to_mac(mac),
+                    service_data_list,
+                    man_spec_data_list,
+                    local_name,
+                    service_class_uuid16,
+                    service_class_uuid128,
+                )
+            break
+
+        tracker_id = tracker_data['tracker_id'] if tracker_data and 'tracker_id' in tracker_data else mac
+        return sensor_data, self.parse_tracker(mac, rssi, tracker_id, tracker_data)
@@ -0,0 +1,139 @@
+"""Benchmark of the entity setup in the sensor and binary sensor updaters.
+
+Measures the time to set up the entities of a number of configured devices on
+startup (matching the registry unique ids to measurement keys, looking up the
+entity description and class, creating the entities), with the old list scans
+over SENSOR_TYPES and with the startup-time index, and the cost per advertisement
+of a known device with and without the fast path in the updater loop.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from homeassistant.const import CONF_DEVICES, CONF_MAC
+
+from ble_monitor import sensor
+from ble_monitor.const import (
+    CONF_DECIMALS,
+    CONF_LOG_SPIKES,
+    CONF_RESTORE_STATE,
+    CONF_USE_MEDIAN,
+    MEASUREMENT_DICT,
+    SENSOR_TYPES,
+)
+from ble_monitor.helper import devices_by_id, identifier_normalize, index_entity_types
+
+
+def build_devices(count):
+    """Return (key, device type, registry unique ids) for count configured devices."""
+    device_types = [
+        device_type for device_type, measurements in MEASUREMENT_DICT.items()
+        if measurements[0] + measurements[1]
+    ]
+    devices = []
+    for i in range(count):
+        key = "A4C138%06X" % i
+        device_type = device_types[i % len(device_types)]
+        measurements = MEASUREMENT_DICT[device_type][0] + MEASUREMENT_DICT[device_type][1]
+        unique_ids = [
+            [item for item in SENSOR_TYPES if item.key == measurement][0].unique_id + key
+            for measurement in measurements
+        ]
+        devices.append((key, device_type, unique_ids))
+    return devices
+
+
+def setup_with_scan(config, devices):
+    """Set up the entities with list scans over SENSOR_TYPES (old implementation)."""
+    entities = []
+    for key, device_type, unique_ids in devices:
+        auto_sensors = set()
+        for unique_id in unique_ids:
+            unique_id_prefix = unique_id.removesuffix(key)
+            for sensor_type in SENSOR_TYPES:
+                if sensor_type.unique_id == unique_id_prefix:
+                    auto_sensors.add(sensor_type.key)
+        for measurement in auto_sensors:
+            description = [item for item in SENSOR_TYPES if item.key is measurement][0]
+            entities.append(
+                vars(sensor)[description.sensor_class](config, key, device_type, "", description)
+            )
+    return entities
+
+
+def setup_with_index(config, devices):
+    """Set up the entities with the startup-time index."""
+    sensor_types, sensor_keys_by_unique_id = index_entity_types(SENSOR_TYPES, vars(sensor))
+    configured_devices = devices_by_id(config[CONF_DEVICES])
+    entities = []
+    for key, device_type, unique_ids in devices:
+        auto_sensors = set()
+        for unique_id in unique_ids:
+            auto_sensors.update(sensor_keys_by_unique_id.get(unique_id.removesuffix(key), ()))
+        for measurement in auto_sensors:
+            description, sensor_class = sensor_types[measurement]
+            entities.append(
+                sensor_class(config, key, device_type, "", description, None, configured_devices)
+            )
+    return entities
+
+
+async def advertisements_known_devices(devices, fast_path):
+    """Return the time per advertisement to look up the entities of a known device."""
+    sensors_by_key = {key: {"temperature": None} for key, _, _ in devices}
+
+    async def async_add_sensor(key, device_model):
+        averaging_sensors = MEASUREMENT_DICT[device_model][0]
+        instant_sensors = MEASUREMENT_DICT[device_model][1]
+        device_sensors = averaging_sensors + instant_sensors
+        if key not in sensors_by_key:
+            sensors_by_key[key] = dict.fromkeys(device_sensors)
+        return sensors_by_key[key]
+
+    auto_sensors = set()
+    rounds = 1000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for key, device_type, _ in devices:
+            known_sensors = sensors_by_key.get(key)
+            if fast_path and known_sensors is not None and auto_sensors.issubset(known_sensors):
+                sensors = known_sensors
+            else:
+                sensors = await async_add_sensor(key, device_type)
+    assert sensors
+    return (time.perf_counter() - start) / (rounds * len(devices))
+
+
+def main():
+    """Run the entity setup benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--devices", type=int, default=200, help="number of devices")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    devices = build_devices(args.devices)
+    config = {
+        CONF_DECIMALS: 2,
+        CONF_USE_MEDIAN: False,
+        CONF_RESTORE_STATE: False,
+        CONF_LOG_SPIKES: False,
+        CONF_DEVICES: [{CONF_MAC: identifier_normalize(key)} for key, _, _ in devices],
+    }
+    for name, function in (("list scans", setup_with_scan), ("index", setup_with_index)):
+        elapsed = []
+        for _ in range(5):
+            start = time.perf_counter()
+            entities = function(config, devices)
+            elapsed.append(time.perf_counter() - start)
+        print(
+            "%-12s %i entities for %i devices in %.1f ms"
+            % (name, len(entities), len(devices), 1000 * min(elapsed))
+        )
+    for name, fast_path in (("no fast path", False), ("fast path", True)):
+        per_advertisement = asyncio.run(advertisements_known_devices(devices, fast_path))
+        print("%-12s %.3f µs per advertisement of a known device" % (name, 1e6 * per_advertisement))
+
+
+if __name__ == "__main__":
+    main()
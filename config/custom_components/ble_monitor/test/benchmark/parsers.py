@@ -0,0 +1,221 @@
+"""Throughput benchmark of all parsers in ble_parser.
+
+Replays the HCI frames of the parser tests through BleParser.parse_raw_data, grouped
+on the parser that handles them, and reports per parser:
+
+- ns/packet for the complete parse_raw_data call,
+- the split of that time in dispatch (frame checks, AD structures, dispatch table
+  and tracker), decryption (AES-CCM) and decoding (the rest, i.e. the parser),
+- the peak number of bytes allocated per packet (traced by tracemalloc).
+
+The same is reported for synthetic mixes of known, unknown and encrypted
+advertisements. Use --json for machine-readable output, to compare releases.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import time
+import tracemalloc
+
+from ble_monitor import ble_parser as ble_parser_module
+from ble_monitor.ble_parser import BleParser
+
+from . import load_fixtures, unknown_frames
+
+MANIFEST = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "manifest.json"
+)
+
+
+def skip_decoding(self, data, mac, rssi, adv):
+    """Handler that replaces the parsers, to measure the dispatch only."""
+    return None, None
+
+
+@contextlib.contextmanager
+def patched_dispatch(on_match):
+    """Pass the handler of every dispatched AD structure through on_match."""
+    match_service_data = ble_parser_module.match_service_data
+    match_man_spec_data = ble_parser_module.match_man_spec_data
+    ble_parser_module.match_service_data = lambda data, adv: on_match(match_service_data(data, adv))
+    ble_parser_module.match_man_spec_data = lambda data, adv: on_match(match_man_spec_data(data, adv))
+    try:
+        yield
+    finally:
+        ble_parser_module.match_service_data = match_service_data
+        ble_parser_module.match_man_spec_data = match_man_spec_data
+
+
+class RecordingCipher:
+    """AES-CCM cipher that records its decrypt calls."""
+
+    def __init__(self, cipher, calls):
+        self._cipher = cipher
+        self._calls = calls
+
+    def decrypt(self, *args):
+        """Record the call and decrypt without verifying the MIC."""
+        self._calls.append((self._cipher.decrypt, args))
+        return self._cipher.decrypt(*args)
+
+    def decrypt_and_verify(self, *args):
+        """Record the call, decrypt and verify the MIC."""
+        self._calls.append((self._cipher.decrypt_and_verify, args))
+        return self._cipher.decrypt_and_verify(*args)
+
+
+def parser_name(frame, aeskeys):
+    """Return the name of the parser that handles a frame ('unknown' if none)."""
+    names = []
+
+    def on_match(handler):
+        if handler is not None:
+            names.append(handler.parser_name)
+        return handler
+
+    with patched_dispatch(on_match):
+        BleParser(aeskeys=aeskeys).parse_raw_data(frame)
+    return names[0] if names else "unknown"
+
+
+def ns_per_packet(function, frames, repeat, duration):
+    """Return the best time in ns per packet of calling function for all frames."""
+    rounds = max(1, int(duration / repeat * 1000 / len(frames)))
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(rounds):
+            for frame in frames:
+                function(frame)
+        elapsed = (time.perf_counter_ns() - start) / (rounds * len(frames))
+        # calibrate the number of rounds on the first repeat
+        if best is None:
+            rounds = max(1, int(duration / repeat * 1e9 / (elapsed * len(frames))))
+            best = elapsed
+        best = min(best, elapsed)
+    return best
+
+
+def decryption_ns_per_packet(frames, aeskeys, repeat, duration):
+    """Return the time in ns per packet that is spent in AES-CCM decryption."""
+    calls = []
+    ble_parser = BleParser(aeskeys=aeskeys)
+    get_cipher = ble_parser.get_cipher
+    ble_parser.get_cipher = lambda key: RecordingCipher(get_cipher(key), calls)
+    for frame in frames:
+        ble_parser.parse_raw_data(frame)
+    if not calls:
+        return 0.0
+
+    def decrypt(call):
+        method, args = call
+        try:
+            method(*args)
+        except ValueError:
+            pass
+
+    return ns_per_packet(decrypt, calls, repeat, duration) * len(calls) / len(frames)
+
+
+def allocated_bytes_per_packet(frames, aeskeys):
+    """Return the mean peak of the bytes allocated while parsing a packet."""
+    ble_parser = BleParser(aeskeys=aeskeys)
+    # first pass fills the caches (prepared ciphers, last packet ids)
+    for frame in frames:
+        ble_parser.parse_raw_data(frame)
+    total = 0
+    tracemalloc.start()
+    try:
+        for frame in frames:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            ble_parser.parse_raw_data(frame)
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total / len(frames)
+
+
+def measure(frames, aeskeys, repeat, duration):
+    """Measure the cost per packet of parsing frames, split in dispatch, decryption and decoding."""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        total = ns_per_packet(BleParser(aeskeys=aeskeys).parse_raw_data, frames, repeat, duration)
+        with patched_dispatch(lambda handler: skip_decoding if handler is not None else None):
+            dispatch = ns_per_packet(BleParser(aeskeys=aeskeys).parse_raw_data, frames, repeat, duration)
+        decryption = decryption_ns_per_packet(frames, aeskeys, repeat, duration)
+        allocated = allocated_bytes_per_packet(frames, aeskeys)
+    return {
+        "packets": len(frames),
+        "ns_per_packet": round(total, 1),
+        "dispatch_ns": round(min(dispatch, total), 1),
+        "decryption_ns": round(decryption, 1),
+        "decoding_ns": round(max(0.0, total - dispatch - decryption), 1),
+        "allocated_bytes": round(allocated, 1),
+    }
+
+
+def main():
+    """Run the parser benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=0.5, help="seconds per measurement")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="best of this number of runs")
+    arg_parser.add_argument("--parser", action="append", help="only benchmark this parser")
+    arg_parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    fixtures = load_fixtures()
+    aeskeys = {fixture.mac: fixture.aeskey for fixture in fixtures if fixture.aeskey}
+    groups = {}
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        for fixture in fixtures:
+            groups.setdefault(parser_name(fixture.data, aeskeys), []).append(fixture.data)
+    known = [frame for name, frames in groups.items() if name != "unknown" for frame in frames]
+    encrypted = [fixture.data for fixture in fixtures if fixture.aeskey]
+    unknown = unknown_frames()
+    mixes = {
+        "known": known,
+        "unknown (synthetic)": unknown,
+        "encrypted": encrypted,
+        "mixed (1 known : 9 unknown)": known + unknown * (9 * len(known) // len(unknown)),
+    }
+
+    results = {"parsers": {}, "mixes": {}}
+    for name in sorted(groups):
+        if args.parser and name not in args.parser:
+            continue
+        results["parsers"][name] = measure(groups[name], aeskeys, args.repeat, args.duration)
+    if not args.parser:
+        for name, frames in mixes.items():
+            results["mixes"][name] = measure(frames, aeskeys, args.repeat, args.duration)
+
+    if args.json:
+        with open(MANIFEST, encoding="utf-8") as manifest:
+            version = json.load(manifest)["version"]
+        results.update({"version": version, "python": platform.python_version()})
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        "%-30s %7s %10s %10s %10s %10s %10s"
+        % ("parser", "packets", "ns/packet", "dispatch", "decryption", "decoding", "bytes")
+    )
+    for section in ("parsers", "mixes"):
+        for name, result in results[section].items():
+            print(
+                "%-30s %7i %10.0f %10.0f %10.0f %10.0f %10.0f" % (
+                    name,
+                    result["packets"],
+                    result["ns_per_packet"],
+                    result["dispatch_ns"],
+                    result["decryption_ns"],
+                    result["decoding_ns"],
+                    result["allocated_bytes"],
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
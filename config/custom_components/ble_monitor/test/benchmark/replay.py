@@ -0,0 +1,62 @@
+"""Replay a HCI capture through HCIdump.process_hci_events.
+
+Replays a capture file, made with the ble_monitor.start_capture service, through
+the parser and the routing to the entity updater queues, and reports the number
+of HCI events per second. Without a capture file, a capture is recorded from the
+HCI frames of the parser tests (mixed with advertisements of unknown devices).
+"""
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+import time
+
+from ble_monitor.capture import CaptureReader, CaptureWriter, async_replay_capture
+
+from . import build_hcidump, load_fixtures, unknown_frames
+
+
+def record_fixtures(path, repeat):
+    """Record the test frames in a capture file, one frame per ms."""
+    frames = [fixture.data for fixture in load_fixtures()] + unknown_frames()
+    capture = CaptureWriter(path)
+    timestamp = time.time()
+    for _ in range(repeat):
+        for frame in frames:
+            capture.write(frame, "ble_monitor", timestamp)
+            timestamp += 0.001
+    capture.close()
+    return capture.frames
+
+
+def main():
+    """Run the replay benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("capture_file", nargs="?", help="capture file to replay")
+    arg_parser.add_argument("--repeat", type=int, default=100, help="repeat the test frames")
+    arg_parser.add_argument("--realtime", action="store_true", help="keep the original timing")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = args.capture_file
+        if path is None:
+            path = os.path.join(temp_dir, "fixtures.cap")
+            count = record_fixtures(path, args.repeat)
+            print("%i HCI events recorded in %s (%i bytes)" % (count, path, os.path.getsize(path)))
+        hcidump = build_hcidump()
+        with CaptureReader(path) as frames, open(
+            os.devnull, "w", encoding="utf-8"
+        ) as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            count = asyncio.run(
+                async_replay_capture(frames, hcidump.process_hci_events, args.realtime)
+            )
+            elapsed = time.perf_counter() - start
+        print("%i HCI events replayed in %.2f s, %.0f events/s" % (count, elapsed, count / elapsed))
+
+
+if __name__ == "__main__":
+    main()
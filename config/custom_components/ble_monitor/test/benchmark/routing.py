@@ -0,0 +1,46 @@
+"""Benchmark of the routing of parsed advertisements in HCIdump.
+
+Drives the HCI frames of all device types in the test vectors through
+HCIdump.process_hci_events (parse and route), and the parsed messages through
+HCIdump.process_parsed_data (route only). The entity updater queues are replaced
+by a sink, no Bluetooth adapter or Home Assistant instance is needed.
+"""
+import argparse
+import contextlib
+import logging
+import os
+
+from . import build_hcidump, events_per_second, load_fixtures
+
+
+def main():
+    """Run the routing benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    hcidump = build_hcidump()
+    # replay the same frames over and over
+    hcidump.ble_parser.filter_duplicates = False
+
+    frames = [fixture.data for fixture in load_fixtures()]
+    messages = []
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        for frame in frames:
+            sensor_msg, _ = hcidump.ble_parser.parse_raw_data(frame)
+            if sensor_msg:
+                messages.append(sensor_msg)
+    device_types = {message["type"] for message in messages}
+    print("%i frames, %i device types" % (len(frames), len(device_types)))
+
+    rate = events_per_second(hcidump.process_hci_events, frames, args.duration)
+    print("%-30s %10.0f events/s" % ("process_hci_events", rate))
+    rate = events_per_second(
+        lambda message: hcidump.process_parsed_data(message, None), messages, args.duration
+    )
+    print("%-30s %10.0f messages/s" % ("process_parsed_data", rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Benchmark of the Xiaomi MiBeacon parser.
+
+Replays the Xiaomi test vectors (with their encryption keys) through parse_raw_data
+and reports the number of HCI events per second, for all test vectors and for the
+non-encrypted ones only (where the object decoding is not hidden by the decryption).
+"""
+import argparse
+import logging
+
+from ble_monitor.ble_parser import BleParser
+
+from . import events_per_second, load_fixtures
+
+
+def main():
+    """Run the Xiaomi benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    fixtures = [fixture for fixture in load_fixtures() if fixture.name.startswith("xiaomi_parser::")]
+    aeskeys = {fixture.mac: fixture.aeskey for fixture in fixtures if fixture.aeskey}
+    ble_parser = BleParser(aeskeys=aeskeys, filter_duplicates=False)
+
+    for name, frames in (
+        ("all test vectors", [fixture.data for fixture in fixtures]),
+        ("non-encrypted", [fixture.data for fixture in fixtures if not fixture.aeskey]),
+    ):
+        rate = events_per_second(ble_parser.parse_raw_data, frames, args.duration)
+        print("%-20s %10.0f events/s (%i test vectors)" % (name, rate, len(frames)))
+
+
+if __name__ == "__main__":
+    main()
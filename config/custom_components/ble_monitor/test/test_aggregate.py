@@ -0,0 +1,50 @@
+"""The tests for the streaming aggregation of sensor readings."""
+import statistics as sts
+
+import pytest
+
+from ble_monitor.aggregate import Aggregator
+
+
+class TestAggregator:
+    """Tests for the aggregator"""
+
+    def test_aggregator(self):
+        """Test that the aggregator gives the same results as the statistics module."""
+        readings = [21.3, 21.4, 21.3, 21.2, 21.5, 21.3, 21.4, 21.2]
+        aggregator = Aggregator()
+        for reading in readings:
+            aggregator.add(reading)
+
+        assert len(aggregator) == len(readings)
+        assert aggregator.median() == sts.median(readings)
+        assert aggregator.mean() == sts.mean(readings)
+        assert aggregator.minimum == 21.2
+        assert aggregator.maximum == 21.5
+
+    def test_aggregator_int(self):
+        """Test the results for integer readings (e.g. RSSI)."""
+        aggregator = Aggregator()
+        for reading in [-70, -72, -71]:
+            aggregator.add(reading)
+        copy = aggregator.copy()
+        aggregator.add(-75)
+
+        assert copy.mean() == -71
+        assert isinstance(copy.mean(), int)
+        assert copy.median() == -71
+        assert aggregator.mean() == -72
+        assert aggregator.median() == -71.5
+
+    def test_aggregator_empty(self):
+        """Test that an empty aggregator raises like the statistics module."""
+        aggregator = Aggregator()
+        aggregator.add(1)
+        aggregator.clear()
+
+        assert len(aggregator) == 0
+        assert aggregator.minimum is None
+        with pytest.raises(sts.StatisticsError):
+            aggregator.mean()
+        with pytest.raises(sts.StatisticsError):
+            aggregator.median()
@@ -0,0 +1,92 @@
+"""The tests for the batched hand-off to the entity updaters."""
+import queue
+from types import SimpleNamespace
+
+from ble_monitor.batch import BatchedQueue, BatchStats, StateWrites
+
+
+class TestBatchedQueue:
+    """Tests for the batched queue"""
+
+    def test_batch_flush(self):
+        """Test that messages are put on the queue as one batch when flushed."""
+        dataqueue = SimpleNamespace(sync_q=queue.Queue())
+        batched_queue = BatchedQueue(dataqueue, max_size=4)
+
+        assert batched_queue.put({"mac": "A"}, 10.0) is True
+        assert batched_queue.put({"mac": "B"}, 11.0) is False
+        assert dataqueue.sync_q.empty()
+
+        batched_queue.flush()
+        batched_queue.flush()
+
+        assert dataqueue.sync_q.get_nowait() == (10.0, [{"mac": "A"}, {"mac": "B"}])
+        assert dataqueue.sync_q.empty()
+
+    def test_batch_size(self):
+        """Test that a full batch is put on the queue immediately."""
+        dataqueue = SimpleNamespace(sync_q=queue.Queue())
+        batched_queue = BatchedQueue(dataqueue, max_size=2)
+        batched_queue.put({"mac": "A"}, 10.0)
+        batched_queue.put({"mac": "B"}, 11.0)
+
+        assert dataqueue.sync_q.get_nowait() == (10.0, [{"mac": "A"}, {"mac": "B"}])
+        assert batched_queue.put({"mac": "C"}, 12.0) is True
+
+    def test_batch_stats(self):
+        """Test the batch size and latency statistics."""
+        batch_stats = BatchStats()
+        batch_stats.record(4, 0.0)
+        batch_stats.record(2, 0.0)
+
+        assert batch_stats.batches == 2
+        assert batch_stats.messages == 6
+        assert batch_stats.latency_max > 0
+
+
+class Entity:
+    """Stand-in for an entity that records its scheduled state writes"""
+
+    def __init__(self):
+        self.writes = []
+
+    def async_schedule_update_ha_state(self, force_refresh=False):
+        """Record the state write."""
+        self.writes.append(force_refresh)
+
+
+class TestStateWrites:
+    """Tests for the coalesced state writes"""
+
+    def test_coalesce(self):
+        """Test that multiple updates of an entity result in one state write."""
+        state_writes = StateWrites()
+        temperature = Entity()
+        humidity = Entity()
+        state_writes.schedule(temperature, False)
+        state_writes.schedule(humidity, True)
+        state_writes.schedule(temperature, True)
+        state_writes.schedule(temperature, False)
+        state_writes.flush()
+        state_writes.flush()
+
+        assert temperature.writes == [True]
+        assert humidity.writes == [True]
+        assert state_writes.requested == 4
+        assert state_writes.written == 2
+
+    def test_window(self):
+        """Test that state writes are held back until the window has passed."""
+        state_writes = StateWrites(window=60)
+        entity = Entity()
+        assert state_writes.timeout(1) == 1
+        state_writes.schedule(entity, False)
+        state_writes.flush()
+
+        assert entity.writes == []
+        assert 0 < state_writes.timeout(1) <= 1
+
+        state_writes.window = 0
+        state_writes.flush()
+
+        assert entity.writes == [False]
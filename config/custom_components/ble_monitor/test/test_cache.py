@@ -0,0 +1,107 @@
+"""The tests for the duplicate filtering and device cache of the ble_parser."""
+import pytest
+
+from ble_monitor.ble_parser import BleParser
+from ble_monitor.ble_parser import cache
+from ble_monitor.ble_parser.cache import DeviceCache
+
+
+class TestDeviceCache:
+    """Tests for the device cache"""
+
+    def test_cache_maxsize(self):
+        """Test that the least recently seen device is dropped."""
+        device_cache = DeviceCache(maxsize=2)
+        device_cache[b"a"] = 1
+        device_cache[b"b"] = 2
+        assert device_cache[b"a"] == 1
+        device_cache[b"c"] = 3
+
+        assert len(device_cache) == 2
+        assert b"b" not in device_cache
+        assert device_cache[b"a"] == 1
+        assert device_cache[b"c"] == 3
+
+    def test_cache_ttl(self, monkeypatch):
+        """Test that devices that are not seen within the ttl expire."""
+        now = [1000.0]
+        monkeypatch.setattr(cache, "monotonic", lambda: now[0])
+        device_cache = DeviceCache(ttl=10)
+        device_cache[b"a"] = 1
+        device_cache[b"b"] = 2
+        now[0] += 8
+        assert device_cache[b"a"] == 1
+        now[0] += 8
+
+        assert device_cache.get(b"b") is None
+        assert device_cache[b"a"] == 1
+        device_cache[b"c"] = 3
+        assert len(device_cache) == 2
+
+    def test_cache_pop_ttl(self, monkeypatch):
+        """Test that an expired device is not returned by pop."""
+        now = [1000.0]
+        monkeypatch.setattr(cache, "monotonic", lambda: now[0])
+        device_cache = DeviceCache(ttl=10)
+        device_cache[b"a"] = 1
+        device_cache[b"b"] = 2
+        now[0] += 8
+        assert device_cache.pop(b"a") == 1
+        now[0] += 8
+
+        assert device_cache.pop(b"b", None) is None
+        assert len(device_cache) == 0
+        with pytest.raises(KeyError):
+            device_cache.pop(b"b")
+
+    def test_duplicate_payload(self):
+        """Test that repeated advertisements are dropped before decoding."""
+        data_string = "043e2502010000219335342d5819020106151695fe5020aa01da219335342d580d1004fe004802c4"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(filter_duplicates=True, tracker_whitelist=[bytes.fromhex("582D34359321")])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg["packet"] == 218
+        assert tracker_msg["is connected"]
+
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg is None
+        assert tracker_msg["mac"] == "582D34359321"
+        assert ble_parser.frames_parsed == 1
+
+    def test_duplicate_payload_tracker(self):
+        """Test that repeated advertisements return the tracker data of the first one."""
+        data_string = "043e2502010000219335342d5819020106151695fe5020aa01da219335342d580d1004fe004802c4"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(filter_duplicates=True, tracker_whitelist=[bytes.fromhex("582D34359321")])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+        sensor_msg, repeated_tracker_msg = ble_parser.parse_raw_data(data[:-1] + b"\xb0")
+
+        assert sensor_msg is None
+        assert repeated_tracker_msg == {**tracker_msg, "rssi": -80}
+
+    def test_duplicate_payload_report_unknown(self):
+        """Test that repeated advertisements of reported devices still reach the parsers."""
+        data_string = "043e2502010000219335342d5819020106151695fe5020aa01da219335342d580d1004fe004802c4"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(filter_duplicates=True, report_unknown_whitelist=[bytes.fromhex("582D34359321")])
+        ble_parser.parse_raw_data(data)
+        ble_parser.parse_raw_data(data)
+
+        assert ble_parser.frames_parsed == 2
+
+    def test_duplicate_payload_without_packet_id(self):
+        """Test that repeated advertisements of sensors without packet id are still parsed."""
+        data_string = "043E2B0201000045C5DF38C1A41F0A09423531373843353435030388EC0201050CFF010001010102FC87640002BF"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(filter_duplicates=True)
+        ble_parser.parse_raw_data(data)
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg["type"] == "H5178-outdoor"
+        assert ble_parser.frames_parsed == 2
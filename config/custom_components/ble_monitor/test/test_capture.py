@@ -0,0 +1,97 @@
+"""The tests for the HCI capture and replay."""
+import asyncio
+
+import pytest
+
+from ble_monitor.capture import CaptureReader, CaptureWriter, async_replay_capture
+
+DATA_STRINGS = [
+    "043e2502010000219335342d5819020106151695fe5020aa01da219335342d580d1004fe004802c4",
+    "043E2B0201000045C5DF38C1A41F0A09423531373843353435030388EC0201050CFF010001010102FC87640002BF",
+]
+
+
+class TestCapture:
+    """Tests for the HCI capture"""
+
+    def test_capture(self, tmp_path):
+        """Test that captured frames are read back with timestamp and gateway id."""
+        path = str(tmp_path / "test.cap")
+        frames = [bytes.fromhex(data_string) for data_string in DATA_STRINGS]
+        capture = CaptureWriter(path)
+        capture.write(frames[0], "ble_monitor", 100.0)
+        capture.write(frames[1], "esp32_gateway", 100.5)
+        capture.write(frames[1], "ble_monitor", 101.0)
+        capture.close()
+
+        assert capture.frames == 3
+        assert list(CaptureReader(path)) == [
+            (100.0, "ble_monitor", frames[0]),
+            (100.5, "esp32_gateway", frames[1]),
+            (101.0, "ble_monitor", frames[1]),
+        ]
+
+    def test_capture_append(self, tmp_path):
+        """Test that an existing capture is appended to."""
+        path = str(tmp_path / "test.cap")
+        frame = bytes.fromhex(DATA_STRINGS[0])
+        capture = CaptureWriter(path)
+        capture.write(frame, "esp32_gateway", 100.0)
+        capture.close()
+        capture = CaptureWriter(path)
+        capture.write(frame, "esp32_gateway", 101.0)
+        capture.write(frame, "ble_monitor", 102.0)
+        capture.close()
+
+        assert [gateway_id for _, gateway_id, _ in CaptureReader(path)] == [
+            "esp32_gateway", "esp32_gateway", "ble_monitor"
+        ]
+
+    def test_capture_truncated(self, tmp_path):
+        """Test that an incomplete last record is ignored."""
+        path = tmp_path / "test.cap"
+        capture = CaptureWriter(str(path))
+        capture.write(bytes.fromhex(DATA_STRINGS[0]), "ble_monitor", 100.0)
+        capture.write(bytes.fromhex(DATA_STRINGS[1]), "ble_monitor", 101.0)
+        capture.close()
+        path.write_bytes(path.read_bytes()[:-5])
+
+        assert len(list(CaptureReader(str(path)))) == 1
+
+    def test_capture_invalid(self, tmp_path):
+        """Test that other files are rejected."""
+        path = tmp_path / "test.cap"
+        path.write_bytes(b"not a capture file")
+
+        with pytest.raises(ValueError):
+            list(CaptureReader(str(path)))
+
+    def test_replay(self, tmp_path):
+        """Test that a capture is replayed in order."""
+        path = str(tmp_path / "test.cap")
+        capture = CaptureWriter(path)
+        for data_string in DATA_STRINGS:
+            capture.write(bytes.fromhex(data_string), "ble_monitor")
+        capture.close()
+        replayed = []
+
+        with CaptureReader(path) as reader:
+            count = asyncio.run(
+                async_replay_capture(reader, lambda data, gateway_id: replayed.append(data.hex()))
+            )
+
+            assert count == 2
+            assert replayed == [data_string.lower() for data_string in DATA_STRINGS]
+        assert reader._file is None  # pylint: disable=protected-access
+
+    def test_replay_not_captured(self, tmp_path):
+        """Test that replayed frames are not written to an active capture."""
+        path = str(tmp_path / "test.cap")
+        frame = bytes.fromhex(DATA_STRINGS[0])
+        capture = CaptureWriter(path)
+        capture.write(frame, "ble_monitor", 100.0)
+        capture.write(frame, "ble_monitor", 101.0, replay=True)
+        capture.close()
+
+        assert capture.frames == 1
+        assert len(list(CaptureReader(path))) == 1
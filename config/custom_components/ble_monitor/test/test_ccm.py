@@ -0,0 +1,53 @@
+"""The tests for the AES-CCM decryption of the ble_parser."""
+import pytest
+from Cryptodome.Cipher import AES
+
+from ble_monitor.ble_parser import BleParser
+from ble_monitor.ble_parser.ccm import AesCcm
+from ble_monitor.ble_parser.const import MISSING_KEY_REPORT_INTERVAL
+
+KEY = bytes.fromhex("231d39c1d7cc1ab1aee224cd096db932")
+
+
+class TestAesCcm:
+    """Tests for the AES-CCM cipher"""
+
+    @pytest.mark.parametrize("nonce_len", [12, 13])
+    @pytest.mark.parametrize("length", [0, 1, 5, 15, 16, 17, 31, 40])
+    def test_ccm_pycryptodome(self, nonce_len, length):
+        """Test AES-CCM against pycryptodome."""
+        nonce = bytes(range(nonce_len))
+        payload = bytes(range(100, 100 + length))
+        cipher = AES.new(KEY, AES.MODE_CCM, nonce=nonce, mac_len=4)
+        cipher.update(b"\x11")
+        cipherpayload, token = cipher.encrypt_and_digest(payload)
+        ccm = AesCcm(KEY)
+
+        assert ccm.encrypt_and_digest(nonce, payload, b"\x11") == (cipherpayload, token)
+        assert ccm.decrypt_and_verify(nonce, cipherpayload, b"\x11", token) == payload
+        assert ccm.decrypt(nonce, cipherpayload) == payload
+
+    def test_ccm_wrong_mic(self):
+        """Test that a wrong MIC is rejected."""
+        nonce = bytes(range(12))
+        ccm = AesCcm(KEY)
+        cipherpayload, token = ccm.encrypt_and_digest(nonce, b"\x02\x10\x01", b"\x11")
+
+        with pytest.raises(ValueError):
+            ccm.decrypt_and_verify(nonce, cipherpayload, b"\x11", bytes(4))
+
+    def test_missing_key(self):
+        """Test that a missing encryption key is reported once per interval per device."""
+        data_string = "043e2a020100005f12342d585a1e0201061a1695fe5858480b685f12342d585a0b1841e2aa000e00a4964fb5b6"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser()
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg["data"] is False
+        assert ble_parser.should_report_missing_key(bytes.fromhex("5A582D34125F")) is False
+        assert ble_parser.ciphers == {}
+
+        ble_parser.missing_keys[bytes.fromhex("5A582D34125F")] -= MISSING_KEY_REPORT_INTERVAL
+        assert ble_parser.should_report_missing_key(bytes.fromhex("5A582D34125F")) is True
+        assert ble_parser.should_report_missing_key(bytes.fromhex("5A582D34125F")) is False
@@ -0,0 +1,68 @@
+"""The tests for the advertisement dispatch of the ble_parser."""
+from ble_monitor.ble_parser import BleParser
+from ble_monitor.ble_parser.dispatch import (
+    MAN_SPEC_DATA_FALLBACK_INDEX,
+    MAN_SPEC_DATA_FALLBACK_RULES,
+    MAN_SPEC_DATA_RULES,
+    SERVICE_DATA_RULES,
+    UNKNOWN,
+    match_man_spec_data,
+)
+
+
+class TestDispatch:
+    """Tests for the advertisement dispatch"""
+
+    def test_unknown_manufacturer_data(self):
+        """Test that unknown manufacturer specific data is rejected."""
+        data_string = "043e1a0201000055443322115a0e02011a0aff4c001005011844a12bba"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser()
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg is None
+        assert tracker_msg is None
+
+    def test_unknown_service_data(self):
+        """Test that unknown service data is rejected."""
+        data_string = "043e160201000055443322115a0a02011a06162cfe000c8aba"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser()
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg is None
+        assert tracker_msg is None
+
+    def test_tracker_of_unknown_device(self):
+        """Test that tracker data is still reported for unknown devices."""
+        data_string = "043e1a0201000055443322115a0e02011a0aff4c001005011844a12bba"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(tracker_whitelist=[bytes.fromhex("5A1122334455")])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg is None
+        assert tracker_msg["mac"] == "5A1122334455"
+        assert tracker_msg["rssi"] == -70
+        assert tracker_msg["is connected"]
+
+    def test_fallback_rule_order(self):
+        """Test that unsupported 0xF0FF devices are not parsed by later rules (AltBeacon)."""
+        man_spec_data = bytes.fromhex("1BFFFFFFBEACD3162F5AF3EE494799DB09756062D0FC005A0005C400")
+        adv = ("", 0xF0FF, None, [])
+
+        assert len(MAN_SPEC_DATA_FALLBACK_INDEX[0x1B]) == 2
+        assert match_man_spec_data(man_spec_data, adv) is UNKNOWN
+        assert match_man_spec_data(man_spec_data, ("", None, None, [])) is not UNKNOWN
+
+    def test_parser_names(self):
+        """Test that all handlers in the rule tables have the name of their parser."""
+        rules = list(MAN_SPEC_DATA_FALLBACK_RULES)
+        for table in (SERVICE_DATA_RULES, MAN_SPEC_DATA_RULES):
+            for table_rules in table.values():
+                rules.extend(table_rules)
+        names = {handler.parser_name for _, _, handler in rules if handler is not UNKNOWN}
+
+        assert {"atc", "bthome", "ibeacon", "xiaogui"} <= names
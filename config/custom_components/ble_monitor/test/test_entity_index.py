@@ -0,0 +1,40 @@
+"""The tests for the entity type and device indexes of the entity updaters."""
+from homeassistant.const import CONF_MAC
+
+from ble_monitor.const import CONF_UUID, SENSOR_TYPES
+from ble_monitor.helper import devices_by_id, index_entity_types
+
+
+class EntityClass:
+    """Stand-in for an entity class"""
+
+
+class TestEntityIndex:
+    """Tests for the entity type and device indexes"""
+
+    def test_index_entity_types(self):
+        """Test that descriptions and classes are indexed on measurement key and unique id."""
+        namespace = {description.sensor_class: EntityClass for description in SENSOR_TYPES}
+        sensor_types, sensor_keys_by_unique_id = index_entity_types(SENSOR_TYPES, namespace)
+        description, sensor_class = sensor_types["temperature"]
+
+        assert description is [item for item in SENSOR_TYPES if item.key == "temperature"][0]
+        assert sensor_class is EntityClass
+        assert "temperature" in sensor_keys_by_unique_id[description.unique_id]
+
+    def test_devices_by_id(self):
+        """Test that configured devices are indexed on upper case mac or uuid."""
+        devices = [
+            {CONF_MAC: "a4:c1:38:00:00:01", "name": "first"},
+            {CONF_UUID: "e2c56db5-dffb-48d2-b060-d0f5a71096e0", CONF_MAC: None},
+            {CONF_MAC: "A4:C1:38:00:00:01", "name": "second"},
+        ]
+        index = devices_by_id(devices)
+
+        assert [device["name"] for device in index["A4:C1:38:00:00:01"]] == ["first", "second"]
+        assert index["E2C56DB5-DFFB-48D2-B060-D0F5A71096E0"] == [devices[1]]
+
+        devices[0] = {CONF_MAC: "A4:C1:38:00:00:02"}
+        index = devices_by_id(devices)
+        assert [device["name"] for device in index["A4:C1:38:00:00:01"]] == ["second"]
+        assert "A4:C1:38:00:00:02" in index
@@ -0,0 +1,116 @@
+"""The tests for the parse pool of the HCIdump thread."""
+import queue
+from threading import Event
+import time
+
+from ble_monitor.ble_parser import BleParser
+from ble_monitor.parse_pool import ParsePool, frame_mac, parse_worker
+
+DATA_STRINGS = [
+    "043e2502010000219335342d5819020106151695fe5020aa01da219335342d580d1004fe004802c4",
+    "043E2B0201000045C5DF38C1A41F0A09423531373843353435030388EC0201050CFF010001010102FC87640002BF",
+    "043e1a0201000055443322115a0e02011a0aff4c001005011844a12bba",
+    "043E2A02010001433EA2C96B6A1E02011A1AFF4C000215E2C56DB5DFFB48D2B060D0F5A71096E000640000C5B3",
+]
+# local name that is not valid UTF-8
+MALFORMED_DATA_STRING = "043E150201000045C5DF38C1A4090201060509FF414243BF"
+
+
+class TestParsePool:
+    """Tests for the parse pool"""
+
+    def test_frame_mac(self):
+        """Test that the MAC is taken from the frame to distribute it over the workers."""
+        data = bytes(bytearray.fromhex(DATA_STRINGS[0]))
+
+        assert frame_mac(data) == bytes.fromhex("219335342d58")
+
+    def test_parse_pool(self):
+        """Test that the pool returns the same results as the parser, in the same order."""
+        frames = [(bytes(bytearray.fromhex(data_string)), "gw") for data_string in DATA_STRINGS]
+        tracker_whitelist = [bytes.fromhex("5A1122334455")]
+        ble_parser = BleParser(tracker_whitelist=tracker_whitelist)
+        expected = []
+        for data, gateway_id in frames:
+            sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+            if sensor_msg or tracker_msg:
+                expected.append((sensor_msg, tracker_msg, gateway_id))
+
+        results = []
+        done = Event()
+
+        def callback(sensor_msg, tracker_msg, gateway_id):
+            results.append((sensor_msg, tracker_msg, gateway_id))
+            if len(results) == len(expected):
+                done.set()
+
+        parse_pool = ParsePool({"tracker_whitelist": tracker_whitelist}, 2, callback)
+        parse_pool.start()
+        try:
+            parse_pool.submit(frames)
+            assert done.wait(60)
+        finally:
+            parse_pool.stop()
+
+        assert results == expected
+        assert parse_pool.pending_frames == 0
+        assert parse_pool.frames_parsed == len(frames)
+
+    def test_parse_pool_dropped(self):
+        """Test that batches are dropped when too many frames are waiting."""
+        frames = [(bytes(bytearray.fromhex(data_string)), "gw") for data_string in DATA_STRINGS]
+        parse_pool = ParsePool({}, 2, None, max_pending=2)
+        parse_pool.submit(frames)
+
+        assert parse_pool.dropped_frames == len(frames)
+        assert parse_pool.pending_frames == 0
+
+    def test_parse_worker_malformed(self):
+        """Test that a malformed frame gives an empty result, and the worker continues."""
+        in_queue = queue.Queue()
+        out_queue = queue.Queue()
+        frames = [
+            (0, bytes.fromhex(MALFORMED_DATA_STRING)),
+            (1, bytes.fromhex(DATA_STRINGS[0])),
+        ]
+        in_queue.put((0, frames))
+        in_queue.put(None)
+
+        parse_worker({}, in_queue, out_queue, 0)
+
+        batch_id, worker_id, results, _, frames_parsed = out_queue.get_nowait()
+        assert (batch_id, worker_id) == (0, 0)
+        assert [index for index, _, _ in results] == [1]
+        assert frames_parsed == 2
+
+    def test_parse_pool_worker_stopped(self):
+        """Test that a worker that stopped is restarted, and its frames are dropped."""
+        frames = [(bytes(bytearray.fromhex(data_string)), "gw") for data_string in DATA_STRINGS]
+        results = []
+        done = Event()
+
+        def callback(sensor_msg, tracker_msg, gateway_id):
+            results.append((sensor_msg, tracker_msg, gateway_id))
+            done.set()
+
+        parse_pool = ParsePool({}, 1, callback)
+        parse_pool.start()
+        try:
+            stopped = parse_pool._processes[0]
+            stopped.terminate()
+            stopped.join()
+            parse_pool.submit(frames)
+            deadline = time.monotonic() + 60
+            while parse_pool.pending_frames and time.monotonic() < deadline:
+                time.sleep(0.1)
+            assert parse_pool.pending_frames == 0
+            assert parse_pool.dropped_frames == len(frames)
+            assert not results
+
+            parse_pool.submit(frames[:1])
+            assert done.wait(60)
+        finally:
+            parse_pool.stop()
+
+        assert parse_pool._processes == []
+        assert results[0][2] == "gw"
@@ -0,0 +1,57 @@
+"""The tests for the whitelist prefilter of the ble_parser."""
+from ble_monitor.ble_parser import BleParser
+
+
+class TestPrefilter:
+    """Tests for the whitelist prefilter"""
+
+    def test_prefilter_reject(self):
+        """Test that frames of devices that are not whitelisted are rejected."""
+        data_string = "043E2B0201000045C5DF38C1A41F0A09423531373843353435030388EC0201050CFF010001010102FC87640002BF"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(discovery=False, sensor_whitelist=[bytes.fromhex("A4C138000000")])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg is None
+        assert tracker_msg is None
+        assert ble_parser.frames_rejected == 1
+        assert ble_parser.frames_parsed == 0
+
+    def test_prefilter_mac(self):
+        """Test that frames of whitelisted MACs are parsed (Govee H5178 outdoor sensor uses MAC + 1)."""
+        data_string = "043E2B0201000045C5DF38C1A41F0A09423531373843353435030388EC0201050CFF010001010102FC87640002BF"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(discovery=False, sensor_whitelist=[bytes.fromhex("A4C138DFC546")])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg["type"] == "H5178-outdoor"
+        assert sensor_msg["mac"] == "A4C138DFC546"
+        assert ble_parser.frames_rejected == 0
+        assert ble_parser.frames_parsed == 1
+
+    def test_prefilter_uuid(self):
+        """Test that frames with a whitelisted UUID are parsed."""
+        data_string = "043E2A02010001433EA2C96B6A1E02011A1AFF4C000215E2C56DB5DFFB48D2B060D0F5A71096E000640000C5B3"
+        data = bytes(bytearray.fromhex(data_string))
+        uuid = bytes.fromhex("e2c56db5dffb48d2b060d0f5a71096e0")
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(discovery=False, sensor_whitelist=[uuid], tracker_whitelist=[uuid])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg["type"] == "iBeacon"
+        assert tracker_msg["is connected"]
+        assert ble_parser.frames_parsed == 1
+
+    def test_prefilter_discovery(self):
+        """Test that the prefilter is not used when discovery is enabled."""
+        data_string = "043E2B0201000045C5DF38C1A41F0A09423531373843353435030388EC0201050CFF010001010102FC87640002BF"
+        data = bytes(bytearray.fromhex(data_string))
+        # pylint: disable=unused-variable
+        ble_parser = BleParser(sensor_whitelist=[bytes.fromhex("A4C138000000")])
+        sensor_msg, tracker_msg = ble_parser.parse_raw_data(data)
+
+        assert sensor_msg["type"] == "H5178-outdoor"
+        assert ble_parser.prefilter_macs is None
+        assert ble_parser.frames_rejected == 0
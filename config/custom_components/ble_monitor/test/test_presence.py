@@ -0,0 +1,63 @@
+"""The tests for the presence table of the BLE devices."""
+from ble_monitor.presence import PresenceTable
+
+
+class TestPresenceTable:
+    """Tests for the last seen times, RSSI history and presence"""
+
+    def test_rssi_history(self):
+        """Test that only the last RSSI values are kept, from old to new."""
+        presence = PresenceTable(history=4)
+        for rssi in range(-80, -70):
+            presence.seen("A4C138000001", 100.0, rssi)
+        presence.seen("A4C138000002", 100.0, -60)
+
+        assert presence.rssi_values("A4C138000001") == [-74, -73, -72, -71]
+        assert presence.rssi_values("A4C138000002") == [-60]
+        assert presence.rssi_values("A4C138000003") == []
+        assert len(presence.rssi) == 8
+
+    def test_sweep(self):
+        """Test that tracked devices are marked away after the consider home interval."""
+        presence = PresenceTable()
+        presence.track("A4C138000001", 180)
+        presence.track("A4C138000002", 60)
+        presence.seen("A4C138000003", 100.0, -60)
+
+        assert presence.seen("A4C138000001", 100.0, -70) is True
+        assert presence.seen("A4C138000001", 110.0, -70) is False
+        assert presence.seen("A4C138000002", 100.0, -70) is True
+        assert presence.sweep(200.0) == ["A4C138000002"]
+        assert presence.is_home("A4C138000001") is True
+        assert presence.sweep(300.0) == ["A4C138000001"]
+        assert presence.sweep(400.0) == []
+        assert presence.is_home("A4C138000003") is False
+
+    def test_restore(self):
+        """Test that a restored last seen time only marks a device home within consider home."""
+        presence = PresenceTable()
+        presence.track("A4C138000001", 180)
+        presence.track("A4C138000002", 180)
+
+        assert presence.seen("A4C138000001", 100.0, now=200.0) is True
+        assert presence.seen("A4C138000002", 100.0, now=300.0) is False
+        assert presence.diagnostics(300.0)["A4C138000002"] == {
+            "last_seen": 200.0, "rssi": [], "home": False
+        }
+
+    def test_release(self):
+        """Test that the slot of a released device is cleared and reused."""
+        presence = PresenceTable(history=4)
+        presence.track("A4C138000001", 180)
+        presence.seen("A4C138000001", 100.0, -70)
+        presence.seen("A4C138000002", 100.0, -60)
+        presence.release("A4C138000001")
+        presence.release("A4C138000003")
+
+        assert presence.is_tracked("A4C138000001") is False
+        assert presence.sweep(400.0) == []
+        assert presence.seen("A4C138000004", 110.0) is False
+        assert presence.slots == {"A4C138000002": 1, "A4C138000004": 0}
+        assert presence.rssi_values("A4C138000004") == []
+        assert len(presence.last_seen) == 2
+        assert "A4C138000001" not in presence.diagnostics(400.0)
@@ -0,0 +1,21 @@
+"""The tests for the routing of parsed data to the entity updaters."""
+from ble_monitor import build_routing_table
+from ble_monitor.const import AUTO_MANUFACTURER_DICT, MANUFACTURER_DICT
+
+
+class TestRouting:
+    """Tests for the routing table"""
+
+    def test_routing_table_device_types(self):
+        """Test that all device types are in the routing table."""
+        routing_table = build_routing_table()
+
+        assert set(routing_table) == set(MANUFACTURER_DICT) | set(AUTO_MANUFACTURER_DICT)
+
+    def test_routing_table_keys(self):
+        """Test the measuring and binary measurement keys of a device type."""
+        sensor_keys, binary_keys = build_routing_table()["LYWSDCGQ"]
+
+        assert sensor_keys == {"temperature", "humidity", "battery", "rssi"}
+        assert binary_keys == {"battery"}
+        assert not binary_keys.isdisjoint({"battery": 100}.keys())
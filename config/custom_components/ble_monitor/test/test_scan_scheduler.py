@@ -0,0 +1,53 @@
+"""The tests for the scan scheduler of the Bluetooth adapters."""
+from ble_monitor.scan_scheduler import ScanAdapter
+
+
+def receive(adapter, count):
+    """Let the adapter receive a number of HCI events."""
+    for _ in range(count):
+        adapter.process(b"\x04\x3e")
+
+
+class TestScanAdapter:
+    """Tests for the health check of the adapters"""
+
+    def test_process(self):
+        """Test that HCI events are counted and passed on."""
+        processed = []
+        adapter = ScanAdapter(0, False, processed.append)
+        receive(adapter, 3)
+
+        assert adapter.evt_cnt == 3
+        assert processed == [b"\x04\x3e"] * 3
+
+    def test_healthy(self):
+        """Test that an adapter with a steady event rate is not restarted."""
+        adapter = ScanAdapter(0, False, lambda data: None)
+        adapter.scanning = True
+        adapter.check_health(now=0)
+        for period in range(1, 6):
+            receive(adapter, 100 + period)
+            assert adapter.check_health(now=60 * period) is True
+
+        assert adapter.evt_cnt == 0
+        assert adapter.total_events == 515
+        assert round(adapter.event_rate, 1) == 1.8
+
+    def test_collapse(self):
+        """Test that an adapter is restarted when its event rate collapses."""
+        adapter = ScanAdapter(1, True, lambda data: None)
+        adapter.scanning = True
+        adapter.check_health(now=0)
+        receive(adapter, 600)
+        assert adapter.check_health(now=60) is True
+        receive(adapter, 30)
+        assert adapter.check_health(now=120) is False
+        assert adapter.check_health(now=180) is False
+
+    def test_not_scanning(self):
+        """Test that an adapter that is not scanning is restarted."""
+        adapter = ScanAdapter(0, False, lambda data: None)
+        receive(adapter, 10)
+
+        assert adapter.check_health(now=60) is False
+        assert adapter.diagnostics()["total_events"] == 10
@@ -0,0 +1,15 @@
+"""The tests for the Xiaomi MiBeacon object table."""
+import inspect
+
+import pytest
+
+from ble_monitor.ble_parser.xiaomi import xiaomi_dataobject_dict
+
+
+@pytest.mark.parametrize("obj_typecode", sorted(xiaomi_dataobject_dict))
+def test_dataobject_device_type(obj_typecode):
+    """Test that only the converters that take the device type are flagged to get it."""
+    converter, needs_device_type = xiaomi_dataobject_dict[obj_typecode]
+    parameters = inspect.signature(converter).parameters
+
+    assert len(parameters) == (2 if needs_device_type else 1)
@@ -29,7 +29,7 @@ from .enums import ConfigurationType, HacsDisabledReason, HacsStage, LovelaceMod
 from .frontend import async_register_frontend
 from .utils.configuration_schema import hacs_config_combined
 from .utils.data import HacsData
-from .utils.queue_manager import QueueManager
+from .utils.queue_manager import QueueManager, RateLimitBucket
 from .utils.version import version_left_higher_or_equal_then_right
 from .websocket import async_register_websocket_commands
 
@@ -85,7 +85,7 @@ async def async_initialize_integration(
     hacs.version = integration.version
     hacs.configuration.dev = integration.version == "0.0.0"
     hacs.hass = hass
-    hacs.queue = QueueManager(hass=hass)
+    hacs.queue = QueueManager(hass=hass, rate_limit=RateLimitBucket())
     hacs.data = HacsData(hacs=hacs)
     hacs.system.running = True
     hacs.session = clientsession
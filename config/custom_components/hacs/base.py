@@ -4,12 +4,14 @@ from __future__ import annotations
 import asyncio
 from dataclasses import asdict, dataclass, field
 from datetime import timedelta
+from functools import partial
 import gzip
 import logging
 import math
 import os
 import pathlib
 import shutil
+from tempfile import SpooledTemporaryFile
 from typing import TYPE_CHECKING, Any, Awaitable, Callable
 
 from aiogithubapi import (
@@ -38,6 +40,7 @@ from .enums import (
     HacsDisabledReason,
     HacsDispatchEvent,
     HacsGitHubRepo,
+    HacsQueuePriority,
     HacsStage,
     LovelaceMode,
 )
@@ -51,7 +54,9 @@ from .exceptions import (
     HomeAssistantCoreRepositoryException,
 )
 from .repositories import RERPOSITORY_CLASSES
+from .repositories.base import next_revision
 from .utils.decode import decode_content
+from .utils.installer import CHUNK_SIZE, SpooledDownload, StreamedFile
 from .utils.json import json_loads
 from .utils.logger import LOGGER
 from .utils.queue_manager import QueueManager
@@ -165,6 +170,14 @@ class HacsStatus:
     new: bool = False
 
 
+@dataclass
+class HacsETagCache:
+    """Hits (not modified) and misses of the conditional GitHub API requests."""
+
+    hits: int = 0
+    misses: int = 0
+
+
 @dataclass
 class HacsSystem:
     """HACS System info."""
@@ -189,6 +202,14 @@ class HacsRepositories:
     _repositories_by_full_name: dict[str, str] = field(default_factory=dict)
     _repositories_by_id: dict[str, str] = field(default_factory=dict)
     _removed_repositories: list[RemovedRepository] = field(default_factory=list)
+    _removed_repositories_by_full_name: dict[str, RemovedRepository] = field(
+        default_factory=dict
+    )
+    # Indexes by category and installed flag, updated when the data of a repository changes
+    _repositories_by_category: dict[str, dict[str, HacsRepository]] = field(default_factory=dict)
+    _downloaded_repositories: dict[str, HacsRepository] = field(default_factory=dict)
+    # Revision of the unregistration per repository id, for the changes since a revision
+    _unregistered_repositories: dict[str, int] = field(default_factory=dict)
 
     @property
     def list_all(self) -> list[HacsRepository]:
@@ -203,7 +224,28 @@ class HacsRepositories:
     @property
     def list_downloaded(self) -> list[HacsRepository]:
         """Return a list of downloaded repositories."""
-        return [repo for repo in self._repositories if repo.data.installed]
+        return list(self._downloaded_repositories.values())
+
+    @property
+    def list_pending_update(self) -> list[HacsRepository]:
+        """Return a list of downloaded repositories with a pending update."""
+        return [repo for repo in self._downloaded_repositories.values() if repo.pending_update]
+
+    def list_by_category(self, category: str) -> list[HacsRepository]:
+        """Return a list of the repositories in a category."""
+        return list(self._repositories_by_category.get(category, {}).values())
+
+    def list_changed_since(self, revision: int) -> list[HacsRepository]:
+        """Return a list of the repositories that changed after revision."""
+        return [repo for repo in self._repositories if repo.data.revision > revision]
+
+    def list_unregistered_since(self, revision: int) -> list[str]:
+        """Return a list of the ids of the repositories that were unregistered after revision."""
+        return [
+            repo_id
+            for repo_id, unregistered in self._unregistered_repositories.items()
+            if unregistered > revision
+        ]
 
     def register(self, repository: HacsRepository, default: bool = False) -> None:
         """Register a repository."""
@@ -220,6 +262,14 @@ class HacsRepositories:
 
         self._repositories_by_id[repo_id] = repository
         self._repositories_by_full_name[repository.data.full_name_lower] = repository
+        self._repositories_by_category.setdefault(repository.data.category, {})[
+            repo_id
+        ] = repository
+        if repository.data.installed:
+            self._downloaded_repositories[repo_id] = repository
+        repository.data.index_listener = partial(self._async_update_indexes, repository)
+        repository.data.touch()
+        self._unregistered_repositories.pop(repo_id, None)
 
         if default:
             self.mark_default(repository)
@@ -242,6 +292,28 @@ class HacsRepositories:
 
         self._repositories_by_id.pop(repo_id, None)
         self._repositories_by_full_name.pop(repository.data.full_name_lower, None)
+        self._repositories_by_category.get(repository.data.category, {}).pop(repo_id, None)
+        self._downloaded_repositories.pop(repo_id, None)
+        repository.data.index_listener = None
+        self._unregistered_repositories[repo_id] = next_revision()
+
+    def _async_update_indexes(
+        self,
+        repository: HacsRepository,
+        attribute: str,
+        old_value: Any,
+        new_value: Any,
+    ) -> None:
+        """Move a registered repository in the indexes when its category or installed flag changes."""
+        repo_id = str(repository.data.id)
+        if attribute == "category":
+            self._repositories_by_category.get(old_value, {}).pop(repo_id, None)
+            self._repositories_by_category.setdefault(new_value, {})[repo_id] = repository
+        elif attribute == "installed":
+            if new_value:
+                self._downloaded_repositories[repo_id] = repository
+            else:
+                self._downloaded_repositories.pop(repo_id, None)
 
     def mark_default(self, repository: HacsRepository) -> None:
         """Mark a repository as default."""
@@ -253,7 +325,9 @@ class HacsRepositories:
         if not self.is_registered(repository_id=repo_id):
             return
 
-        self._default_repositories.add(repo_id)
+        if repo_id not in self._default_repositories:
+            self._default_repositories.add(repo_id)
+            repository.data.touch()
 
     def set_repository_id(self, repository, repo_id):
         """Update a repository id."""
@@ -314,22 +388,16 @@ class HacsRepositories:
 
     def is_removed(self, repository_full_name: str) -> bool:
         """Check if a repository is removed."""
-        return repository_full_name in (
-            repository.repository for repository in self._removed_repositories
-        )
+        return repository_full_name in self._removed_repositories_by_full_name
 
     def removed_repository(self, repository_full_name: str) -> RemovedRepository:
         """Get repository by full name."""
-        if self.is_removed(repository_full_name):
-            if removed := [
-                repository
-                for repository in self._removed_repositories
-                if repository.repository == repository_full_name
-            ]:
-                return removed[0]
+        if removed := self._removed_repositories_by_full_name.get(repository_full_name):
+            return removed
 
         removed = RemovedRepository(repository=repository_full_name)
         self._removed_repositories.append(removed)
+        self._removed_repositories_by_full_name[repository_full_name] = removed
         return removed
 
 
@@ -340,6 +408,7 @@ class HacsBase:
     configuration = HacsConfiguration()
     core = HacsCore()
     data: HacsData | None = None
+    etag_cache = HacsETagCache()
     frontend_version: str | None = None
     github: GitHub | None = None
     githubapi: GitHubAPI | None = None
@@ -426,14 +495,7 @@ class HacsBase:
                         with gzip.open(file_path + ".gz", "wb") as f_out:
                             shutil.copyfileobj(f_in, f_out)
 
-            # LEGACY! Remove with 2.0
-            if "themes" in file_path and file_path.endswith(".yaml"):
-                filename = file_path.split("/")[-1]
-                base = file_path.split("/themes/")[0]
-                combined = f"{base}/themes/{filename}"
-                if os.path.exists(combined):
-                    self.log.info("Removing old theme file %s", combined)
-                    os.remove(combined)
+            self._remove_legacy_theme_file(file_path)
 
         try:
             await self.hass.async_add_executor_job(_write_file)
@@ -443,10 +505,25 @@ class HacsBase:
 
         return os.path.exists(file_path)
 
+    def _remove_legacy_theme_file(self, file_path: str) -> None:
+        """Remove the theme file of the old location."""
+        # LEGACY! Remove with 2.0
+        if "themes" in file_path and file_path.endswith(".yaml"):
+            filename = file_path.split("/")[-1]
+            base = file_path.split("/themes/")[0]
+            combined = f"{base}/themes/{filename}"
+            if os.path.exists(combined):
+                self.log.info("Removing old theme file %s", combined)
+                os.remove(combined)
+
     async def async_can_update(self) -> int:
         """Helper to calculate the number of repositories we can fetch data for."""
         try:
             response = await self.async_github_api_method(self.githubapi.rate_limit)
+            self.queue.rate_limit.update(
+                response.data.resources.core.remaining or 0,
+                response.data.resources.core.reset,
+            )
             if ((limit := response.data.resources.core.remaining or 0) - 1000) >= 10:
                 return math.floor((limit - 1000) / 10)
             reset = dt.as_local(dt.utc_from_timestamp(response.data.resources.core.reset))
@@ -484,7 +561,10 @@ class HacsBase:
         _exception = None
 
         try:
-            return await method(*args, **kwargs)
+            response = await method(*args, **kwargs)
+            if self.queue is not None and self.queue.rate_limit is not None:
+                self.queue.rate_limit.update_from_headers(getattr(response, "headers", None))
+            return response
         except GitHubAuthenticationException as exception:
             self.disable_hacs(HacsDisabledReason.INVALID_TOKEN)
             _exception = exception
@@ -718,6 +798,118 @@ class HacsBase:
 
             return None
 
+    async def _async_stream_download(
+        self,
+        url: str,
+        new_target: Callable[[], StreamedFile | SpooledDownload],
+        *,
+        headers: dict | None = None,
+    ) -> StreamedFile | SpooledDownload | None:
+        """Stream a download in chunks to a new target, return the target if completed."""
+        if url is None:
+            return None
+
+        if "tags/" in url:
+            url = url.replace("tags/", "")
+
+        self.log.debug("Downloading %s", url)
+        timeouts = 0
+
+        while timeouts < 5:
+            target = new_target()
+            try:
+                async with self.session.get(
+                    url=url,
+                    timeout=ClientTimeout(total=60),
+                    headers=headers,
+                ) as request:
+                    # Make sure that we got a valid result
+                    if request.status != 200:
+                        raise HacsException(
+                            f"Got status code {request.status} when trying to download {url}"
+                        )
+
+                    await self.hass.async_add_executor_job(target.open)
+                    chunks, size = [], 0
+                    async for chunk in request.content.iter_chunked(CHUNK_SIZE):
+                        chunks.append(chunk)
+                        size += len(chunk)
+                        if size >= CHUNK_SIZE:
+                            await self.hass.async_add_executor_job(target.write, b"".join(chunks))
+                            chunks, size = [], 0
+                    if chunks:
+                        await self.hass.async_add_executor_job(target.write, b"".join(chunks))
+
+                return target
+
+            except asyncio.TimeoutError:
+                await self.hass.async_add_executor_job(target.abort)
+                self.log.warning(
+                    "A timeout of 60! seconds was encountered while downloading %s, "
+                    "using over 60 seconds to download a single file is not normal. "
+                    "This is not a problem with HACS but how your host communicates with GitHub. "
+                    "Retrying up to 5 times to mask/hide your host/network problems to "
+                    "stop the flow of issues opened about it. "
+                    "Tries left %s",
+                    url,
+                    (4 - timeouts),
+                )
+                timeouts += 1
+                await asyncio.sleep(1)
+                continue
+
+            except BaseException as exception:  # lgtm [py/catch-base-exception] pylint: disable=broad-except
+                await self.hass.async_add_executor_job(target.abort)
+                self.log.exception("Download failed - %s", exception)
+
+            return None
+
+        return None
+
+    async def async_download_file_to_path(
+        self,
+        url: str,
+        file_path: str,
+        *,
+        headers: dict | None = None,
+    ) -> bool:
+        """Download a file straight to file_path, return True if it was installed.
+
+        The content is streamed to a temporary file (with its hash and the gzip file
+        for .js files made in the same pass), that replaces the installed file unless
+        the installed file has the same content.
+        """
+        streamed_file = await self._async_stream_download(
+            url, lambda: StreamedFile(file_path), headers=headers
+        )
+        if streamed_file is None:
+            return False
+
+        try:
+            if not await self.hass.async_add_executor_job(streamed_file.close):
+                self.log.debug("%s is unchanged, keeping the installed file", file_path)
+            await self.hass.async_add_executor_job(self._remove_legacy_theme_file, file_path)
+        except BaseException as error:  # lgtm [py/catch-base-exception] pylint: disable=broad-except
+            await self.hass.async_add_executor_job(streamed_file.abort)
+            self.log.error("Could not write data to %s - %s", file_path, error)
+            return False
+
+        return True
+
+    async def async_download_file_to_spool(
+        self,
+        url: str,
+        *,
+        headers: dict | None = None,
+    ) -> SpooledTemporaryFile | None:
+        """Download a file, and return it as a file object.
+
+        The content is kept in memory, or in a temporary file when it is larger than
+        ZIP_SPOOL_SIZE. Close the file object (in the executor) when done.
+        """
+        download = await self._async_stream_download(url, SpooledDownload, headers=headers)
+        return download.file if download is not None else None
+
     async def async_recreate_entities(self) -> None:
         """Recreate entities."""
         if self.configuration == ConfigurationType.YAML or not self.configuration.experimental:
@@ -786,7 +978,12 @@ class HacsBase:
                 self.repositories.mark_default(repository)
                 if self.status.new and self.configuration.dev:
                     # Force update for new installations
-                    self.queue.add(repository.common_update())
+                    self.queue.add(
+                        repository.common_update(),
+                        HacsQueuePriority.INSTALLED
+                        if repository.data.installed
+                        else HacsQueuePriority.DEFAULT,
+                    )
                 continue
 
             self.queue.add(
@@ -803,9 +1000,14 @@ class HacsBase:
             return
         self.log.debug("Starting recurring background task for all repositories")
 
-        for repository in self.repositories.list_all:
-            if repository.data.category in self.common.categories:
-                self.queue.add(repository.common_update())
+        for category in self.common.categories:
+            for repository in self.repositories.list_by_category(category):
+                self.queue.add(
+                    repository.common_update(),
+                    HacsQueuePriority.INSTALLED
+                    if repository.data.installed
+                    else HacsQueuePriority.DEFAULT,
+                )
 
         self.async_dispatch(HacsDispatchEvent.REPOSITORY, {"action": "reload"})
         self.log.debug("Recurring background task for all repositories done")
@@ -834,25 +1036,23 @@ class HacsBase:
             self.log.debug("Queue is already running")
             return
 
-        async def _handle_queue():
-            if not self.queue.has_pending_tasks:
-                await self.data.async_write()
-                return
+        while self.queue.has_pending_tasks:
+            # refills the rate limit bucket of the queue
             can_update = await self.async_can_update()
             self.log.debug(
                 "Can update %s repositories, " "items in queue %s",
                 can_update,
                 self.queue.pending_tasks,
             )
-            if can_update != 0:
-                try:
-                    await self.queue.execute(can_update)
-                except HacsExecutionStillInProgress:
+            if can_update == 0:
+                return
+            try:
+                if await self.queue.execute() == 0:
                     return
+            except HacsExecutionStillInProgress:
+                return
 
-                await _handle_queue()
-
-        await _handle_queue()
+        await self.data.async_write()
 
     async def async_handle_removed_repositories(self, _=None) -> None:
         """Handle removed repositories."""
@@ -900,7 +1100,10 @@ class HacsBase:
 
         for repository in self.repositories.list_downloaded:
             if repository.data.category in self.common.categories:
-                self.queue.add(repository.update_repository(ignore_issues=True))
+                self.queue.add(
+                    repository.update_repository(ignore_issues=True),
+                    HacsQueuePriority.INSTALLED,
+                )
 
         self.log.debug("Recurring background task for downloaded repositories done")
 
@@ -949,7 +1152,7 @@ class HacsBase:
                     was_installed = True
                     stored["acknowledged"] = False
                     # Remove from HACS
-                    critical_queue.add(repo.uninstall())
+                    critical_queue.add(repo.uninstall(), HacsQueuePriority.CRITICAL)
                     repo.remove()
 
             stored_critical.append(stored)
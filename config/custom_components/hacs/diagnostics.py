@@ -73,6 +73,8 @@ async def async_get_config_entry_diagnostics(
             }
         )
 
+    data["queue"] = hacs.queue.diagnostics()
+
     try:
         rate_limit_response = await hacs.githubapi.rate_limit()
         data["rate_limit"] = rate_limit_response.data.as_dict
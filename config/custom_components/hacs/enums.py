@@ -73,3 +73,11 @@ class HacsDisabledReason(str, Enum):
     CONSTRAINS = "constrains"
     LOAD_HACS = "load_hacs"
     RESTORE = "restore"
+
+
+class HacsQueuePriority(int, Enum):
+    """Priority of a task in the queue, lower values are executed first."""
+
+    CRITICAL = 0
+    INSTALLED = 1
+    DEFAULT = 2
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from asyncio import sleep
 from datetime import datetime
+import itertools
 import os
 import pathlib
 import shutil
@@ -13,6 +14,7 @@ import zipfile
 from aiogithubapi import (
     AIOGitHubAPIException,
     AIOGitHubAPINotModifiedException,
+    GitHubNotModifiedException,
     GitHubReleaseModel,
 )
 from aiogithubapi.const import BASE_API_URL
@@ -32,6 +34,7 @@ from ..utils.backup import Backup, BackupNetDaemon
 from ..utils.decode import decode_content
 from ..utils.decorator import concurrent
 from ..utils.filters import filter_content_return_one_of_type
+from ..utils.installer import extract_zip
 from ..utils.json import json_loads
 from ..utils.logger import LOGGER
 from ..utils.path import is_safe
@@ -90,10 +93,69 @@ class FileInformation:
         self.name = name
 
 
-@attr.s(auto_attribs=True)
+# Attributes of RepositoryData that are indexed by HacsRepositories
+INDEXED_ATTRIBUTES = ("category", "installed")
+
+_revisions = itertools.count(1)
+
+
+def next_revision() -> int:
+    """Return a new revision, higher than the revision of every change so far."""
+    return next(_revisions)
+
+
+class ListEntryAttribute:
+    """Attribute outside of RepositoryData that is part of the repository list entry.
+
+    Setting a different value gives the data of the instance a new revision, so the
+    cached list entry of the repository is serialized again.
+    """
+
+    def __init__(self, default: Any = None) -> None:
+        """Initialize the attribute."""
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        """Store the value of the attribute as _<name> of the instance."""
+        self.name = f"_{name}"
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:
+        """Return the value of the attribute."""
+        if instance is None:
+            return self
+        return getattr(instance, self.name, self.default)
+
+    def __set__(self, instance: Any, value: Any) -> None:
+        """Set the value of the attribute, and touch the data if it changed."""
+        if self.name in instance.__dict__ and instance.__dict__[self.name] == value:
+            return
+        instance.__dict__[self.name] = value
+        if (data := getattr(instance, "data", None)) is not None:
+            data.touch()
+
+
+def _on_setattr(instance: RepositoryData, attribute: attr.Attribute, value: Any) -> Any:
+    """Mark the repository data as changed, and update the indexes of the registry."""
+    instance.dirty = True
+    instance.touch()
+    if instance.index_listener is not None and attribute.name in INDEXED_ATTRIBUTES:
+        if (old_value := getattr(instance, attribute.name)) != value:
+            instance.index_listener(attribute.name, old_value, value)
+    return value
+
+
+@attr.s(auto_attribs=True, on_setattr=_on_setattr)
 class RepositoryData:
     """RepositoryData class."""
 
+    # Set when an attribute is changed, cleared when the data is stored
+    dirty = True
+    # Set by HacsRepositories when registered, called when an indexed attribute changes
+    index_listener = None
+    # Revision of the last change, see next_revision
+    revision = 0
+
     archived: bool = False
     authors: list[str] = []
     category: str = ""
@@ -134,6 +196,10 @@ class RepositoryData:
             return self.domain
         return self.full_name.split("/")[-1]
 
+    def touch(self) -> None:
+        """Give the data a new revision, also for changes of the repository outside of it."""
+        self.revision = next_revision()
+
     def to_json(self):
         """Export to json."""
         return attr.asdict(self, filter=lambda attr, value: attr.name != "last_fetched")
@@ -230,9 +296,13 @@ class RepositoryReleases:
 class RepositoryPath:
     """RepositoryPath."""
 
-    local: str | None = None
+    local: str | None = ListEntryAttribute()
     remote: str | None = None
 
+    def __init__(self, data: RepositoryData | None = None) -> None:
+        """Set up RepositoryPath, data is touched when the local path changes."""
+        self.data = data
+
 
 class RepositoryContent:
     """RepositoryContent."""
@@ -246,13 +316,18 @@ class RepositoryContent:
 class HacsRepository:
     """HacsRepository."""
 
+    integration_manifest: dict = ListEntryAttribute()
+    pending_restart: bool = ListEntryAttribute()
+    repository_manifest: HacsManifest = ListEntryAttribute()
+    state: str | None = ListEntryAttribute()
+
     def __init__(self, hacs: HacsBase) -> None:
         """Set up HacsRepository."""
         self.hacs = hacs
         self.additional_info = ""
         self.data = RepositoryData()
         self.content = RepositoryContent()
-        self.content.path = RepositoryPath()
+        self.content.path = RepositoryPath(self.data)
         self.repository_object: AIOGitHubAPIRepository | None = None
         self.updated_info = False
         self.state = None
@@ -265,6 +340,10 @@ class HacsRepository:
         self.tree = []
         self.treefiles = []
         self.ref = None
+        # ETag per endpoint (releases, tree, hacs.json) of the last response that is kept in memory
+        self.etags: dict[str, tuple[str, str]] = {}
+        # Revision and serialized entry of the repository list websocket command
+        self.list_entry: tuple[int, str] | None = None
         self.logger = LOGGER
 
     def __str__(self) -> str:
@@ -425,7 +504,7 @@ class HacsRepository:
 
         # Get the content of hacs.json
         if RepositoryFile.HACS_JSON in [x.filename for x in self.tree]:
-            if manifest := await self.async_get_hacs_json():
+            if manifest := await self.async_get_hacs_json(conditional=True):
                 self.repository_manifest = HacsManifest.from_dict(manifest)
                 self.data.update_data(
                     self.repository_manifest.to_dict(),
@@ -461,18 +540,18 @@ class HacsRepository:
         self.logger.debug("%s Getting repository information", self.string)
 
         # Attach repository
-        current_etag = self.data.etag_repository
+        not_modified = False
         try:
-            await self.common_update_data(ignore_issues=ignore_issues, force=force)
+            not_modified = await self.common_update_data(ignore_issues=ignore_issues, force=force)
         except HacsRepositoryExistException:
             self.data.full_name = self.hacs.common.renamed_repositories[self.data.full_name]
-            await self.common_update_data(ignore_issues=ignore_issues, force=force)
+            not_modified = await self.common_update_data(ignore_issues=ignore_issues, force=force)
 
         except HacsException:
             if not ignore_issues and not force:
                 return False
 
-        if not self.data.installed and (current_etag == self.data.etag_repository) and not force:
+        if not_modified and not force:
             self.logger.debug("%s Did not update, content was not modified", self.string)
             return False
 
@@ -486,7 +565,7 @@ class HacsRepository:
 
         # Get the content of hacs.json
         if RepositoryFile.HACS_JSON in [x.filename for x in self.tree]:
-            if manifest := await self.async_get_hacs_json():
+            if manifest := await self.async_get_hacs_json(conditional=True):
                 self.repository_manifest = HacsManifest.from_dict(manifest)
                 self.data.update_data(
                     self.repository_manifest.to_dict(),
@@ -531,31 +610,20 @@ class HacsRepository:
     async def async_download_zip_file(self, content, validate) -> None:
         """Download ZIP archive from repository release."""
         try:
-            filecontent = await self.hacs.async_download_file(content.browser_download_url)
+            archive = await self.hacs.async_download_file_to_spool(content.browser_download_url)
 
-            if filecontent is None:
+            if archive is None:
                 validate.errors.append(f"[{content.name}] was not downloaded")
                 return
 
-            temp_dir = await self.hacs.hass.async_add_executor_job(tempfile.mkdtemp)
-            temp_file = f"{temp_dir}/{self.repository_manifest.filename}"
-
-            result = await self.hacs.async_save_file(temp_file, filecontent)
-            with zipfile.ZipFile(temp_file, "r") as zip_file:
-                zip_file.extractall(self.content.path.local)
-
-            def cleanup_temp_dir():
-                """Cleanup temp_dir."""
-                if os.path.exists(temp_dir):
-                    self.logger.debug("%s Cleaning up %s", self.string, temp_dir)
-                    shutil.rmtree(temp_dir)
-
-            if result:
-                self.logger.info("%s Download of %s completed", self.string, content.name)
-                await self.hacs.hass.async_add_executor_job(cleanup_temp_dir)
-                return
+            try:
+                await self.hacs.hass.async_add_executor_job(
+                    extract_zip, archive, self.content.path.local
+                )
+            finally:
+                await self.hacs.hass.async_add_executor_job(archive.close)
 
-            validate.errors.append(f"[{content.name}] was not downloaded")
+            self.logger.info("%s Download of %s completed", self.string, content.name)
         except BaseException:  # lgtm [py/catch-base-exception] pylint: disable=broad-except
             validate.errors.append("Download was not completed")
 
@@ -599,53 +667,49 @@ class HacsRepository:
 
         url = f"{BASE_API_URL}/repos/{self.data.full_name}/zipball/{ref}"
 
-        filecontent = await self.hacs.async_download_file(
+        archive = await self.hacs.async_download_file_to_spool(
             url,
             headers={
                 "Authorization": f"token {self.hacs.configuration.token}",
                 "User-Agent": f"HACS/{self.hacs.version}",
             },
         )
-        if filecontent is None:
+        if archive is None:
             raise HacsException(f"[{self}] Failed to download zipball")
 
-        temp_dir = await self.hacs.hass.async_add_executor_job(tempfile.mkdtemp)
-        temp_file = f"{temp_dir}/{self.repository_manifest.filename}"
-        result = await self.hacs.async_save_file(temp_file, filecontent)
-        if not result:
-            raise HacsException("Could not save ZIP file")
-
-        with zipfile.ZipFile(temp_file, "r") as zip_file:
-            extractable = []
-            for path in zip_file.filelist:
-                filename = "/".join(path.filename.split("/")[1:])
-                if (
-                    filename.startswith(self.content.path.remote)
-                    and filename != self.content.path.remote
-                ):
-                    path.filename = filename.replace(self.content.path.remote, "")
-                    extractable.append(path)
-
-            zip_file.extractall(self.content.path.local, extractable)
-
-        def cleanup_temp_dir():
-            """Cleanup temp_dir."""
-            if os.path.exists(temp_dir):
-                self.logger.debug("%s Cleaning up %s", self.string, temp_dir)
-                shutil.rmtree(temp_dir)
+        try:
+            await self.hacs.hass.async_add_executor_job(
+                extract_zip,
+                archive,
+                self.content.path.local,
+                self.content.path.remote,
+                True,
+            )
+        except zipfile.BadZipFile as exception:
+            raise HacsException(f"[{self}] The zipball is not a valid ZIP file") from exception
+        finally:
+            await self.hacs.hass.async_add_executor_job(archive.close)
 
-        await self.hacs.hass.async_add_executor_job(cleanup_temp_dir)
         self.logger.info("%s Content was extracted to %s", self.string, self.content.path.local)
 
-    async def async_get_hacs_json(self, ref: str = None) -> dict[str, Any] | None:
-        """Get the content of the hacs.json file."""
+    async def async_get_hacs_json(
+        self,
+        ref: str = None,
+        conditional: bool = False,
+    ) -> dict[str, Any] | None:
+        """Get the content of the hacs.json file.
+
+        If conditional, None is also returned when it was not modified since the last request.
+        """
+        ref = ref or self.version_to_download()
         try:
-            response = await self.hacs.async_github_api_method(
+            response = await self.async_github_api_method_conditional(
+                f"hacs.json/{ref}" if conditional else None,
                 method=self.hacs.githubapi.repos.contents.get,
                 raise_exception=False,
                 repository=self.data.full_name,
                 path=RepositoryFile.HACS_JSON,
-                **{"params": {"ref": ref or self.version_to_download()}},
+                **{"params": {"ref": ref}},
             )
             if response:
                 return json_loads(decode_content(response.data.content))
@@ -959,28 +1023,69 @@ class HacsRepository:
         """Return a repository object."""
         try:
             repository = await self.hacs.github.get_repo(self.data.full_name, etag)
+            self.hacs.etag_cache.misses += 1
             return repository, self.hacs.github.client.last_response.etag
         except AIOGitHubAPINotModifiedException as exception:
+            self.hacs.etag_cache.hits += 1
             raise HacsNotModifiedException(exception) from exception
         except (ValueError, AIOGitHubAPIException, Exception) as exception:
             raise HacsException(exception) from exception
 
+    def get_etag(self, key: str) -> str | None:
+        """Return the ETag of the last response for key ('endpoint/resource')."""
+        cached = self.etags.get(key.split("/", 1)[0])
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        return None
+
+    def set_etag(self, key: str, etag: str | None) -> None:
+        """Set the ETag of the response for key, it replaces the ETag of the endpoint."""
+        if etag:
+            self.etags[key.split("/", 1)[0]] = (key, etag)
+        else:
+            self.etags.pop(key.split("/", 1)[0], None)
+
+    async def async_github_api_method_conditional(self, key: str | None, method, **kwargs):
+        """Call a GitHub API method with the ETag of the last response for key.
+
+        Raises HacsNotModifiedException if the response was not modified.
+        """
+        if key is None:
+            return await self.hacs.async_github_api_method(method=method, **kwargs)
+        try:
+            response = await self.hacs.async_github_api_method(
+                method=method, etag=self.get_etag(key), **kwargs
+            )
+        except GitHubNotModifiedException as exception:
+            self.hacs.etag_cache.hits += 1
+            raise HacsNotModifiedException(exception) from exception
+        if response is not None:
+            self.hacs.etag_cache.misses += 1
+            self.set_etag(key, response.etag)
+        return response
+
     def update_filenames(self) -> None:
         """Get the filename to target."""
 
-    async def get_tree(self, ref: str):
+    async def get_tree(self, ref: str, etag: str | None = None):
         """Return the repository tree."""
         if self.repository_object is None:
             raise HacsException("No repository_object")
         try:
-            tree = await self.repository_object.get_tree(ref)
+            tree = await self.repository_object.get_tree(ref, etag)
             return tree
+        except AIOGitHubAPINotModifiedException as exception:
+            raise HacsNotModifiedException(exception) from exception
         except (ValueError, AIOGitHubAPIException) as exception:
             raise HacsException(exception) from exception
 
     async def get_releases(self, prerelease=False, returnlimit=5) -> list[GitHubReleaseModel]:
-        """Return the repository releases."""
-        response = await self.hacs.async_github_api_method(
+        """Return the repository releases.
+
+        Raises HacsNotModifiedException if they were not modified since the last request.
+        """
+        response = await self.async_github_api_method_conditional(
+            f"releases/{prerelease}/{returnlimit}",
             method=self.hacs.githubapi.repos.releases.list,
             repository=self.data.full_name,
         )
@@ -998,12 +1103,15 @@ class HacsRepository:
         ignore_issues: bool = False,
         force: bool = False,
         retry=False,
-    ) -> None:
-        """Common update data."""
+    ) -> bool:
+        """Common update data, returns True if the repository was not modified."""
         releases = []
         try:
+            # installed repositories need the repository object, that is kept in memory
             repository_object, etag = await self.async_get_legacy_repository_object(
-                etag=None if force or self.data.installed else self.data.etag_repository,
+                etag=None
+                if force or (self.data.installed and self.repository_object is None)
+                else self.data.etag_repository,
             )
             self.repository_object = repository_object
             if self.data.full_name.lower() != repository_object.full_name.lower():
@@ -1017,7 +1125,7 @@ class HacsRepository:
             )
             self.data.etag_repository = etag
         except HacsNotModifiedException:
-            return
+            return True
         except HacsRepositoryExistException:
             raise HacsRepositoryExistException from None
         except (AIOGitHubAPIException, HacsException) as exception:
@@ -1053,6 +1161,8 @@ class HacsRepository:
                 self.data.published_tags = [x.tag_name for x in self.releases.objects]
                 self.data.last_version = next(iter(self.data.published_tags))
 
+        except HacsNotModifiedException:
+            pass
         except HacsException:
             self.data.releases = False
 
@@ -1070,12 +1180,18 @@ class HacsRepository:
         )
 
         try:
-            self.tree = await self.get_tree(self.ref)
+            tree_key = f"tree/{self.ref}"
+            self.tree = await self.get_tree(self.ref, self.get_etag(tree_key))
+            self.hacs.etag_cache.misses += 1
             if not self.tree:
+                self.set_etag(tree_key, None)
                 raise HacsException("No files in tree")
+            self.set_etag(tree_key, self.repository_object.client.last_response.etag)
             self.treefiles = []
             for treefile in self.tree:
                 self.treefiles.append(treefile.full_path)
+        except HacsNotModifiedException:
+            self.hacs.etag_cache.hits += 1
         except (AIOGitHubAPIException, HacsException) as exception:
             if (
                 not retry
@@ -1096,6 +1212,8 @@ class HacsRepository:
             if not ignore_issues:
                 raise HacsException(exception) from None
 
+        return False
+
     def gather_files_to_download(self) -> list[FileInformation]:
         """Return a list of file objects to be downloaded."""
         files = []
@@ -1162,12 +1280,6 @@ class HacsRepository:
         try:
             self.logger.debug("%s Downloading %s", self.string, content.name)
 
-            filecontent = await self.hacs.async_download_file(content.download_url)
-
-            if filecontent is None:
-                self.validate.errors.append(f"[{content.name}] was not downloaded.")
-                return
-
             # Save the content of the file.
             if self.content.single or content.path is None:
                 local_directory = self.content.path.local
@@ -1187,7 +1299,9 @@ class HacsRepository:
 
             local_file_path = (f"{local_directory}/{content.name}").replace("//", "/")
 
-            result = await self.hacs.async_save_file(local_file_path, filecontent)
+            result = await self.hacs.async_download_file_to_path(
+                content.download_url, local_file_path
+            )
             if result:
                 self.logger.info("%s Download of %s completed", self.string, content.name)
                 return
@@ -30,11 +30,7 @@ class HACSSensor(HacsSystemEntity, SensorEntity):
     def _update(self) -> None:
         """Update the sensor."""
 
-        repositories = [
-            repository
-            for repository in self.hacs.repositories.list_all
-            if repository.pending_update
-        ]
+        repositories = self.hacs.repositories.list_pending_update
         self._attr_native_value = len(repositories)
         if (
             self.hacs.configuration.config_type == ConfigurationType.YAML
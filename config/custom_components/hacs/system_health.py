@@ -30,6 +30,8 @@ async def system_health_info(hass):
             hass, "https://github.com/", GITHUB_STATUS
         ),
         "GitHub API Calls Remaining": response.data.resources.core.remaining,
+        "GitHub ETag Cache Hits": hacs.etag_cache.hits,
+        "GitHub ETag Cache Misses": hacs.etag_cache.misses,
         "Installed Version": hacs.version,
         "Stage": hacs.stage,
         "Available Repositories": len(hacs.repositories.list_all),
@@ -0,0 +1,58 @@
+"""The tests for the repository list entries of the websocket commands."""
+from unittest.mock import MagicMock
+
+# Set up the Home Assistant components that HACS imports, in their order
+import homeassistant.components.persistent_notification  # noqa: F401 pylint: disable=unused-import
+
+from custom_components.hacs.repositories.base import HacsRepository
+from custom_components.hacs.utils.json import json_loads
+from custom_components.hacs.websocket.repositories import _repository_list_entry
+
+
+def list_entry(repository):
+    """Return the (deserialized) list entry of a repository."""
+    return json_loads(_repository_list_entry(repository.hacs, repository))
+
+
+def create_repository():
+    """Return a repository with a cached list entry."""
+    hacs = MagicMock()
+    hacs.repositories.is_default.return_value = False
+    repository = HacsRepository(hacs)
+    repository.data.full_name = "hacs/integration"
+    repository.data.category = "integration"
+    list_entry(repository)
+    return repository
+
+
+class TestRepositoryListEntry:
+    """Tests for the cached repository list entries"""
+
+    def test_state(self):
+        """Test that the list entry has the new state of the repository."""
+        repository = create_repository()
+        repository.state = "installing"
+
+        assert list_entry(repository)["state"] == "installing"
+
+        repository.state = None
+
+        assert list_entry(repository)["state"] is None
+
+    def test_local_path(self):
+        """Test that the list entry has the new local path of the repository."""
+        repository = create_repository()
+        repository.content.path.local = "/config/custom_components/hacs"
+
+        assert list_entry(repository)["local_path"] == "/config/custom_components/hacs"
+
+    def test_unchanged_state(self):
+        """Test that setting the same state keeps the cached list entry."""
+        repository = create_repository()
+        repository.state = "installing"
+        entry = _repository_list_entry(repository.hacs, repository)
+        revision = repository.data.revision
+        repository.state = "installing"
+
+        assert repository.data.revision == revision
+        assert _repository_list_entry(repository.hacs, repository) is entry
@@ -1,6 +1,7 @@
 """Data handler for HACS."""
 import asyncio
 from datetime import datetime
+import zlib
 
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
@@ -11,7 +12,7 @@ from ..enums import HacsDisabledReason, HacsDispatchEvent, HacsGitHubRepo
 from ..repositories.base import TOPIC_FILTER, HacsManifest, HacsRepository
 from .logger import LOGGER
 from .path import is_safe
-from .store import async_load_from_store, async_save_to_store
+from .store import async_load_from_store, async_save_to_store, get_store_for_key
 
 DEFAULT_BASE_REPOSITORY_DATA = (
     ("authors", []),
@@ -49,6 +50,14 @@ DEFAULT_EXTENDED_REPOSITORY_DATA = (
     ("topics", []),
 )
 
+# The repository data is stored in this number of files, a save only writes the changed files
+REPOSITORY_SHARDS = 16
+
+
+def repository_shard(repository_id: str) -> int:
+    """Return the shard that stores the data of a repository."""
+    return zlib.crc32(repository_id.encode()) % REPOSITORY_SHARDS
+
 
 class HacsData:
     """HacsData class."""
@@ -57,7 +66,13 @@ class HacsData:
         """Initialize."""
         self.logger = LOGGER
         self.hacs = hacs
-        self.content = {}
+        # stored repository data per shard, and the shards that have to be written
+        self.content: dict[int, dict[str, dict]] = {
+            shard: {} for shard in range(REPOSITORY_SHARDS)
+        }
+        self.dirty_shards: set[int] = set()
+        # Set when the data was restored from the single file of previous versions
+        self.legacy_store = False
 
     async def async_force_write(self, _=None):
         """Force write."""
@@ -83,20 +98,61 @@ class HacsData:
         await self._async_store_content_and_repos()
 
     async def _async_store_content_and_repos(self, _=None):  # bb: ignore
-        """Store the main repos file and each repo that is out of date."""
+        """Store the repository data that changed since the last save."""
         # Repositories
-        self.content = {}
+        stored = set()
+        # the revision of the data of the stored repositories, dirty is cleared after the save
+        saved_revisions = []
         for repository in self.hacs.repositories.list_all:
             if repository.data.category in self.hacs.common.categories:
-                self.async_store_repository_data(repository)
-
-        await async_save_to_store(self.hacs.hass, "repositories", self.content)
+                stored.add(str(repository.data.id))
+                if repository.data.dirty:
+                    self.async_store_repository_data(repository)
+                    saved_revisions.append((repository, repository.data.revision))
+
+        for shard, content in self.content.items():
+            for entry in [entry for entry in content if entry not in stored]:
+                del content[entry]
+                self.dirty_shards.add(shard)
+
+        dirty_shards = sorted(self.dirty_shards)
+        self.dirty_shards.clear()
+        self.logger.debug(
+            "<HacsData async_write> Storing %s of %s repository shards",
+            len(dirty_shards),
+            REPOSITORY_SHARDS,
+        )
+        # the shards are serialized in the executor, entries are replaced but never changed
+        try:
+            await asyncio.gather(
+                *(
+                    get_store_for_key(self.hacs.hass, f"repositories.{shard}").async_save(
+                        dict(self.content[shard])
+                    )
+                    for shard in dirty_shards
+                )
+            )
+        except BaseException:
+            # the shards are written again with the next save
+            self.dirty_shards.update(dirty_shards)
+            raise
+
+        for repository, revision in saved_revisions:
+            # data that changed while the shards were written stays dirty
+            if repository.data.revision == revision:
+                repository.data.dirty = False
+
+        if self.legacy_store:
+            # all repository data is in the shards now
+            await get_store_for_key(self.hacs.hass, "repositories").async_remove()
+            self.legacy_store = False
+            self.logger.info("<HacsData async_write> Removed the file of previous versions")
         for event in (HacsDispatchEvent.REPOSITORY, HacsDispatchEvent.CONFIG):
             self.hacs.async_dispatch(event, {})
 
     @callback
     def async_store_repository_data(self, repository: HacsRepository) -> dict:
-        """Store the repository data."""
+        """Store the repository data, its shard is written with the next save if it changed."""
         data = {"repository_manifest": repository.repository_manifest.manifest}
 
         for key, default_value in DEFAULT_BASE_REPOSITORY_DATA:
@@ -112,7 +168,12 @@ class HacsData:
         if repository.data.last_fetched:
             data["last_fetched"] = repository.data.last_fetched.timestamp()
 
-        self.content[str(repository.data.id)] = data
+        entry = str(repository.data.id)
+        content = self.content[repository_shard(entry)]
+        if content.get(entry) != data:
+            content[entry] = data
+            self.dirty_shards.add(repository_shard(entry))
+        return data
 
     async def restore(self):
         """Restore saved data."""
@@ -122,12 +183,24 @@ class HacsData:
         except HomeAssistantError:
             hacs = {}
 
+        repositories = {}
+        key = "repositories"
         try:
-            repositories = await async_load_from_store(self.hacs.hass, "repositories") or {}
+            for shard in range(REPOSITORY_SHARDS):
+                key = f"repositories.{shard}"
+                self.content[shard] = await async_load_from_store(self.hacs.hass, key) or {}
+                repositories.update(self.content[shard])
+            if not repositories:
+                # Data stored in a single file by previous versions, written to the shards on
+                # the first save, the file is removed after that
+                key = "repositories"
+                repositories = await async_load_from_store(self.hacs.hass, key) or {}
+                self.legacy_store = bool(repositories)
+                self.dirty_shards.update(range(REPOSITORY_SHARDS))
         except HomeAssistantError as exception:
             self.hacs.log.error(
                 "Could not read %s, restore the file from a backup - %s",
-                self.hacs.hass.config.path(".storage/hacs.repositories"),
+                self.hacs.hass.config.path(f".storage/hacs.{key}"),
                 exception,
             )
             self.hacs.disable_hacs(HacsDisabledReason.RESTORE)
@@ -0,0 +1,214 @@
+"""Streaming installer for downloaded files and ZIP archives."""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import hashlib
+import os
+import secrets
+import shutil
+import tempfile
+from typing import IO
+import zipfile
+
+# Size of the chunks that are read from the response, and written to disk
+CHUNK_SIZE = 256 * 1024
+# Downloaded archives are kept in memory up to this size, larger archives in a temporary file
+ZIP_SPOOL_SIZE = 32 * 1024 * 1024
+# Number of threads that extract the entries of an archive
+ZIP_WORKERS = 4
+
+
+def _create_temp_file(file_path: str) -> tuple[int, str]:
+    """Create a new temporary file next to file_path, with the mode of a new file."""
+    directory, filename = os.path.split(file_path)
+    while True:
+        temp_path = os.path.join(directory, f".{filename}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def file_hash(file_path: str) -> str:
+    """Return the SHA-256 of a file, read in chunks."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as file_handler:
+        while chunk := file_handler.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class StreamedFile:
+    """A file that is written in chunks to a temporary file next to it.
+
+    The SHA-256 of the content (and the gzip file for .js files) are made in the
+    same pass. When the file is closed, it replaces the installed file (atomically,
+    by a rename), unless the installed file has the same content.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self.file_path = file_path
+        self.gzip = file_path.endswith(".js")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self._temp_path: str | None = None
+        self._temp_gz_path: str | None = None
+        self._file = None
+        self._gz_file = None
+
+    def open(self) -> None:
+        """Open the temporary file(s)."""
+        handle, self._temp_path = _create_temp_file(self.file_path)
+        self._file = os.fdopen(handle, "wb")
+        if self.gzip:
+            handle, self._temp_gz_path = _create_temp_file(f"{self.file_path}.gz")
+            self._gz_file = gzip.GzipFile(
+                filename=os.path.basename(self.file_path),
+                mode="wb",
+                fileobj=os.fdopen(handle, "wb"),
+            )
+
+    def write(self, chunk: bytes) -> None:
+        """Write a chunk of the content."""
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+        self._file.write(chunk)
+        if self._gz_file is not None:
+            self._gz_file.write(chunk)
+
+    def _close_files(self) -> None:
+        """Close the temporary file(s)."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._gz_file is not None:
+            fileobj = self._gz_file.fileobj
+            self._gz_file.close()
+            fileobj.close()
+            self._gz_file = None
+
+    def _remove_temp_files(self) -> None:
+        """Remove the temporary file(s) that are left."""
+        for temp_path in (self._temp_path, self._temp_gz_path):
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+        self._temp_path = self._temp_gz_path = None
+
+    def is_unchanged(self) -> bool:
+        """Return True if the installed file has the same content."""
+        if not os.path.isfile(self.file_path):
+            return False
+        if os.path.getsize(self.file_path) != self.size:
+            return False
+        if self.gzip and not os.path.isfile(f"{self.file_path}.gz"):
+            return False
+        return file_hash(self.file_path) == self.sha256.hexdigest()
+
+    def close(self) -> bool:
+        """Install the file, return False if the installed file was unchanged."""
+        self._close_files()
+        try:
+            if self.is_unchanged():
+                return False
+            if self._temp_gz_path is not None:
+                os.replace(self._temp_gz_path, f"{self.file_path}.gz")
+            os.replace(self._temp_path, self.file_path)
+            return True
+        finally:
+            self._remove_temp_files()
+
+    def abort(self) -> None:
+        """Remove the temporary file(s), the installed file is kept."""
+        self._close_files()
+        self._remove_temp_files()
+
+
+class SpooledDownload:
+    """A download that is kept in memory, or in a temporary file when it is large."""
+
+    def __init__(self, max_size: int = ZIP_SPOOL_SIZE) -> None:
+        self.max_size = max_size
+        self.file: tempfile.SpooledTemporaryFile | None = None
+
+    def open(self) -> None:
+        """Open the spooled file."""
+        self.file = tempfile.SpooledTemporaryFile(max_size=self.max_size)
+
+    def write(self, chunk: bytes) -> None:
+        """Write a chunk of the content."""
+        self.file.write(chunk)
+
+    def abort(self) -> None:
+        """Close (and remove) the spooled file."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def zip_members(
+    zip_file: zipfile.ZipFile,
+    remote_path: str | None = None,
+    strip_root: bool = False,
+) -> list[tuple[zipfile.ZipInfo, list[str]]]:
+    """Return the entries of an archive to extract, with their local path components.
+
+    With strip_root the top directory of the archive (of a GitHub zipball) is
+    removed, with remote_path only the entries in that directory are extracted,
+    relative to it. Like ZipFile.extractall, empty, '.' and '..' components are
+    dropped.
+    """
+    prefix = f"{remote_path.strip('/')}/" if remote_path else ""
+    members = []
+    for info in zip_file.infolist():
+        filename = info.filename
+        if strip_root:
+            filename = filename.split("/", 1)[1] if "/" in filename else ""
+        if not filename.startswith(prefix):
+            continue
+        parts = [part for part in filename[len(prefix) :].split("/") if part not in ("", ".", "..")]
+        if parts:
+            members.append((info, parts))
+    return members
+
+
+def extract_zip(
+    archive: IO[bytes],
+    local_path: str,
+    remote_path: str | None = None,
+    strip_root: bool = False,
+    workers: int = ZIP_WORKERS,
+) -> int:
+    """Extract the (matching entries of the) archive to local_path, return the number of files.
+
+    The directories are created first, the files are then written by a pool of
+    workers, directly from the archive.
+    """
+    with zipfile.ZipFile(archive) as zip_file:
+        directories = {local_path}
+        files = []
+        for info, parts in zip_members(zip_file, remote_path, strip_root):
+            target = os.path.join(local_path, *parts)
+            if info.is_dir():
+                directories.add(target)
+            else:
+                directories.add(os.path.dirname(target))
+                files.append((info, target))
+
+        for directory in sorted(directories):
+            os.makedirs(directory, exist_ok=True)
+
+        def _extract(member: tuple[zipfile.ZipInfo, str]) -> None:
+            info, target = member
+            with zip_file.open(info) as source, open(target, "wb") as destination:
+                shutil.copyfileobj(source, destination, CHUNK_SIZE)
+
+        if workers > 1 and len(files) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(files))) as pool:
+                for _ in pool.map(_extract, files):
+                    pass
+        else:
+            for member in files:
+                _extract(member)
+
+    return len(files)
@@ -7,4 +7,9 @@ try:
 except ImportError:
     from json import loads as json_loads
 
-__all__ = ["json_loads"]
+try:
+    from homeassistant.helpers.json import JSON_DUMP as json_dumps
+except ImportError:
+    from json import dumps as json_dumps
+
+__all__ = ["json_dumps", "json_loads"]
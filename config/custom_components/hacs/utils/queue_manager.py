@@ -2,24 +2,145 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import dataclass
+import heapq
+import itertools
+import math
 import time
-from typing import Coroutine
+from typing import Any, Coroutine
 
 from homeassistant.core import HomeAssistant
 
+from ..enums import HacsQueuePriority
 from ..exceptions import HacsExecutionStillInProgress
 from .logger import LOGGER
 
 _LOGGER = LOGGER
 
+# Number of tasks that are executed at the same time
+DEFAULT_WORKERS = 10
+# GitHub API requests that are kept in reserve, and the requests a repository update needs
+RATE_LIMIT_RESERVE = 1000
+REQUESTS_PER_TASK = 10
+
+
+class RateLimitBucket:
+    """Token bucket for the tasks that can be started within the GitHub API rate limit.
+
+    The tokens are refilled from the remaining requests GitHub reports (in the
+    x-ratelimit headers of every response, or by the rate_limit endpoint). Every
+    task that is started takes a token, a task that is still running is counted
+    against the next refill.
+    """
+
+    def __init__(
+        self,
+        reserve: int = RATE_LIMIT_RESERVE,
+        requests_per_task: int = REQUESTS_PER_TASK,
+    ) -> None:
+        self.reserve = reserve
+        self.requests_per_task = requests_per_task
+        self.remaining: int | None = None
+        self.reset: int | None = None
+        self.tokens: int | None = None
+        self.in_flight = 0
+
+    def update(self, remaining: int, reset: int | None = None) -> None:
+        """Refill the bucket from the remaining requests."""
+        self.remaining = remaining
+        if reset is not None:
+            self.reset = reset
+        self.tokens = (
+            max(0, math.floor((remaining - self.reserve) / self.requests_per_task))
+            - self.in_flight
+        )
+
+    def update_from_headers(self, headers: Any) -> None:
+        """Refill the bucket from the x-ratelimit headers of a GitHub API response."""
+        if headers is None or getattr(headers, "x_ratelimit_remaining", None) is None:
+            return
+        if headers.x_ratelimit_resource not in (None, "core"):
+            return
+        try:
+            self.update(
+                int(headers.x_ratelimit_remaining),
+                int(headers.x_ratelimit_reset) if headers.x_ratelimit_reset else None,
+            )
+        except ValueError:
+            pass
+
+    def acquire(self) -> bool:
+        """Take a token for a task, return False if the bucket is empty."""
+        if self.tokens is not None:
+            if self.tokens <= 0:
+                return False
+            self.tokens -= 1
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Release a task that has finished."""
+        self.in_flight -= 1
+
+    def to_json(self) -> dict[str, Any]:
+        """Return a JSON representation of the bucket."""
+        return {
+            "remaining": self.remaining,
+            "reset": self.reset,
+            "tokens": self.tokens,
+            "in_flight": self.in_flight,
+        }
+
+
+@dataclass
+class QueueTaskMetrics:
+    """Timing of the executed tasks of one kind."""
+
+    executed: int = 0
+    failed: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    def add(self, duration: float, failed: bool = False) -> None:
+        """Add an executed task."""
+        self.executed += 1
+        if failed:
+            self.failed += 1
+        self.total_time += duration
+        self.max_time = max(self.max_time, duration)
+
+    def to_json(self) -> dict[str, Any]:
+        """Return a JSON representation of the metrics."""
+        return {
+            "executed": self.executed,
+            "failed": self.failed,
+            "total_time": round(self.total_time, 3),
+            "mean_time": round(self.total_time / self.executed, 3) if self.executed else None,
+            "max_time": round(self.max_time, 3),
+        }
 
-class QueueManager:
-    """The QueueManager class."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+class QueueManager:
+    """The QueueManager class.
+
+    Tasks are executed by a pool of max_workers workers, in order of priority (and
+    in the order they were added). With a rate limit bucket, no task is started
+    when the bucket is empty, the remaining tasks stay in the queue.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_workers: int = DEFAULT_WORKERS,
+        rate_limit: RateLimitBucket | None = None,
+    ) -> None:
         self.hass = hass
-        self.queue: list[Coroutine] = []
+        self.queue: list[tuple[int, int, Coroutine]] = []
         self.running = False
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.metrics: dict[str, QueueTaskMetrics] = {}
+        self._sequence = itertools.count()
 
     @property
     def pending_tasks(self) -> int:
@@ -33,49 +154,83 @@ class QueueManager:
 
     def clear(self) -> None:
         """Clear the queue."""
+        for _, _, task in self.queue:
+            task.close()
         self.queue = []
 
-    def add(self, task: Coroutine) -> None:
+    def add(self, task: Coroutine, priority: HacsQueuePriority = HacsQueuePriority.DEFAULT) -> None:
         """Add a task to the queue."""
-        self.queue.append(task)
+        heapq.heappush(self.queue, (priority, next(self._sequence), task))
 
-    async def execute(self, number_of_tasks: int | None = None) -> None:
-        """Execute the tasks in the queue."""
+    async def execute(self, number_of_tasks: int | None = None) -> int:
+        """Execute the tasks in the queue, return the number of executed tasks."""
         if self.running:
             _LOGGER.debug("<QueueManager> Execution is already running")
             raise HacsExecutionStillInProgress
         if len(self.queue) == 0:
             _LOGGER.debug("<QueueManager> The queue is empty")
-            return
+            return 0
 
         self.running = True
-
-        _LOGGER.debug("<QueueManager> Checking out tasks to execute")
-        local_queue = []
-
-        if number_of_tasks:
-            for task in self.queue[:number_of_tasks]:
-                local_queue.append(task)
-        else:
-            for task in self.queue:
-                local_queue.append(task)
-
-        for task in local_queue:
-            self.queue.remove(task)
-
-        _LOGGER.debug("<QueueManager> Starting queue execution for %s tasks", len(local_queue))
-        start = time.time()
-        result = await asyncio.gather(*local_queue, return_exceptions=True)
-        for entry in result:
-            if isinstance(entry, Exception):
-                _LOGGER.error("<QueueManager> %s", entry)
-        end = time.time() - start
+        to_execute = min(number_of_tasks or len(self.queue), len(self.queue))
+        executed = 0
+
+        async def _worker() -> None:
+            nonlocal executed
+            while self.queue and executed < to_execute:
+                if self.rate_limit is not None and not self.rate_limit.acquire():
+                    return
+                executed += 1
+                _, _, task = heapq.heappop(self.queue)
+                try:
+                    await self._execute_task(task)
+                finally:
+                    if self.rate_limit is not None:
+                        self.rate_limit.release()
+
+        _LOGGER.debug("<QueueManager> Starting queue execution for %s tasks", to_execute)
+        start = time.monotonic()
+        try:
+            await asyncio.gather(*(_worker() for _ in range(min(self.max_workers, to_execute))))
+        finally:
+            self.running = False
 
         _LOGGER.debug(
             "<QueueManager> Queue execution finished for %s tasks finished in %.2f seconds",
-            len(local_queue),
-            end,
+            executed,
+            time.monotonic() - start,
         )
         if self.has_pending_tasks:
-            _LOGGER.debug("<QueueManager> %s tasks remaining in the queue", len(self.queue))
-        self.running = False
+            if executed < to_execute:
+                _LOGGER.debug(
+                    "<QueueManager> Rate limit reached, %s tasks remaining in the queue",
+                    len(self.queue),
+                )
+            else:
+                _LOGGER.debug("<QueueManager> %s tasks remaining in the queue", len(self.queue))
+        return executed
+
+    async def _execute_task(self, task: Coroutine) -> None:
+        """Execute a task and record its timing."""
+        failed = False
+        start = time.monotonic()
+        try:
+            await task
+        except Exception as exception:  # pylint: disable=broad-except
+            failed = True
+            _LOGGER.error("<QueueManager> %s", exception)
+        finally:
+            name = getattr(task, "__qualname__", type(task).__name__)
+            if name not in self.metrics:
+                self.metrics[name] = QueueTaskMetrics()
+            self.metrics[name].add(time.monotonic() - start, failed)
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Return the state, rate limit and task timing of the queue."""
+        return {
+            "pending_tasks": self.pending_tasks,
+            "running": self.running,
+            "max_workers": self.max_workers,
+            "rate_limit": self.rate_limit.to_json() if self.rate_limit is not None else None,
+            "tasks": {name: metrics.to_json() for name, metrics in self.metrics.items()},
+        }
@@ -5,47 +5,99 @@ import asyncio
 from importlib import import_module
 import os
 from pathlib import Path
-from typing import TYPE_CHECKING
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 from homeassistant.core import HomeAssistant
 
 from ..repositories.base import HacsRepository
+from ..utils.queue_manager import QueueManager, QueueTaskMetrics
 from .base import ActionValidationBase
 
 if TYPE_CHECKING:
     from ..base import HacsBase
 
+# Number of repositories that are validated at the same time in a batch
+DEFAULT_BATCH_PARALLEL = 5
+
+ValidatorSetup = Callable[..., Awaitable[Optional[ActionValidationBase]]]
+
+
+def _discover_validator_setups() -> dict[str, ValidatorSetup]:
+    """Import the validator modules, and return their setup functions by module name."""
+    validator_files = Path(__file__).parent
+    return {
+        module.stem: import_module(f"{__package__}.{module.stem}").async_setup_validator
+        for module in sorted(validator_files.glob("*.py"))
+        if module.name not in ("base.py", "__init__.py", "manager.py")
+    }
+
 
 class ValidationManager:
     """Hacs validation manager."""
 
+    # The validator modules are imported once per process
+    _validator_setups: dict[str, ValidatorSetup] | None = None
+
     def __init__(self, hacs: HacsBase, hass: HomeAssistant) -> None:
         """Initialize the setup manager class."""
         self.hacs = hacs
         self.hass = hass
         self._validatiors: dict[str, ActionValidationBase] = {}
+        self.timings: dict[str, QueueTaskMetrics] = {}
 
     @property
     def validatiors(self) -> list[ActionValidationBase]:
         """Return all list of all tasks."""
         return list(self._validatiors.values())
 
+    async def async_setup_validators(
+        self,
+        repository: HacsRepository,
+    ) -> dict[str, ActionValidationBase]:
+        """Set up the validators for a repository, by slug."""
+        if ValidationManager._validator_setups is None:
+            ValidationManager._validator_setups = await self.hass.async_add_executor_job(
+                _discover_validator_setups
+            )
+        validators = {}
+        for setup in ValidationManager._validator_setups.values():
+            if task := await setup(repository=repository):
+                validators[task.slug] = task
+        return validators
+
     async def async_load(self, repository: HacsRepository) -> None:
         """Load all tasks."""
-        self._validatiors = {}
-        validator_files = Path(__file__).parent
-        validator_modules = (
-            module.stem
-            for module in validator_files.glob("*.py")
-            if module.name not in ("base.py", "__init__.py", "manager.py")
-        )
-
-        async def _load_module(module: str):
-            task_module = import_module(f"{__package__}.{module}")
-            if task := await task_module.async_setup_validator(repository=repository):
-                self._validatiors[task.slug] = task
+        self._validatiors = await self.async_setup_validators(repository)
+
+    def _repository_validators(
+        self,
+        repository: HacsRepository,
+        validators: list[ActionValidationBase],
+        is_pull_from_fork: bool,
+    ) -> list[ActionValidationBase]:
+        """Return the validators that apply to the repository."""
+        return [
+            validator
+            for validator in validators
+            if (
+                (not validator.categories or repository.data.category in validator.categories)
+                and validator.slug not in os.getenv("INPUT_IGNORE", "").split(" ")
+                and (not is_pull_from_fork or validator.allow_fork)
+            )
+        ]
 
-        await asyncio.gather(*[_load_module(task) for task in validator_modules])
+    async def _async_execute_validator(self, validator: ActionValidationBase) -> None:
+        """Execute a validator, and add its time to the timings of its slug."""
+        start = time.monotonic()
+        failed = True
+        try:
+            await validator.execute_validation()
+            failed = validator.failed
+        finally:
+            if validator.slug not in self.timings:
+                self.timings[validator.slug] = QueueTaskMetrics()
+            self.timings[validator.slug].add(time.monotonic() - start, failed)
 
     async def async_run_repository_checks(self, repository: HacsRepository) -> None:
         """Run all validators for a repository."""
@@ -59,17 +111,13 @@ class ValidationManager:
             and os.getenv("GITHUB_REPOSITORY") != repository.data.full_name
         )
 
-        validatiors = [
-            validator
-            for validator in self.validatiors or []
-            if (
-                (not validator.categories or repository.data.category in validator.categories)
-                and validator.slug not in os.getenv("INPUT_IGNORE", "").split(" ")
-                and (not is_pull_from_fork or validator.allow_fork)
-            )
-        ]
+        validatiors = self._repository_validators(
+            repository, self.validatiors or [], is_pull_from_fork
+        )
 
-        await asyncio.gather(*[validator.execute_validation() for validator in validatiors])
+        await asyncio.gather(
+            *[self._async_execute_validator(validator) for validator in validatiors]
+        )
 
         total = len(validatiors)
         failed = len([x for x in validatiors if x.failed])
@@ -79,3 +127,77 @@ class ValidationManager:
             exit(1)
         else:
             repository.logger.info("%s All (%s) checks passed", repository.string, total)
+
+    async def async_run_batch_checks(
+        self,
+        repositories: list[HacsRepository],
+        max_parallel: int = DEFAULT_BATCH_PARALLEL,
+    ) -> dict[str, list[str]]:
+        """Run all validators for many repositories, max_parallel repositories at the same time.
+
+        Returns the slugs of the failed checks by repository full name. Unlike
+        async_run_repository_checks, this does not exit when a check fails, and the
+        checks that are not allowed for forks are also run.
+        """
+        results: dict[str, list[str]] = {}
+
+        async def _async_validate(repository: HacsRepository) -> None:
+            validatiors = self._repository_validators(
+                repository,
+                list((await self.async_setup_validators(repository)).values()),
+                is_pull_from_fork=False,
+            )
+            outcomes = await asyncio.gather(
+                *[self._async_execute_validator(validator) for validator in validatiors],
+                return_exceptions=True,
+            )
+            results[repository.data.full_name] = []
+            for validator, outcome in zip(validatiors, outcomes):
+                if isinstance(outcome, Exception):
+                    repository.logger.error(
+                        "%s <Validation %s> raised %s", repository.string, validator.slug, outcome
+                    )
+                if validator.failed or isinstance(outcome, Exception):
+                    results[repository.data.full_name].append(validator.slug)
+            if results[repository.data.full_name]:
+                repository.logger.error(
+                    "%s %s/%s checks failed",
+                    repository.string,
+                    len(results[repository.data.full_name]),
+                    len(validatiors),
+                )
+            else:
+                repository.logger.info(
+                    "%s All (%s) checks passed", repository.string, len(validatiors)
+                )
+
+        queue = QueueManager(hass=self.hass, max_workers=max_parallel)
+        for repository in repositories:
+            queue.add(_async_validate(repository))
+        await queue.execute()
+
+        failed = len([checks for checks in results.values() if checks])
+        self.hacs.log.info(
+            "<ValidationManager> %s/%s repositories failed validation",
+            failed,
+            len(repositories),
+        )
+        for slug, timing in self.timing_report().items():
+            self.hacs.log.info(
+                "<ValidationManager> %s: %s runs, %s failed, %.3fs total, %.3fs max",
+                slug,
+                timing["executed"],
+                timing["failed"],
+                timing["total_time"],
+                timing["max_time"],
+            )
+        return results
+
+    def timing_report(self) -> dict[str, dict[str, Any]]:
+        """Return the timing of the executed validators by slug, slowest first."""
+        return {
+            slug: timing.to_json()
+            for slug, timing in sorted(
+                self.timings.items(), key=lambda item: item[1].total_time, reverse=True
+            )
+        }
@@ -1,21 +1,109 @@
 """Register info websocket commands."""
 from __future__ import annotations
 
+import asyncio
 import sys
 from typing import TYPE_CHECKING, Any
 
 from homeassistant.components import websocket_api
-from homeassistant.core import HomeAssistant
+from homeassistant.components.websocket_api.messages import (
+    construct_event_message,
+    construct_result_message,
+)
+from homeassistant.core import HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 import voluptuous as vol
 
 from custom_components.hacs.utils import regex
 
 from ..const import DOMAIN
 from ..enums import HacsDispatchEvent
+from ..repositories.base import next_revision
+from ..utils.json import json_dumps
 
 if TYPE_CHECKING:
     from ..base import HacsBase
+    from ..repositories.base import HacsRepository
+
+
+# Number of list entries that are serialized before the event loop gets a turn
+LIST_ENTRY_BATCH = 100
+
+
+def _repository_list_entry(hacs: HacsBase, repo: HacsRepository) -> str:
+    """Return the serialized list entry of a repository, cached until the repository changes."""
+    if repo.list_entry is not None and repo.list_entry[0] == repo.data.revision:
+        return repo.list_entry[1]
+    revision = repo.data.revision
+    entry = json_dumps(
+        {
+            "authors": repo.data.authors,
+            "available_version": repo.display_available_version,
+            "installed_version": repo.display_installed_version,
+            "config_flow": repo.data.config_flow,
+            "can_download": repo.can_download,
+            "category": repo.data.category,
+            "country": repo.repository_manifest.country,
+            "custom": not hacs.repositories.is_default(str(repo.data.id)),
+            "description": repo.data.description,
+            "domain": repo.data.domain,
+            "downloads": repo.data.downloads,
+            "file_name": repo.data.file_name,
+            "full_name": repo.data.full_name,
+            "hide": repo.data.hide,
+            "homeassistant": repo.repository_manifest.homeassistant,
+            "id": repo.data.id,
+            "installed": repo.data.installed,
+            "last_updated": repo.data.last_updated,
+            "local_path": repo.content.path.local,
+            "name": repo.display_name,
+            "new": repo.data.new,
+            "pending_upgrade": repo.pending_update,
+            "stars": repo.data.stargazers_count,
+            "state": repo.state,
+            "status": repo.display_status,
+            "topics": repo.data.topics,
+        }
+    )
+    repo.list_entry = (revision, entry)
+    return entry
+
+
+async def _async_repository_list_entries(
+    hacs: HacsBase,
+    repositories: list[HacsRepository],
+) -> list[str]:
+    """Return the serialized list entries, yielding to the event loop between batches."""
+    entries = []
+    serialized = 0
+    for repo in repositories:
+        if repo.list_entry is None or repo.list_entry[0] != repo.data.revision:
+            serialized += 1
+            if serialized % LIST_ENTRY_BATCH == 0:
+                await asyncio.sleep(0)
+        entries.append(_repository_list_entry(hacs, repo))
+    return entries
+
+
+def _listed_repositories(
+    hacs: HacsBase,
+    categories: list[str] | None,
+    repositories: list[HacsRepository] | None = None,
+) -> list[HacsRepository]:
+    """Return the repositories (of the categories) that are shown in the list."""
+    categories = set(categories or hacs.common.categories)
+    if repositories is None:
+        repositories = [
+            repo
+            for category in categories
+            for repo in hacs.repositories.list_by_category(category)
+        ]
+    return [
+        repo
+        for repo in repositories
+        if repo.data.category in categories and not repo.ignored_by_country_configuration
+    ]
 
 
 @websocket_api.websocket_command(
@@ -33,44 +121,83 @@ async def hacs_repositories_list(
 ):
     """List repositories."""
     hacs: HacsBase = hass.data.get(DOMAIN)
+    entries = await _async_repository_list_entries(
+        hacs, _listed_repositories(hacs, msg.get("categories"))
+    )
     connection.send_message(
-        websocket_api.result_message(
-            msg["id"],
-            [
-                {
-                    "authors": repo.data.authors,
-                    "available_version": repo.display_available_version,
-                    "installed_version": repo.display_installed_version,
-                    "config_flow": repo.data.config_flow,
-                    "can_download": repo.can_download,
-                    "category": repo.data.category,
-                    "country": repo.repository_manifest.country,
-                    "custom": not hacs.repositories.is_default(str(repo.data.id)),
-                    "description": repo.data.description,
-                    "domain": repo.data.domain,
-                    "downloads": repo.data.downloads,
-                    "file_name": repo.data.file_name,
-                    "full_name": repo.data.full_name,
-                    "hide": repo.data.hide,
-                    "homeassistant": repo.repository_manifest.homeassistant,
-                    "id": repo.data.id,
-                    "installed": repo.data.installed,
-                    "last_updated": repo.data.last_updated,
-                    "local_path": repo.content.path.local,
-                    "name": repo.display_name,
-                    "new": repo.data.new,
-                    "pending_upgrade": repo.pending_update,
-                    "stars": repo.data.stargazers_count,
-                    "state": repo.state,
-                    "status": repo.display_status,
-                    "topics": repo.data.topics,
-                }
-                for repo in hacs.repositories.list_all
-                if repo.data.category in (msg.get("categories") or hacs.common.categories)
-                and not repo.ignored_by_country_configuration
-            ],
-        )
+        construct_result_message(msg["id"], f"[{','.join(entries)}]")
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "hacs/repositories/subscribe",
+        vol.Optional("categories"): [str],
+        vol.Optional("revision", default=0): int,
+    }
+)
+@websocket_api.require_admin
+@websocket_api.async_response
+async def hacs_repositories_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+):
+    """Subscribe to the changes of the repository list.
+
+    Every event has the repositories that changed since the revision of the previous
+    event (for the first event, the revision of the client), the ids of the repositories
+    that are no longer listed, and the new revision.
+    """
+    hacs: HacsBase = hass.data.get(DOMAIN)
+    revision = msg["revision"]
+    sending = False
+
+    async def async_send_changes(always: bool = False) -> None:
+        nonlocal revision, sending
+        sending = True
+        try:
+            while True:
+                new_revision = next_revision()
+                changed = hacs.repositories.list_changed_since(revision)
+                listed = _listed_repositories(hacs, msg.get("categories"), changed)
+                removed = hacs.repositories.list_unregistered_since(revision) + [
+                    str(repo.data.id) for repo in set(changed).difference(listed)
+                ]
+                entries = await _async_repository_list_entries(hacs, listed)
+                if entries or removed or always:
+                    connection.send_message(
+                        construct_event_message(
+                            msg["id"],
+                            f'{{"revision":{new_revision},'
+                            f'"repositories":[{",".join(entries)}],'
+                            f'"removed":{json_dumps(removed)}}}',
+                        )
+                    )
+                revision = new_revision
+                always = False
+                # Send the changes made while the entries were serialized right away
+                if not (
+                    hacs.repositories.list_changed_since(revision)
+                    or hacs.repositories.list_unregistered_since(revision)
+                ):
+                    return
+        finally:
+            sending = False
+
+    @callback
+    def forward_changes(_data: dict | None = None) -> None:
+        """Send the changes when a repository was changed."""
+        if not sending:
+            hass.async_create_task(async_send_changes())
+
+    connection.subscriptions[msg["id"]] = async_dispatcher_connect(
+        hass,
+        HacsDispatchEvent.REPOSITORY,
+        forward_changes,
     )
+    connection.send_message(websocket_api.result_message(msg["id"]))
+    await async_send_changes(always=True)
 
 
 @websocket_api.websocket_command(
@@ -95,13 +222,14 @@ async def hacs_repositories_clear_new(
         repository.data.new = False
 
     else:
-        for repo in hacs.repositories.list_all:
-            if repo.data.new and repo.data.category in msg.get("categories", []):
-                hacs.log.debug(
-                    "Clearing new flag from '%s'",
-                    repo.data.full_name,
-                )
-                repo.data.new = False
+        for category in msg.get("categories", []):
+            for repo in hacs.repositories.list_by_category(category):
+                if repo.data.new:
+                    hacs.log.debug(
+                        "Clearing new flag from '%s'",
+                        repo.data.full_name,
+                    )
+                    repo.data.new = False
     hacs.async_dispatch(HacsDispatchEvent.REPOSITORY, {})
     await hacs.data.async_write()
     connection.send_message(websocket_api.result_message(msg["id"]))
@@ -1,14 +1,16 @@
 """Xiaomi passive BLE monitor integration."""
 import asyncio
+from collections import Counter
 from datetime import timedelta
+from fractions import Fraction
 import logging
-import statistics as sts
 import struct
-from threading import Thread
+from threading import Lock, Thread
 from time import sleep
 
 import aioblescan as aiobs
-from Cryptodome.Cipher import AES
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESCCM
 import voluptuous as vol
 
 from homeassistant.const import (
@@ -119,25 +121,25 @@ FMDH_STRUCT = struct.Struct("<H")
 class HCIdump(Thread):
     """Mimic deprecated hcidump tool."""
 
-    def __init__(self, dumplist, interface=0, active=0):
+    def __init__(self, process, interface=0, active=0):
         """Initiate HCIdump thread."""
         Thread.__init__(self)
         _LOGGER.debug("HCIdump thread: Init")
-        self._interface = interface
+        self.interface = interface
         self._active = active
-        self.dumplist = dumplist
+        self._process = process
         self._event_loop = None
         _LOGGER.debug("HCIdump thread: Init finished")
 
     def process_hci_events(self, data):
-        """Collect HCI events."""
-        self.dumplist.append(data)
+        """Pass HCI events on as they arrive."""
+        self._process(data)
 
     def run(self):
         """Run HCIdump thread."""
         _LOGGER.debug("HCIdump thread: Run")
         try:
-            mysocket = aiobs.create_bt_socket(self._interface)
+            mysocket = aiobs.create_bt_socket(self.interface)
         except OSError as error:
             _LOGGER.error("HCIdump thread: OS error: %s", error)
         else:
@@ -215,26 +217,30 @@ def parse_xiaomi_value(hexvalue, typecode):
     return None
 
 
+# prepared AES-CCM ciphers per encryption key
+AES_CIPHERS = {}
+
+
 def decrypt_payload(encrypted_payload, key, nonce):
-    """Decrypt payload."""
+    """Decrypt payload (AES-CCM with a 12 byte nonce, 1 byte aad and 4 byte token)."""
     aad = b"\x11"
     token = encrypted_payload[-4:]
     payload_counter = encrypted_payload[-7:-4]
     nonce = b"".join([nonce, payload_counter])
     cipherpayload = encrypted_payload[:-7]
-    cipher = AES.new(key, AES.MODE_CCM, nonce=nonce, mac_len=4)
-    cipher.update(aad)
-    plaindata = None
     try:
-        plaindata = cipher.decrypt_and_verify(cipherpayload, token)
-    except ValueError as error:
-        _LOGGER.error("Decryption failed: %s", error)
+        cipher = AES_CIPHERS[key]
+    except KeyError:
+        cipher = AES_CIPHERS[key] = AESCCM(key, tag_length=4)
+    try:
+        return cipher.decrypt(nonce, cipherpayload + token, aad)
+    except InvalidTag:
+        _LOGGER.error("Decryption failed: %s", "MAC check failed")
         _LOGGER.error("token: %s", token.hex())
         _LOGGER.error("nonce: %s", nonce.hex())
         _LOGGER.error("encrypted_payload: %s", encrypted_payload.hex())
         _LOGGER.error("cipherpayload: %s", cipherpayload.hex())
         return None
-    return plaindata
 
 
 def parse_raw_message(data, aeskeyslist,  whitelist, report_unknown=False):
@@ -431,29 +437,172 @@ def temperature_limit(config, mac, temp):
     return temp
 
 
-class BLEScanner:
-    """BLE scanner."""
+def median_and_mean(histogram):
+    """Return the median and mean of a histogram (value: count) of measurement values.
+
+    Like statistics.median and statistics.mean of the values, without expanding them.
+    """
+    count = sum(histogram.values())
+    if not count:
+        raise ZeroDivisionError("no measurement values")
+    half = count // 2
+    lower = None
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if lower is None and seen >= half:
+            lower = value
+        if seen > half:
+            median = value if count % 2 else (lower + value) / 2
+            break
+    mean = sum(Fraction(value) * number for value, number in histogram.items()) / count
+    if mean.denominator == 1 and all(isinstance(value, int) for value in histogram):
+        return median, int(mean)
+    return median, float(mean)
+
+
+class DeviceMeasurements:
+    """Measurements of a device, aggregated from the messages of the current period."""
+
+    def __init__(self, sensortype):
+        """Initiate the aggregate of a device."""
+        self.sensortype = sensortype
+        self.packet = None
+        # histograms (value: count) of temperature, humidity, moisture, conductivity,
+        # illuminance and formaldehyde
+        self.values = {}
+        # last consumable, switch and battery state
+        self.states = {}
+        self.rssi_sum = 0
+        self.rssi_count = 0
+
+    def add(self, measurement, value):
+        """Add a measurement value."""
+        try:
+            self.values[measurement][value] += 1
+        except KeyError:
+            self.values[measurement] = Counter({value: 1})
 
-    dumpthreads = []
-    hcidump_data = []
+    @property
+    def rssi(self):
+        """Return the mean rssi of the period."""
+        return round(self.rssi_sum / self.rssi_count)
 
-    def start(self, config):
+
+class BLEScanner:
+    """BLE scanner.
+
+    The HCIdump threads keep scanning, every HCI event is parsed as it arrives and
+    its measurements are added to the aggregates of the current period. collect()
+    hands over these aggregates and starts a new period.
+    """
+
+    def __init__(self, config, aeskeyslist, whitelist):
+        """Initiate the scanner."""
+        self.config = config
+        self.aeskeyslist = aeskeyslist
+        self.whitelist = whitelist
+        self.report_unknown = config[CONF_REPORT_UNKNOWN]
+        self.log_spikes = config[CONF_LOG_SPIKES]
+        self.dumpthreads = []
+        self.lock = Lock()
+        self.measurements = {}
+        self.lpacket = {}  # last packet id per mac
+        self.hci_events = 0
+
+    def start(self):
         """Start receiving broadcasts."""
-        active_scan = config[CONF_ACTIVE_SCAN]
-        hci_interfaces = config[CONF_HCI_INTERFACE]
-        self.hcidump_data.clear()
         _LOGGER.debug("Spawning HCIdump thread(s).")
-        for hci_int in hci_interfaces:
-            dumpthread = HCIdump(
-                dumplist=self.hcidump_data,
-                interface=hci_int,
-                active=int(active_scan is True),
-            )
-            self.dumpthreads.append(dumpthread)
-            _LOGGER.debug("Starting HCIdump thread for hci%s", hci_int)
-            dumpthread.start()
+        for hci_int in self.config[CONF_HCI_INTERFACE]:
+            self.dumpthreads.append(self.start_dumpthread(hci_int))
         _LOGGER.debug("HCIdump threads count = %s", len(self.dumpthreads))
 
+    def start_dumpthread(self, hci_int):
+        """Start a HCIdump thread for a hci interface."""
+        dumpthread = HCIdump(
+            process=self.process_hci_events,
+            interface=hci_int,
+            active=int(self.config[CONF_ACTIVE_SCAN] is True),
+        )
+        _LOGGER.debug("Starting HCIdump thread for hci%s", hci_int)
+        dumpthread.start()
+        return dumpthread
+
+    def ensure_running(self):
+        """Restart HCIdump threads that have stopped."""
+        for index, dumpthread in enumerate(self.dumpthreads):
+            if not dumpthread.is_alive():
+                _LOGGER.debug(
+                    "HCIdump thread for hci%s has stopped, restarting",
+                    dumpthread.interface,
+                )
+                self.dumpthreads[index] = self.start_dumpthread(dumpthread.interface)
+
+    def process_hci_events(self, data):
+        """Parse a HCI event and add its measurements to the aggregates."""
+        msg = parse_raw_message(
+            data, self.aeskeyslist, self.whitelist, self.report_unknown
+        )
+        with self.lock:
+            self.hci_events += 1
+            if msg and "mac" in msg:
+                self.aggregate(msg)
+
+    def aggregate(self, data):
+        """Add the measurements of a parsed message to the aggregate of the device."""
+        # ignore duplicated message
+        packet = data["packet"]
+        mac = data["mac"]
+        if self.lpacket.get(mac) == packet:
+            return
+        self.lpacket[mac] = packet
+        try:
+            device = self.measurements[mac]
+        except KeyError:
+            device = self.measurements[mac] = DeviceMeasurements(data["type"])
+        device.sensortype = data["type"]
+        device.packet = packet
+        # store found readings per device
+        if "temperature" in data:
+            if (
+                temperature_limit(self.config, mac, CONF_TMAX)
+                >= data["temperature"]
+                >= temperature_limit(self.config, mac, CONF_TMIN)
+            ):
+                device.add("temperature", data["temperature"])
+            elif self.log_spikes:
+                _LOGGER.error(
+                    "Temperature spike: %s (%s)",
+                    data["temperature"],
+                    mac,
+                )
+        if "humidity" in data:
+            if CONF_HMAX >= data["humidity"] >= CONF_HMIN:
+                device.add("humidity", data["humidity"])
+            elif self.log_spikes:
+                _LOGGER.error(
+                    "Humidity spike: %s (%s)",
+                    data["humidity"],
+                    mac,
+                )
+        for measurement in ("conductivity", "moisture", "illuminance", "formaldehyde"):
+            if measurement in data:
+                device.add(measurement, data[measurement])
+        for measurement in ("consumable", "switch", "battery"):
+            if measurement in data:
+                device.states[measurement] = int(data[measurement])
+        device.rssi_sum += int(data["rssi"])
+        device.rssi_count += 1
+
+    def collect(self):
+        """Return the aggregates and the number of HCI events of the period, start a new period."""
+        with self.lock:
+            measurements = self.measurements
+            hci_events = self.hci_events
+            self.measurements = {}
+            self.hci_events = 0
+        return measurements, hci_events
+
     def stop(self):
         """Stop HCIdump thread(s)."""
         result = True
@@ -484,22 +633,8 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
             return None
         return rmac[10:12] + rmac[8:10] + rmac[6:8] + rmac[4:6] + rmac[2:4] + rmac[0:2]
 
-    def lpacket(mac, packet=None):
-        """Last_packet static storage."""
-        if packet is not None:
-            lpacket.cntr[mac] = packet
-        else:
-            try:
-                cntr = lpacket.cntr[mac]
-            except KeyError:
-                cntr = None
-            return cntr
-
     _LOGGER.debug("Starting")
     firstrun = True
-    scanner = BLEScanner()
-    hass.bus.listen("homeassistant_stop", scanner.shutdown_handler)
-    scanner.start(config)
     sensors_by_mac = {}
     if config[CONF_REPORT_UNKNOWN]:
         _LOGGER.info(
@@ -531,14 +666,16 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
     for i, mac in enumerate(whitelist):
         whitelist[i] = bytes.fromhex(reverse_mac(mac.replace(":", "")).lower())
     _LOGGER.debug("%s whitelist item(s) loaded.", len(whitelist))
-    lpacket.cntr = {}
+    scanner = BLEScanner(config, aeskeys, whitelist)
+    hass.bus.listen("homeassistant_stop", scanner.shutdown_handler)
+    scanner.start()
     sleep(1)
 
     def calc_update_state(
         entity_to_update,
         sensor_mac,
         config,
-        measurements_list,
+        measurement_values,
         stype=None,
         fdec=0,
     ):
@@ -552,16 +689,16 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
             rdecimals = fdec
         # LYWSD03MMC / MHO-C401 "jagged" humidity workaround
         if stype in ('LYWSD03MMC', 'MHO-C401'):
-            measurements = [int(item) for item in measurements_list]
+            measurements = Counter()
+            for value, count in measurement_values.items():
+                measurements[int(value)] += count
         else:
-            measurements = measurements_list
+            measurements = measurement_values
         try:
+            state_median, state_mean = median_and_mean(measurements)
             if config[CONF_ROUNDING]:
-                state_median = round(sts.median(measurements), rdecimals)
-                state_mean = round(sts.mean(measurements), rdecimals)
-            else:
-                state_median = sts.median(measurements)
-                state_mean = sts.mean(measurements)
+                state_median = round(state_median, rdecimals)
+                state_mean = round(state_mean, rdecimals)
             if config[CONF_USE_MEDIAN]:
                 textattr = "last median of"
                 setattr(entity_to_update, "_state", state_median)
@@ -570,7 +707,7 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
                 setattr(entity_to_update, "_state", state_mean)
             getattr(entity_to_update, "_device_state_attributes")[
                 textattr
-            ] = len(measurements)
+            ] = sum(measurements.values())
             getattr(entity_to_update, "_device_state_attributes")[
                 "median"
             ] = state_median
@@ -590,7 +727,7 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
             error = err
         return success, error
 
-    def discover_ble_devices(config, aeskeyslist, whitelist):
+    def discover_ble_devices(config):
         """Discover Bluetooth LE devices."""
         nonlocal firstrun
         if firstrun:
@@ -598,109 +735,21 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
             _LOGGER.debug("First run, skip parsing.")
             return []
         _LOGGER.debug("Discovering Bluetooth LE devices")
-        log_spikes = config[CONF_LOG_SPIKES]
-        _LOGGER.debug("Time to analyze...")
-        stype = {}
-        hum_m_data = {}
-        temp_m_data = {}
-        illum_m_data = {}
-        moist_m_data = {}
-        cond_m_data = {}
-        formaldehyde_m_data = {}
-        cons_m_data = {}
-        switch_m_data = {}
-        batt = {}  # battery
-        rssi = {}
-        macs = {}  # all found macs
         _LOGGER.debug("Getting data from HCIdump thread")
-        jres = scanner.stop()
-        if jres is False:
-            _LOGGER.error("HCIdump thread(s) is not completed, interrupting data processing!")
-            return []
-        hcidump_raw = [*scanner.hcidump_data]
-        scanner.start(config)  # minimum delay between HCIdumps
-        report_unknown = config[CONF_REPORT_UNKNOWN]
-        for msg in hcidump_raw:
-            data = parse_raw_message(msg, aeskeyslist, whitelist, report_unknown)
-            if data and "mac" in data:
-                # ignore duplicated message
-                packet = data["packet"]
-                mac = data["mac"]
-                prev_packet = lpacket(mac)
-                if prev_packet == packet:
-                    # _LOGGER.debug("DUPLICATE: %s, IGNORING!", data)
-                    continue
-                lpacket(mac, packet)
-                # store found readings per device
-                if "temperature" in data:
-                    if (
-                        temperature_limit(config, mac, CONF_TMAX)
-                        >= data["temperature"]
-                        >= temperature_limit(config, mac, CONF_TMIN)
-                    ):
-                        if mac not in temp_m_data:
-                            temp_m_data[mac] = []
-                        temp_m_data[mac].append(data["temperature"])
-                        macs[mac] = mac
-                    elif log_spikes:
-                        _LOGGER.error(
-                            "Temperature spike: %s (%s)",
-                            data["temperature"],
-                            mac,
-                        )
-                if "humidity" in data:
-                    if CONF_HMAX >= data["humidity"] >= CONF_HMIN:
-                        if mac not in hum_m_data:
-                            hum_m_data[mac] = []
-                        hum_m_data[mac].append(data["humidity"])
-                        macs[mac] = mac
-                    elif log_spikes:
-                        _LOGGER.error(
-                            "Humidity spike: %s (%s)",
-                            data["humidity"],
-                            mac,
-                        )
-                if "conductivity" in data:
-                    if mac not in cond_m_data:
-                        cond_m_data[mac] = []
-                    cond_m_data[mac].append(data["conductivity"])
-                    macs[mac] = mac
-                if "moisture" in data:
-                    if mac not in moist_m_data:
-                        moist_m_data[mac] = []
-                    moist_m_data[mac].append(data["moisture"])
-                    macs[mac] = mac
-                if "illuminance" in data:
-                    if mac not in illum_m_data:
-                        illum_m_data[mac] = []
-                    illum_m_data[mac].append(data["illuminance"])
-                    macs[mac] = mac
-                if "formaldehyde" in data:
-                    if mac not in formaldehyde_m_data:
-                        formaldehyde_m_data[mac] = []
-                    formaldehyde_m_data[mac].append(data["formaldehyde"])
-                    macs[mac] = mac
-                if "consumable" in data:
-                    cons_m_data[mac] = int(data["consumable"])
-                    macs[mac] = mac
-                if "switch" in data:
-                    switch_m_data[mac] = int(data["switch"])
-                    macs[mac] = mac
-                if "battery" in data:
-                    batt[mac] = int(data["battery"])
-                    macs[mac] = mac
-                if mac not in rssi:
-                    rssi[mac] = []
-                rssi[mac].append(int(data["rssi"]))
-                stype[mac] = data["type"]
-            else:
-                # "empty" loop high cpu usage workaround
-                sleep(0.0001)
+        scanner.ensure_running()
+        measurements, hci_events = scanner.collect()
+        _LOGGER.debug("Time to analyze...")
+        macs = 0  # all found macs
         # for every seen device
-        for mac in macs:
+        for mac, device in measurements.items():
+            values = device.values
+            states = device.states
+            if not values and not states:
+                continue
+            macs += 1
             # fixed entity index for every measurement type
             # according to the sensor implementation
-            sensortype = stype[mac]
+            sensortype = device.sensortype
             t_i, h_i, m_i, c_i, i_i, f_i, cn_i, sw_i, b_i = MMTS_DICT[
                 sensortype
             ]
@@ -746,25 +795,25 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
             for sensor in sensors:
                 getattr(sensor, "_device_state_attributes")[
                     "last packet id"
-                ] = lpacket(mac)
-                getattr(sensor, "_device_state_attributes")["rssi"] = round(
-                    sts.mean(rssi[mac])
-                )
+                ] = device.packet
+                getattr(sensor, "_device_state_attributes")[
+                    "rssi"
+                ] = device.rssi
                 getattr(sensor, "_device_state_attributes")[
                     "sensor type"
                 ] = sensortype
                 getattr(sensor, "_device_state_attributes")[
                     "mac address"
                 ] = ":".join(mac[i:i+2] for i in range(0, len(mac), 2))
-                if not isinstance(sensor, BatterySensor) and mac in batt:
+                if not isinstance(sensor, BatterySensor) and "battery" in states:
                     getattr(sensor, "_device_state_attributes")[
                         ATTR_BATTERY_LEVEL
-                    ] = batt[mac]
+                    ] = states["battery"]
 
             # averaging and states updating
-            if mac in batt:
+            if "battery" in states:
                 if config[CONF_BATT_ENTITIES]:
-                    setattr(sensors[b_i], "_state", batt[mac])
+                    setattr(sensors[b_i], "_state", states["battery"])
                     try:
                         sensors[b_i].schedule_update_ha_state()
                     except (AttributeError, AssertionError):
@@ -780,54 +829,54 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
                             sensortype,
                         )
                         _LOGGER.error(err)
-            if mac in temp_m_data:
+            if "temperature" in values:
                 success, error = calc_update_state(
-                    sensors[t_i], mac, config, temp_m_data[mac]
+                    sensors[t_i], mac, config, values["temperature"]
                 )
                 if not success:
                     _LOGGER.error(
                         "Sensor %s (%s, temp.) update error:", mac, sensortype
                     )
                     _LOGGER.error(error)
-            if mac in hum_m_data:
+            if "humidity" in values:
                 success, error = calc_update_state(
-                    sensors[h_i], mac, config, hum_m_data[mac], sensortype
+                    sensors[h_i], mac, config, values["humidity"], sensortype
                 )
                 if not success:
                     _LOGGER.error(
                         "Sensor %s (%s, hum.) update error:", mac, sensortype
                     )
                     _LOGGER.error(error)
-            if mac in moist_m_data:
+            if "moisture" in values:
                 success, error = calc_update_state(
-                    sensors[m_i], mac, config, moist_m_data[mac]
+                    sensors[m_i], mac, config, values["moisture"]
                 )
                 if not success:
                     _LOGGER.error(
                         "Sensor %s (%s, moist.) update error:", mac, sensortype
                     )
                     _LOGGER.error(error)
-            if mac in cond_m_data:
+            if "conductivity" in values:
                 success, error = calc_update_state(
-                    sensors[c_i], mac, config, cond_m_data[mac]
+                    sensors[c_i], mac, config, values["conductivity"]
                 )
                 if not success:
                     _LOGGER.error(
                         "Sensor %s (%s, cond.) update error:", mac, sensortype
                     )
                     _LOGGER.error(error)
-            if mac in illum_m_data:
+            if "illuminance" in values:
                 success, error = calc_update_state(
-                    sensors[i_i], mac, config, illum_m_data[mac]
+                    sensors[i_i], mac, config, values["illuminance"]
                 )
                 if not success:
                     _LOGGER.error(
                         "Sensor %s (%s, illum.) update error:", mac, sensortype
                     )
                     _LOGGER.error(error)
-            if mac in formaldehyde_m_data:
+            if "formaldehyde" in values:
                 success, error = calc_update_state(
-                    sensors[f_i], mac, config, formaldehyde_m_data[mac], fdec=3
+                    sensors[f_i], mac, config, values["formaldehyde"], fdec=3
                 )
                 if not success:
                     _LOGGER.error(
@@ -836,8 +885,8 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
                         sensortype,
                     )
                     _LOGGER.error(error)
-            if mac in cons_m_data:
-                setattr(sensors[cn_i], "_state", cons_m_data[mac])
+            if "consumable" in states:
+                setattr(sensors[cn_i], "_state", states["consumable"])
                 try:
                     sensors[cn_i].schedule_update_ha_state()
                 except (AttributeError, AssertionError):
@@ -853,8 +902,8 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
                         sensortype,
                     )
                     _LOGGER.error(err)
-            if mac in switch_m_data:
-                setattr(sensors[sw_i], "_state", switch_m_data[mac])
+            if "switch" in states:
+                setattr(sensors[sw_i], "_state", states["switch"])
                 try:
                     sensors[sw_i].schedule_update_ha_state()
                 except (AttributeError, AssertionError):
@@ -870,8 +919,8 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
                     _LOGGER.error(err)
         _LOGGER.debug(
             "Finished. Parsed: %i hci events, %i xiaomi devices.",
-            len(hcidump_raw),
-            len(macs),
+            hci_events,
+            macs,
         )
         return []
 
@@ -880,7 +929,7 @@ def setup_platform(hass, config, add_entities, discovery_info=None):
         period = config[CONF_PERIOD]
         _LOGGER.debug("update_ble called")
         try:
-            discover_ble_devices(config, aeskeys, whitelist)
+            discover_ble_devices(config)
         except RuntimeError as error:
             _LOGGER.error("Error during Bluetooth LE scan: %s", error)
         track_point_in_utc_time(
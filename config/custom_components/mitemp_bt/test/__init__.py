@@ -0,0 +1 @@
+"""Tests for mitemp_bt."""
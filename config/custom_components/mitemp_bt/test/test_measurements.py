@@ -0,0 +1,41 @@
+"""The tests for the aggregation of the mitemp_bt measurements."""
+from collections import Counter
+import random
+import statistics
+
+import pytest
+
+from mitemp_bt.sensor import DeviceMeasurements, median_and_mean
+
+
+class TestMeasurements:
+    """Tests for the measurement histograms"""
+
+    def test_device_measurements(self):
+        """Test that the measurements of a device are counted per value."""
+        device = DeviceMeasurements("LYWSDCGQ")
+        for value in (21.5, 21.6, 21.5):
+            device.add("temperature", value)
+        device.add("humidity", 45.2)
+
+        assert device.values == {
+            "temperature": Counter({21.5: 2, 21.6: 1}),
+            "humidity": Counter({45.2: 1}),
+        }
+
+    @pytest.mark.parametrize("quantum", [1, 0.1, 0.01])
+    def test_median_and_mean(self, quantum):
+        """Test that the median and mean are the same as those of all values."""
+        rng = random.Random(0)
+        for size in range(1, 50):
+            values = [round(rng.randint(150, 250) * quantum, 2) for _ in range(size)]
+
+            assert median_and_mean(Counter(values)) == (
+                statistics.median(values),
+                statistics.mean(values),
+            )
+
+    def test_empty(self):
+        """Test that an empty histogram has no median and mean."""
+        with pytest.raises(ZeroDivisionError):
+            median_and_mean(Counter())